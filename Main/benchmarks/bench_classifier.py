@@ -0,0 +1,105 @@
+# File Organizer - Classifier Benchmark
+# Times file categorization: the compiled classifier.py lookup against the old search of
+# every category's extension set (Path.suffix + one set test per category)
+# Usage (from the Main folder): python benchmarks/bench_classifier.py [--lookups 1000000] [--rules FILE] [--json]
+#
+# File names are synthetic: a mix of known, compound (.tar.gz), unknown and extensionless
+# names, so every path through the lookup is exercised. Nothing is read from disk.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classifier import FILE_CATEGORIES, FileClassifier  # noqa: E402
+
+
+def make_names(count, seed=1):
+    # Distinct names are reused, like a real library where a few suffixes dominate
+    rng = random.Random(seed)
+    known = sorted(ext for exts in FILE_CATEGORIES.values() for ext in exts)
+    names = []
+    for i in range(min(count, 10000)):
+        roll = rng.random()
+        if roll < 0.8:
+            ext = rng.choice(known).upper() if rng.random() < 0.1 else rng.choice(known)
+        elif roll < 0.9:
+            ext = ".backup" + rng.choice(known)
+        elif roll < 0.97:
+            ext = rng.choice([".part", ".tmp", ".crdownload", ".bak"])
+        else:
+            ext = ""
+        names.append(f"/data/inbox/file_{i}{ext}")
+    return names
+
+
+def legacy_category(file_path):
+    # get_file_category before classifier.py
+    ext = Path(file_path).suffix.lower()
+    for category, extensions in FILE_CATEGORIES.items():
+        if ext in extensions:
+            return category
+    return 'Other'
+
+
+def bench(name, lookup, names, lookups, repeat):
+    best = None
+    rounds, rest = divmod(lookups, len(names))
+    tail = names[:rest]
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for path in names:
+                lookup(path)
+        for path in tail:
+            lookup(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        'classifier': name,
+        'lookups': lookups,
+        'seconds_per_million': round(best * 1000000 / lookups, 3),
+        'ns_per_lookup': round(best * 1e9 / lookups, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark file categorization")
+    parser.add_argument("--lookups", type=int, default=1000000, help="lookups per pass (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="passes per classifier, best is kept")
+    parser.add_argument("--rules", default=None, help="category rules file to compile into the classifier")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    names = make_names(args.lookups)
+    classifier = FileClassifier.from_file(args.rules)
+
+    # Both must agree wherever the old table had a single answer
+    differences = sum(1 for path in names if legacy_category(path) != classifier.category(path, sniff=False))
+
+    results = [
+        bench("legacy scan", legacy_category, names, args.lookups, args.repeat),
+        bench("compiled", lambda path: classifier.category(path, sniff=False), names, args.lookups, args.repeat),
+    ]
+
+    if args.json:
+        print(json.dumps({'results': results, 'differences': differences}, indent=2))
+        return 0
+
+    print(f"{args.lookups} lookups over {len(names)} distinct names")
+    print(f"{'classifier':<12} {'s/million':>10} {'ns/lookup':>10}")
+    for row in results:
+        print(f"{row['classifier']:<12} {row['seconds_per_million']:>10} {row['ns_per_lookup']:>10}")
+    print(f"Names classified differently: {differences} (compound suffixes and rules)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
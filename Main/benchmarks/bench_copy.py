@@ -0,0 +1,101 @@
+# File Organizer - Copy Benchmark
+# Compares shutil.copy2 with each method of copy_engine.py on synthetic files
+# Usage (from the Main folder): python benchmarks/bench_copy.py [--dir FOLDER] [--files 20] [--size-mb 64] [--json]
+#
+# Reflinks only work when source and copy are on a filesystem that supports them (Btrfs,
+# XFS with reflink=1, ...) - point --dir at such a volume to see that path. Source files
+# are read once before timing, so numbers are for page-cache-warm data.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from copy_engine import available_methods, copy_file  # noqa: E402
+
+
+def make_files(folder, count, size_mb):
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"source_{i}.bin")
+        with open(path, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+        paths.append(path)
+    return paths
+
+
+def bench(name, copy, paths, folder, total_mb, repeat):
+    # Best of repeat rounds copying every file - returns a result row
+    best = None
+    used = {}
+    for round_number in range(repeat):
+        target = os.path.join(folder, f"{name}_{round_number}")
+        os.makedirs(target)
+        start = time.perf_counter()
+        for path in paths:
+            method = copy(path, os.path.join(target, os.path.basename(path)))
+            used[method] = used.get(method, 0) + 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        shutil.rmtree(target)
+    supported = any(method is not None for method in used)
+    return {
+        'method': name,
+        'seconds': round(best, 4) if supported else None,
+        'mb_per_s': round(total_mb / best, 1) if supported else None,
+        'paths_taken': {str(method): count // repeat for method, count in used.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark file copy methods")
+    parser.add_argument("--dir", default=None, help="folder to run in (default: system temp folder)")
+    parser.add_argument("--files", type=int, default=20, help="files per round (default: %(default)s)")
+    parser.add_argument("--size-mb", type=int, default=64, help="size of each file (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="rounds per method, best is kept")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    total_mb = args.files * args.size_mb
+    with tempfile.TemporaryDirectory(prefix="organizer_bench_", dir=args.dir) as folder:
+        paths = make_files(folder, args.files, args.size_mb)
+
+        # Warm the page cache
+        for path in paths:
+            with open(path, 'rb') as f:
+                while f.read(1024 * 1024):
+                    pass
+
+        def copy2(src, dst):
+            shutil.copy2(src, dst)
+            return "shutil.copy2"
+
+        results = [bench("shutil.copy2", copy2, paths, folder, total_mb, args.repeat),
+                   bench("auto", copy_file, paths, folder, total_mb, args.repeat)]
+        for method in available_methods():
+            results.append(bench(method, lambda src, dst: copy_file(src, dst, [method]),
+                                 paths, folder, total_mb, args.repeat))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{args.files} files of {args.size_mb} MB")
+    print(f"{'method':<16} {'MB/s':>10}  paths taken")
+    for row in results:
+        taken = ", ".join(f"{method}: {count}" for method, count in row['paths_taken'].items())
+        print(f"{row['method']:<16} {str(row['mb_per_s']):>10}  {taken}")
+    print("(None means the method is not supported for this folder)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# File Organizer - EXIF Date Benchmark
+# Times capture-date extraction with exif_reader.py against Pillow (when installed)
+# Usage (from the Main folder): python benchmarks/bench_exif.py [--corpus FOLDER] [--files 500] [--json]
+#
+# Without --corpus a folder of synthetic JPEGs is generated: a real APP1/EXIF header with
+# DateTimeOriginal, followed by random "image data" of --size-kb.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exif_reader import ExifFormatError, read_exif_date  # noqa: E402
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.tiff', '.tif', '.webp', '.heic', '.heif'}
+
+
+def make_exif_jpeg(path, date_text, size_kb):
+    # Little-endian TIFF: IFD0 with DateTime + Exif IFD pointer, Exif IFD with DateTimeOriginal
+    date = date_text.encode('ascii') + b'\x00'
+    ifd0_offset = 8
+    exif_ifd_offset = ifd0_offset + 2 + 2 * 12 + 4
+    dates_offset = exif_ifd_offset + 2 + 12 + 4
+
+    tiff = b'II*\x00' + struct.pack('<I', ifd0_offset)
+    tiff += struct.pack('<H', 2)
+    tiff += struct.pack('<HHII', 0x0132, 2, len(date), dates_offset)
+    tiff += struct.pack('<HHII', 0x8769, 4, 1, exif_ifd_offset)
+    tiff += struct.pack('<I', 0)
+    tiff += struct.pack('<H', 1)
+    tiff += struct.pack('<HHII', 0x9003, 2, len(date), dates_offset + len(date))
+    tiff += struct.pack('<I', 0)
+    tiff += date + date
+
+    app1 = b'Exif\x00\x00' + tiff
+    with open(path, 'wb') as f:
+        f.write(b'\xff\xd8')
+        f.write(b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')
+        f.write(b'\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1)
+        f.write(b'\xff\xda' + struct.pack('>H', 8) + b'\x01\x01\x00\x00\x3f\x00')
+        f.write(os.urandom(size_kb * 1024))
+        f.write(b'\xff\xd9')
+
+
+def make_corpus(folder, count, size_kb):
+    paths = []
+    for i in range(count):
+        path = os.path.join(folder, f"IMG_{i:05d}.jpg")
+        make_exif_jpeg(path, f"2023:{i % 12 + 1:02d}:{i % 28 + 1:02d} 12:00:00", size_kb)
+        paths.append(path)
+    return paths
+
+
+def list_corpus(folder):
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                paths.append(os.path.join(root, name))
+    return paths
+
+
+def with_exif_reader(path):
+    try:
+        return read_exif_date(path)
+    except (ExifFormatError, OSError):
+        return None
+
+
+def with_pillow(path):
+    try:
+        with Image.open(path) as image:
+            exif = image.getexif()
+            value = exif.get_ifd(0x8769).get(0x9003) or exif.get(0x0132)
+        return value
+    except Exception:
+        return None
+
+
+def bench(name, func, paths, repeat):
+    # Best of repeat passes over the whole corpus
+    best = None
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(1 for path in paths if func(path) is not None)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        'reader': name,
+        'files': len(paths),
+        'with_date': found,
+        'seconds': round(best, 4),
+        'files_per_s': round(len(paths) / best, 1) if best else None,
+        'us_per_file': round(best / len(paths) * 1e6, 1) if paths else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark EXIF date extraction")
+    parser.add_argument("--corpus", help="folder of real images to use instead of synthetic JPEGs")
+    parser.add_argument("--files", type=int, default=500, help="synthetic files to generate (default: %(default)s)")
+    parser.add_argument("--size-kb", type=int, default=512, help="size of each synthetic file (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="passes per reader, best is kept")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="organizer_bench_") as folder:
+        if args.corpus:
+            paths = list_corpus(args.corpus)
+        else:
+            paths = make_corpus(folder, args.files, args.size_kb)
+
+        if not paths:
+            print("No images found")
+            return 1
+
+        results = [bench('exif_reader', with_exif_reader, paths, args.repeat)]
+        if Image is not None:
+            results.append(bench('pillow', with_pillow, paths, args.repeat))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{len(paths)} images{' from ' + args.corpus if args.corpus else ' (synthetic)'}")
+    print(f"{'reader':<12} {'with date':>10} {'files/s':>12} {'us/file':>10}")
+    for row in results:
+        print(f"{row['reader']:<12} {row['with_date']:>10} {row['files_per_s']:>12} {row['us_per_file']:>10}")
+    if Image is None:
+        print("(Pillow not installed - only exif_reader was timed)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+# File Organizer - Organize Benchmark Suite
+# Runs whole organize passes over reproducible synthetic trees and reports throughput and
+# resource use as JSON, so results can be compared between versions
+# Usage (from the Main folder): python benchmarks/bench_organize.py [--corpus mixed photos ...]
+#                               [--files 1000] [--operations move copy dry-run] [--out FILE]
+#
+# Corpora - the same --seed always builds the same tree:
+#   mixed       - every category, sizes log-uniform between --min-kb and --max-kb
+#   photos      - JPEGs with an EXIF capture date (see bench_exif.py)
+#   collisions  - a few file names repeated in many folders, every third file a duplicate
+#   deep        - files spread down a chain of --depth nested folders
+#   wide        - files spread over many sibling folders, a handful in each
+#
+# Every organization method x duplicate mode x operation runs as its own case, plus three
+# stage cases per corpus: "hash" (hash_file of every file), "date" (get_file_date of every
+# file) and "watch" (every file fed to the watch queue at once, timed until it is drained).
+# Each case runs in a child process on a fresh hard-linked copy of the tree, so peak RSS
+# and I/O counts belong to that case alone.
+#
+# Reported per case: seconds, files/s, MB/s, cpu seconds, peak RSS, and the read/write
+# syscall counts and bytes of /proc/self/io (Linux only - null elsewhere). Open, stat and
+# rename calls are not in those counts.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_exif import make_exif_jpeg  # noqa: E402
+from classifier import FILE_CATEGORIES  # noqa: E402
+from duplicates import DEDUPE_MODES  # noqa: E402
+from hashing import DEFAULT_ALGORITHM, hash_file  # noqa: E402
+from organizer_engine import DEFAULT_WORKERS, ORGANIZATION_METHODS, OrganizerEngine, OrganizerOptions  # noqa: E402
+from watch_queue import WatchQueue  # noqa: E402
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+CORPORA = ["mixed", "photos", "collisions", "deep", "wide"]
+
+OPERATIONS = ["move", "copy", "dry-run"]
+
+# "off" plus every dedupe mode of duplicates.py (duplicates are skipped)
+DUPLICATE_MODES = ["off"] + DEDUPE_MODES
+
+STAGES = ["hash", "date", "watch"]
+
+# Names reused over and over by the collisions corpus
+COLLIDING_NAMES = ["IMG_0001.jpg", "IMG_0002.jpg", "scan.pdf", "report.docx", "notes.txt",
+                   "data.csv", "track01.mp3", "setup.exe", "backup.zip", "video.mp4"]
+
+# File mtimes are spread over these years, so the Date method makes many folders
+FIRST_YEAR = 2019
+LAST_YEAR = 2024
+
+
+# ===== CORPORA =====
+
+def random_time(rng):
+    start = datetime(FIRST_YEAR, 1, 1).timestamp()
+    end = datetime(LAST_YEAR, 12, 31).timestamp()
+    return rng.uniform(start, end)
+
+
+def random_size(rng, min_kb, max_kb):
+    # Log-uniform - many small files, a few large ones
+    return int(math.exp(rng.uniform(math.log(min_kb), math.log(max_kb))) * 1024)
+
+
+def write_file(path, index, size, noise):
+    # A unique first line, then noise - sizes above the noise block repeat it
+    with open(path, 'wb') as f:
+        head = f"file {index}\n".encode('ascii')
+        f.write(head)
+        left = max(0, size - len(head))
+        while left:
+            block = noise[:left]
+            f.write(block)
+            left -= len(block)
+
+
+def make_corpus(folder, kind, files, seed=1, min_kb=1, max_kb=4096, depth=12):
+    # Build the tree in folder - returns (file count, total bytes)
+    rng = random.Random(seed)
+    noise = bytes(rng.getrandbits(8) for _ in range(64 * 1024))
+    suffixes = sorted(ext for exts in FILE_CATEGORIES.values() for ext in exts if ext.count('.') == 1)
+    total = 0
+    written = []
+    for i in range(files):
+        if kind == "deep":
+            levels = rng.randint(0, depth)
+            subfolder = os.path.join(*[f"level_{n}" for n in range(levels)]) if levels else ""
+        elif kind == "wide":
+            subfolder = f"folder_{rng.randrange(max(1, files // 4)):05d}"
+        elif kind == "collisions":
+            subfolder = f"batch_{i // len(COLLIDING_NAMES):05d}"
+        else:
+            subfolder = f"inbox_{i % 10}"
+        target = os.path.join(folder, subfolder)
+        os.makedirs(target, exist_ok=True)
+
+        if kind == "photos":
+            name = f"IMG_{i:05d}.jpg"
+        elif kind == "collisions":
+            name = COLLIDING_NAMES[i % len(COLLIDING_NAMES)]
+        else:
+            name = f"file_{i:05d}{rng.choice(suffixes)}"
+        path = os.path.join(target, name)
+
+        if kind == "photos":
+            taken = datetime.fromtimestamp(random_time(rng))
+            make_exif_jpeg(path, taken.strftime("%Y:%m:%d %H:%M:%S"), max(1, random_size(rng, min_kb, max_kb) // 1024))
+        elif kind == "collisions" and i % 3 == 2 and written:
+            shutil.copyfile(rng.choice(written), path)
+        else:
+            write_file(path, i, random_size(rng, min_kb, max_kb), noise)
+        mtime = random_time(rng)
+        os.utime(path, (mtime, mtime))
+        written.append(path)
+        total += os.path.getsize(path)
+    return files, total
+
+
+def link_tree(source, target):
+    # Working copy of a corpus - hard links where the filesystem has them
+    def link_or_copy(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    shutil.copytree(source, target, copy_function=link_or_copy)
+
+
+def list_files(folder):
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            paths.append(os.path.join(root, name))
+    return paths
+
+
+# ===== MEASURING =====
+
+def read_proc_io():
+    # Counters of /proc/self/io (all threads of this process), or None
+    try:
+        with open("/proc/self/io", 'r') as f:
+            return {key: int(value) for key, value in (line.split(':') for line in f)}
+    except (OSError, ValueError):
+        return None
+
+
+def usage():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF)
+
+
+def peak_rss_mb(rusage):
+    if rusage is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(rusage.ru_maxrss / scale, 1)
+
+
+def measure(func):
+    # Run func() - returns (its result, the measurements)
+    io_before = read_proc_io()
+    usage_before = usage()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    io_after = read_proc_io()
+    usage_after = usage()
+
+    stats = {'seconds': round(seconds, 4), 'peak_rss_mb': peak_rss_mb(usage_after)}
+    if usage_after is not None:
+        cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+        stats['cpu_seconds'] = round(cpu, 3)
+    else:
+        stats['cpu_seconds'] = None
+    if io_before is not None and io_after is not None:
+        stats['read_syscalls'] = io_after['syscr'] - io_before['syscr']
+        stats['write_syscalls'] = io_after['syscw'] - io_before['syscw']
+        stats['bytes_read'] = io_after['rchar'] - io_before['rchar']
+        stats['bytes_written'] = io_after['wchar'] - io_before['wchar']
+    else:
+        stats.update(read_syscalls=None, write_syscalls=None, bytes_read=None, bytes_written=None)
+    return result, stats
+
+
+# ===== CASES (child process) =====
+
+def make_engine(case, **options):
+    options = OrganizerOptions(source=case['source'], dest=case['dest'], workers=case['workers'], **options)
+    return OrganizerEngine(options,
+                           log_file=os.path.join(case['scratch'], "undo_log.jsonl"),
+                           cache_file=os.path.join(case['scratch'], "metadata.sqlite"))
+
+
+def run_organize(case):
+    duplicates = case['duplicates']
+    engine = make_engine(
+        case,
+        method=case['method'],
+        operation="copy" if case['operation'] == "copy" else "move",
+        dry_run=case['operation'] == "dry-run",
+        detect_duplicates=duplicates != "off",
+        dedupe_mode=duplicates if duplicates != "off" else "tiered",
+    )
+    try:
+        summary, stats = measure(engine.run)
+    finally:
+        engine.close()
+    stats['organized'] = summary['organized']
+    stats['duplicates_found'] = summary['duplicates']
+    stats['errors'] = summary['errors']
+    return stats
+
+
+def run_stage(case):
+    stage = case['stage']
+    paths = list_files(case['source'])
+    engine = make_engine(case, method="Date", operation="move")
+    try:
+        if stage == "hash":
+            result, stats = measure(lambda: sum(1 for path in paths if hash_file(path, DEFAULT_ALGORITHM)))
+        elif stage == "date":
+            result, stats = measure(lambda: sum(1 for path in paths if engine.get_file_date(path)))
+        else:
+            result, stats = measure(lambda: feed_watch_queue(engine, paths, case['workers']))
+    finally:
+        engine.close()
+    stats['processed'] = result
+    return stats
+
+
+def feed_watch_queue(engine, paths, workers):
+    # Every file arrives at once, closed by its writer - returns the files processed
+    engine.open_duplicate_index()
+    engine.start_undo_batch(f"watch benchmark → {engine.options.dest}")
+    queue = WatchQueue(engine.process_single_file, 0.0, workers=workers, process_batch=engine.process_batch)
+    try:
+        for path in paths:
+            queue.notify(path, closed=True)
+        while len(queue):
+            time.sleep(0.01)
+    finally:
+        queue.stop()
+    return queue.stats['processed']
+
+
+def run_case(case):
+    # Child process: run one case and print its measurements as one JSON line
+    stats = run_stage(case) if case.get('stage') else run_organize(case)
+    seconds = stats['seconds']
+    stats['files_per_s'] = round(case['files'] / seconds, 1) if seconds else None
+    stats['mb_per_s'] = round(case['bytes'] / seconds / (1024 * 1024), 1) if seconds else None
+    print(json.dumps(stats))
+    return 0
+
+
+# ===== SUITE (parent process) =====
+
+def run_child(case):
+    command = [sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    # Commit of the code being measured, to tell results of different versions apart
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, universal_newlines=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def build_cases(args):
+    cases = []
+    for method in args.methods:
+        for duplicates in args.duplicates:
+            for operation in args.operations:
+                cases.append({'method': method, 'duplicates': duplicates, 'operation': operation})
+    cases.extend({'stage': stage} for stage in args.stages)
+    return cases
+
+
+def describe(case):
+    if case.get('stage'):
+        return f"stage {case['stage']}"
+    return f"{case['method']} / duplicates {case['duplicates']} / {case['operation']}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark whole organize runs on synthetic trees")
+    parser.add_argument("--corpus", nargs="+", default=["mixed"], choices=CORPORA, help="trees to build (default: mixed)")
+    parser.add_argument("--files", type=int, default=1000, help="files per tree (default: %(default)s)")
+    parser.add_argument("--min-kb", type=int, default=1, help="smallest file (default: %(default)s)")
+    parser.add_argument("--max-kb", type=int, default=4096, help="largest file (default: %(default)s)")
+    parser.add_argument("--depth", type=int, default=12, help="nesting of the deep tree (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the trees (default: %(default)s)")
+    parser.add_argument("--methods", nargs="+", default=ORGANIZATION_METHODS, choices=ORGANIZATION_METHODS)
+    parser.add_argument("--duplicates", nargs="+", default=DUPLICATE_MODES, choices=DUPLICATE_MODES)
+    parser.add_argument("--operations", nargs="+", default=OPERATIONS, choices=OPERATIONS)
+    parser.add_argument("--stages", nargs="*", default=STAGES, choices=STAGES,
+                        help="stage cases to run besides the organize cases (default: all)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="engine workers (default: %(default)s)")
+    parser.add_argument("--dir", default=None, help="folder to build the trees in (default: system temp folder)")
+    parser.add_argument("--out", default=None, help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--case", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        return run_case(json.loads(args.case))
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': datetime.now().isoformat(),
+        'settings': {'files': args.files, 'min_kb': args.min_kb, 'max_kb': args.max_kb, 'depth': args.depth,
+                     'seed': args.seed, 'workers': args.workers},
+        'results': [],
+    }
+    cases = build_cases(args)
+    with tempfile.TemporaryDirectory(prefix="organizer_bench_", dir=args.dir) as folder:
+        for kind in args.corpus:
+            pristine = os.path.join(folder, f"corpus_{kind}")
+            files, total_bytes = make_corpus(pristine, kind, args.files, args.seed, args.min_kb, args.max_kb, args.depth)
+            sys.stderr.write(f"{kind}: {files} files, {total_bytes / (1024 * 1024):.1f} MB\n")
+            for case in cases:
+                work = os.path.join(folder, "work")
+                link_tree(pristine, os.path.join(work, "source"))
+                os.makedirs(os.path.join(work, "scratch"))
+                child_case = dict(case, corpus=kind, files=files, bytes=total_bytes, workers=args.workers,
+                                  source=os.path.join(work, "source"), dest=os.path.join(work, "dest"),
+                                  scratch=os.path.join(work, "scratch"))
+                row = dict(case, corpus=kind, files=files, bytes=total_bytes)
+                row.update(run_child(child_case))
+                report['results'].append(row)
+                sys.stderr.write(f"  {describe(case):<45} {row.get('files_per_s', row.get('error'))} files/s\n")
+                shutil.rmtree(work)
+            shutil.rmtree(pristine)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
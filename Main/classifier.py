@@ -0,0 +1,205 @@
+# File Organizer - File Classifier
+# Decides the category of a file from its name, built once from the category table and
+# the user's rules instead of searching every category's extensions for every file
+#
+# Order of the checks:
+#   patterns   - user glob/regex rules on the file name, first match wins
+#   suffixes   - one dict lookup per dot in the name, longest suffix first, so a compound
+#                suffix like ".tar.gz" wins over ".gz"
+#   magic      - optional: the first bytes of files without any suffix
+# An extension listed under two categories goes to the first one in table order; user
+# extension rules replace the table's entry.
+#
+# Rules file (JSON, every key optional):
+#   {"extensions": {".tar.gz": "Archives", ".dmg": "Executables"},
+#    "patterns": [{"glob": "Screenshot*", "category": "Screenshots"},
+#                 {"regex": "^IMG_\\d+\\.jpe?g$", "category": "Camera"}],
+#    "sniff_extensionless": true}
+# Glob patterns match the whole file name, ignoring case; regexes are searched for in the
+# file name as written. Each pattern is compiled on its own, so inline flags like (?i) and
+# backreferences work; a pattern rule that can't be used is skipped and reported in errors.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import fnmatch
+import json
+import os
+import re
+
+
+CATEGORY_RULES_FILE = "file_organizer_categories.json"
+
+# File type categories
+FILE_CATEGORIES = {
+    'Images': {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic', '.svg', '.raw', '.cr2', '.nef', '.ico'},
+    'Videos': {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg', '.3gp', '.f4v'},
+    'Audio': {'.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma', '.m4a', '.opus', '.aiff', '.ape'},
+    'Documents': {'.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.pages', '.tex', '.wpd', '.md'},
+    'Spreadsheets': {'.xls', '.xlsx', '.csv', '.ods', '.numbers', '.tsv'},
+    'Presentations': {'.ppt', '.pptx', '.key', '.odp'},
+    'Archives': {'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso', '.dmg',
+                 '.tar.gz', '.tar.bz2', '.tar.xz', '.tgz'},
+    'Code': {'.py', '.js', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.html', '.css', '.xml', '.json', '.yaml', '.yml'},
+    # .dmg disk images are Archives - they used to be listed here too, which left the
+    # category up to dict order
+    'Executables': {'.exe', '.msi', '.app', '.deb', '.rpm', '.apk', '.pkg'},
+    'Fonts': {'.ttf', '.otf', '.woff', '.woff2', '.eot'},
+    'Database': {'.db', '.sqlite', '.sql', '.mdb', '.accdb'},
+    'Other': set()
+}
+
+# Leading bytes of common formats, for files without a suffix
+MAGIC_NUMBERS = [
+    (b'\xff\xd8\xff', 'Images'),
+    (b'\x89PNG\r\n\x1a\n', 'Images'),
+    (b'GIF87a', 'Images'),
+    (b'GIF89a', 'Images'),
+    (b'II*\x00', 'Images'),
+    (b'MM\x00*', 'Images'),
+    (b'%PDF-', 'Documents'),
+    (b'PK\x03\x04', 'Archives'),
+    (b'Rar!\x1a\x07', 'Archives'),
+    (b"7z\xbc\xaf'\x1c", 'Archives'),
+    (b'\x1f\x8b', 'Archives'),
+    (b'BZh', 'Archives'),
+    (b'\xfd7zXZ\x00', 'Archives'),
+    (b'ID3', 'Audio'),
+    (b'fLaC', 'Audio'),
+    (b'OggS', 'Audio'),
+    (b'\x1aE\xdf\xa3', 'Videos'),
+    (b'MZ', 'Executables'),
+    (b'\x7fELF', 'Executables'),
+    (b'SQLite format 3\x00', 'Database'),
+    (b'wOFF', 'Fonts'),
+    (b'wOF2', 'Fonts'),
+    (b'OTTO', 'Fonts'),
+]
+
+# RIFF containers - the form type at offset 8
+RIFF_TYPES = {b'WEBP': 'Images', b'WAVE': 'Audio', b'AVI ': 'Videos'}
+
+# ISO media (offset 4 "ftyp") - brands that are still images, everything else is video
+HEIF_BRANDS = {b'heic', b'heix', b'mif1', b'msf1', b'avif'}
+
+SNIFF_BYTES = 16
+
+
+class FileClassifier:
+    # Category of a file name - compiled once, safe to share between threads
+    def __init__(self, categories=None, rules=None):
+        rules = rules or {}
+        self.categories = {category: set(exts) for category, exts in (categories or FILE_CATEGORIES).items()}
+
+        # Suffix -> category, first category in table order wins
+        self.suffixes = {}
+        for category, extensions in self.categories.items():
+            for ext in extensions:
+                self.suffixes.setdefault(ext.lower(), category)
+        for ext, category in rules.get('extensions', {}).items():
+            ext = ext.lower() if ext.startswith('.') else '.' + ext.lower()
+            old = self.suffixes.get(ext)
+            if old is not None:
+                self.categories[old].discard(ext)
+            self.suffixes[ext] = category
+            self.categories.setdefault(category, set()).add(ext)
+
+        # (match function, category) per pattern rule, tried in order
+        self.patterns = []
+        self.errors = []  # Pattern rules that were skipped, by rule number
+        for number, rule in enumerate(rules.get('patterns', []), 1):
+            try:
+                self.patterns.append(self.compile_pattern(rule))
+            except (KeyError, TypeError, AttributeError, re.error) as e:
+                self.errors.append(f"pattern rule {number} skipped: {type(e).__name__}: {e}")
+                continue
+            self.categories.setdefault(rule['category'], set())
+
+        self.sniff = bool(rules.get('sniff_extensionless', False))
+        self.categories.setdefault('Other', set())
+
+    @staticmethod
+    def compile_pattern(rule):
+        # (match function, category) of one pattern rule
+        category = rule['category']
+        if not isinstance(category, str):
+            raise TypeError("category must be a string")
+        if 'glob' in rule:
+            return re.compile(fnmatch.translate(rule['glob']), re.IGNORECASE).match, category
+        # Searched anywhere in the name
+        return re.compile(rule['regex']).search, category
+
+    @classmethod
+    def from_file(cls, path):
+        # Classifier with the rules in path - the built-in table if the file doesn't exist
+        # Raises ValueError if the rules can't be used
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rules = json.load(f)
+            return cls(rules=rules)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, re.error) as e:
+            raise ValueError(f"Invalid category rules in {path}: {e}") from e
+
+    # ===== LOOKUPS =====
+
+    def suffix_category(self, name):
+        # Category from the suffix alone, or None
+        name = os.path.basename(name).lower()
+        suffixes = self.suffixes
+        # A leading dot is a hidden file, not a suffix
+        index = name.find('.', 1)
+        while index != -1:
+            category = suffixes.get(name[index:])
+            if category is not None:
+                return category
+            index = name.find('.', index + 1)
+        return None
+
+    def category(self, path, sniff=True):
+        # Category of the file at path - 'Other' if nothing matches
+        # sniff=False never opens the file (e.g. for a file still being written)
+        name = os.path.basename(path)
+        for match, category in self.patterns:
+            if match(name) is not None:
+                return category
+
+        category = self.suffix_category(name)
+        if category is not None:
+            return category
+
+        if sniff and self.sniff and name.find('.', 1) == -1:
+            category = self.sniff_file(path)
+            if category is not None:
+                return category
+        return 'Other'
+
+    def may_be(self, path, category):
+        # True unless the name already rules out category - undecided files (no suffix,
+        # sniffing enabled) pass, so this never opens the file
+        if self.category(path, sniff=False) == category:
+            return True
+        return self.sniff and os.path.basename(path).find('.', 1) == -1
+
+    def suffixes_for(self, category):
+        # Last suffixes (as os.path.splitext returns them) a file of category can have,
+        # or None if patterns or sniffing can put a file with any suffix in it
+        if self.patterns or self.sniff:
+            return None
+        return {'.' + ext.rsplit('.', 1)[1] for ext, owner in self.suffixes.items() if owner == category}
+
+    def sniff_file(self, path):
+        # Category from the first bytes of the file, or None
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return None
+        if head[:4] == b'RIFF':
+            return RIFF_TYPES.get(head[8:12])
+        if head[4:8] == b'ftyp':
+            return 'Images' if head[8:12] in HEIF_BRANDS else 'Videos'
+        for magic, category in MAGIC_NUMBERS:
+            if head.startswith(magic):
+                return category
+        return None
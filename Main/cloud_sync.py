@@ -0,0 +1,197 @@
+# File Organizer - Cloud Sync Queue
+# Copies organized files to the cloud drive folder in the background, so a slow
+# network-mounted cloud folder never holds up the organize run itself
+#
+# - A fixed number of workers upload at once (bounded concurrency)
+# - A failed upload is retried with exponential backoff before it counts as failed
+# - A file whose cloud copy already has the same size and mtime (or, when the full hash
+#   is known from the duplicate check, the same content) is skipped
+# - Each upload is written to a ".part" file and renamed into place, so an interrupted
+#   upload never leaves a half-written file under the real name
+# Counts (pending, completed, unchanged, failed) are kept apart from the run summary;
+# totals keeps them for the life of the queue (for live metrics).
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from copy_engine import copy_file
+from directory_cache import DirectoryCache
+from hashing import DEFAULT_ALGORITHM, hash_file
+from run_stats import NO_TIMER
+
+
+# Uploads running at the same time
+DEFAULT_CLOUD_WORKERS = 2
+
+# Attempts per file before it is reported as failed
+DEFAULT_ATTEMPTS = 4
+
+# Wait before the first retry - doubled for each further retry
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+# mtimes closer than this count as equal (FAT and some network drives keep 2 second mtimes)
+MTIME_TOLERANCE_NS = 2 * 1000 * 1000 * 1000
+
+
+class CloudSyncQueue:
+    # Background uploads of organized files - submit() never blocks on the cloud folder
+    def __init__(self, workers=DEFAULT_CLOUD_WORKERS, attempts=DEFAULT_ATTEMPTS,
+                 backoff_seconds=DEFAULT_BACKOFF_SECONDS, log=None):
+        self.attempts = max(1, attempts)
+        self.backoff_seconds = backoff_seconds
+        self.directories = DirectoryCache()  # Cloud folders created so far
+        self.log = log or (lambda message: None)
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.stats = {'pending': 0, 'completed': 0, 'unchanged': 0, 'failed': 0, 'retries': 0}
+        self.totals = {'completed': 0, 'unchanged': 0, 'failed': 0, 'retries': 0}  # never reset
+        self.methods = {}  # copy method -> files uploaded with it
+        self.failures = []  # (source, error) of files that failed every attempt
+        self.run_stats = None  # RunStats of the run the uploads belong to, if it is instrumented
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.closed = False
+
+    def submit(self, source_file, cloud_root, folder, file_hash=None, algorithm=DEFAULT_ALGORITHM):
+        # Queue an upload of source_file to cloud_root/folder/<same name>
+        # file_hash is the full hash of source_file if it is already known
+        with self.lock:
+            self.stats['pending'] += 1
+        self.pool.submit(self.upload, source_file, cloud_root, folder, file_hash, algorithm)
+
+    def __len__(self):
+        # Uploads queued or running
+        with self.lock:
+            return self.stats['pending']
+
+    def take_counts(self):
+        # Counts since the last call (pending is the current number of queued uploads)
+        with self.lock:
+            counts = dict(self.stats)
+            counts['methods'] = self.methods
+            counts['failures'] = self.failures
+            for key in ('completed', 'unchanged', 'failed', 'retries'):
+                self.stats[key] = 0
+            self.methods = {}
+            self.failures = []
+        return counts
+
+    # ===== WORKERS =====
+
+    def upload(self, source_file, cloud_root, folder, file_hash, algorithm):
+        outcome = 'failed'
+        method = None
+        error = None
+        cloud_file = os.path.join(cloud_root, folder, os.path.basename(source_file))
+        try:
+            if not os.path.isdir(cloud_root):
+                # Drive not mounted - never create the cloud folder ourselves
+                raise FileNotFoundError(f"Cloud drive folder not found: {cloud_root}")
+            for attempt in range(self.attempts):
+                if attempt:
+                    with self.lock:
+                        self.stats['retries'] += 1
+                        self.totals['retries'] += 1
+                    if self.run_stats is not None:
+                        self.run_stats.add('retries')
+                    time.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+                try:
+                    if self.unchanged(source_file, cloud_file, file_hash, algorithm):
+                        outcome = 'unchanged'
+                    else:
+                        run_stats = self.run_stats
+                        with run_stats.stage('cloud_upload') if run_stats is not None else NO_TIMER:
+                            method = self.copy(source_file, cloud_file)
+                        if run_stats is not None:
+                            run_stats.add('cloud_bytes', os.path.getsize(cloud_file))
+                        outcome = 'completed'
+                    break
+                except FileNotFoundError as e:
+                    if not os.path.exists(source_file):
+                        # The organized file is gone (undone, deleted) - nothing to retry
+                        error = e
+                        break
+                    error = e
+                except OSError as e:
+                    error = e
+        except Exception as e:
+            error = e
+        finally:
+            with self.lock:
+                self.stats['pending'] -= 1
+                self.stats[outcome] += 1
+                self.totals[outcome] += 1
+                if method:
+                    self.methods[method] = self.methods.get(method, 0) + 1
+                if outcome == 'failed':
+                    self.failures.append((source_file, str(error)))
+                self.idle.notify_all()
+
+        filename = os.path.basename(source_file)
+        if outcome == 'completed':
+            self.log(f"☁️ Synced to cloud: {filename}")
+        elif outcome == 'unchanged':
+            self.log(f"☁️ Already in cloud: {filename}")
+        else:
+            self.log(f"⚠️ Cloud sync failed for {filename}: {str(error)}")
+
+    def unchanged(self, source_file, cloud_file, file_hash, algorithm):
+        # True if the cloud copy already matches the source
+        try:
+            cloud_st = os.stat(cloud_file)
+        except FileNotFoundError:
+            return False
+        st = os.stat(source_file)
+        if cloud_st.st_size != st.st_size:
+            return False
+        if abs(cloud_st.st_mtime_ns - st.st_mtime_ns) < MTIME_TOLERANCE_NS:
+            return True
+        # Same size, different mtime - only the content can tell, and only if it is cheap
+        # to know for the source
+        return file_hash is not None and hash_file(cloud_file, algorithm) == file_hash
+
+    def copy(self, source_file, cloud_file):
+        # Copy to a temporary name in the cloud folder, then rename into place
+        folder = os.path.dirname(cloud_file)
+        self.directories.ensure(folder)
+        part_file = cloud_file + ".part"
+        try:
+            method = copy_file(source_file, part_file)
+            os.replace(part_file, cloud_file)
+        except FileNotFoundError:
+            # The cloud folder may have been removed behind our back
+            self.directories.forget(folder)
+            self.remove_part(part_file)
+            raise
+        except BaseException:
+            self.remove_part(part_file)
+            raise
+        return method
+
+    def remove_part(self, part_file):
+        try:
+            os.remove(part_file)
+        except OSError:
+            pass
+
+    # ===== WAITING =====
+
+    def wait(self, timeout=None):
+        # Block until every queued upload has finished - returns False on timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while self.stats['pending']:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.idle.wait(remaining)
+        return True
+
+    def close(self, wait=True):
+        # Stop accepting uploads - queued ones are finished when wait is True
+        if not self.closed:
+            self.closed = True
+            self.pool.shutdown(wait=wait)
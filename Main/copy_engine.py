@@ -0,0 +1,224 @@
+# File Organizer - Copy Engine
+# File copies for copy mode and cloud sync, using the cheapest method the filesystem allows
+#
+# Methods, tried in this order:
+#   reflink         - FICLONE ioctl: the copy shares the original's blocks (Btrfs, XFS, ...),
+#                     close to free whatever the file size (Linux)
+#   copy_file_range - kernel-side copy, bytes never pass through userspace (Linux)
+#   sendfile        - kernel-side copy between two files (Linux)
+#   buffered        - readinto/write loop with one reusable buffer (everywhere)
+# A method that isn't supported for a pair of files falls through to the next one.
+# Metadata is copied afterwards with shutil.copystat, like shutil.copy2 does.
+#
+# move_file() renames when source and destination share a filesystem (st_dev). Across
+# filesystems it copies with copy_file(), syncs the copy to disk, reads the copy back and
+# compares its hash with the source's content hash, and only then deletes the source. The
+# content hash is the one the caller already knows (duplicate detection), or else it is
+# taken while the copy streams past (copy_with_hash).
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import errno
+import os
+import shutil
+import sys
+
+from hashing import DEFAULT_ALGORITHM, copy_with_hash, hash_file
+
+try:
+    import fcntl
+except ImportError:
+    # Windows - no reflinks
+    fcntl = None
+
+
+COPY_METHODS = ["reflink", "copy_file_range", "sendfile", "buffered"]
+
+# Buffer for the buffered method
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Chunk handed to copy_file_range/sendfile per call
+KERNEL_COPY_CHUNK = 64 * 1024 * 1024
+
+# ioctl request number of FICLONE on Linux
+FICLONE = 0x40049409
+
+IS_LINUX = sys.platform.startswith('linux')
+
+# Errors meaning "this method doesn't work for these files" rather than a real failure
+UNSUPPORTED_ERRORS = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EBADF, errno.EPERM,
+    getattr(errno, 'EOPNOTSUPP', errno.EINVAL), getattr(errno, 'ENOTSUP', errno.EINVAL),
+}
+
+
+class CopyMethodUnsupported(Exception):
+    # Raised inside the engine when a method can't copy this pair of files
+    pass
+
+
+def available_methods():
+    # Copy methods this platform can attempt
+    methods = []
+    if IS_LINUX and fcntl is not None:
+        methods.append("reflink")
+    if IS_LINUX and hasattr(os, 'copy_file_range'):
+        methods.append("copy_file_range")
+    if IS_LINUX and hasattr(os, 'sendfile'):
+        methods.append("sendfile")
+    methods.append("buffered")
+    return methods
+
+
+def copy_file(src, dst, methods=None, copy_metadata=True, sync=False):
+    # Copy src to dst with the first method that works - returns the method's name,
+    # or None if none of the given methods could copy these files (dst is then removed)
+    # sync=True makes the copy durable (fsync) before returning
+    # Real I/O errors (missing source, disk full, ...) are raised as OSError
+    methods = [m for m in (methods or COPY_METHODS) if m in available_methods()]
+    size = os.stat(src).st_size
+
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb', buffering=0) as fdst:
+        used = None
+        for method in methods:
+            try:
+                COPIERS[method](fsrc.fileno(), fdst.fileno(), size)
+                used = method
+                break
+            except CopyMethodUnsupported:
+                # Start the next method from a clean, empty destination
+                os.lseek(fsrc.fileno(), 0, os.SEEK_SET)
+                os.lseek(fdst.fileno(), 0, os.SEEK_SET)
+                os.ftruncate(fdst.fileno(), 0)
+        if used is not None and sync:
+            os.fsync(fdst.fileno())
+
+    if used is None:
+        os.remove(dst)
+        return None
+    if copy_metadata:
+        shutil.copystat(src, dst)
+    return used
+
+
+def move_file(src, dst, same_device=None, methods=None, content_hash=None, algorithm=DEFAULT_ALGORITHM):
+    # Move src to dst - returns "rename", or the copy method used for a cross-device move
+    # same_device is True/False when known from st_dev, None to let the rename find out
+    # content_hash is the source's full-content hash (with algorithm), if already known
+    # dst is never overwritten by a rename where the platform can refuse (Windows)
+    if same_device is not False:
+        try:
+            os.rename(src, dst)
+            return "rename"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    return _move_across_devices(src, dst, methods, content_hash, algorithm)
+
+
+def _move_across_devices(src, dst, methods, content_hash, algorithm):
+    # Copy, verify, then delete the source - the source is kept if anything goes wrong
+    before = os.stat(src)
+    if content_hash is None:
+        # Nothing known about the content - hash the bytes as they are copied
+        content_hash = copy_with_hash(src, dst, algorithm)
+        method = "buffered"
+        _sync(dst)
+    else:
+        method = copy_file(src, dst, methods, sync=True)
+        if method is None:
+            raise OSError(errno.EXDEV, "No copy method could move the file across filesystems", src)
+    try:
+        after = os.stat(src)
+        copied = os.stat(dst)
+        if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            raise OSError(errno.EAGAIN, "File changed while it was being moved", src)
+        if copied.st_size != before.st_size:
+            raise OSError(errno.EIO, f"Copy is {copied.st_size} bytes, expected {before.st_size}", dst)
+        # Same length is not enough - a torn or corrupted copy must never cost the original
+        if hash_file(dst, algorithm) != content_hash:
+            raise OSError(errno.EIO, "Copy doesn't match the original's content", dst)
+    except BaseException:
+        os.remove(dst)
+        raise
+    os.remove(src)
+    return method
+
+
+def _sync(path):
+    # Make a finished copy durable
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+
+def _unsupported(error):
+    return isinstance(error, OSError) and error.errno in UNSUPPORTED_ERRORS
+
+
+def _copy_reflink(src_fd, dst_fd, size):
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError as e:
+        if _unsupported(e):
+            raise CopyMethodUnsupported() from e
+        raise
+
+
+def _copy_file_range(src_fd, dst_fd, size):
+    copied = 0
+    while True:
+        try:
+            count = os.copy_file_range(src_fd, dst_fd, KERNEL_COPY_CHUNK)
+        except OSError as e:
+            if copied == 0 and _unsupported(e):
+                raise CopyMethodUnsupported() from e
+            raise
+        if count == 0:
+            break
+        copied += count
+    if copied == 0 and size > 0:
+        # Some filesystems (procfs, FUSE, ...) report nothing copied instead of failing
+        raise CopyMethodUnsupported()
+
+
+def _copy_sendfile(src_fd, dst_fd, size):
+    copied = 0
+    while True:
+        try:
+            count = os.sendfile(dst_fd, src_fd, copied, KERNEL_COPY_CHUNK)
+        except OSError as e:
+            if copied == 0 and _unsupported(e):
+                raise CopyMethodUnsupported() from e
+            raise
+        if count == 0:
+            break
+        copied += count
+    if copied == 0 and size > 0:
+        raise CopyMethodUnsupported()
+
+
+def _copy_buffered(src_fd, dst_fd, size):
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    while True:
+        count = os.readv(src_fd, [buffer]) if hasattr(os, 'readv') else _read_into(src_fd, buffer)
+        if not count:
+            break
+        written = 0
+        while written < count:
+            written += os.write(dst_fd, view[written:count])
+
+
+def _read_into(fd, buffer):
+    # os.readv is not available on Windows
+    data = os.read(fd, len(buffer))
+    buffer[:len(data)] = data
+    return len(data)
+
+
+COPIERS = {
+    "reflink": _copy_reflink,
+    "copy_file_range": _copy_file_range,
+    "sendfile": _copy_sendfile,
+    "buffered": _copy_buffered,
+}
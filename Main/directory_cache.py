@@ -0,0 +1,57 @@
+# File Organizer - Directory Cache
+# Remembers which destination folders exist, so each Category/Year/Month_Year/Day_Month_Year
+# folder costs one os.makedirs per run instead of one per file placed in it
+#
+# The engine pre-creates every folder a chunk of planned files needs in one pass, so the
+# execute stage only does the rename/copy syscalls. The device (st_dev) of each folder is
+# remembered too, so a move can tell a same-filesystem rename from a cross-device copy.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import threading
+
+
+class DirectoryCache:
+    # Folders known to exist - safe to use from several workers at once
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.created = set()
+        self.devices = {}  # folder -> st_dev
+
+    def ensure(self, folder):
+        # Create folder (and its parents) unless it is already known to exist
+        if folder in self.created:
+            return
+        os.makedirs(folder, exist_ok=True)
+        with self.lock:
+            self.created.add(folder)
+
+    def ensure_all(self, folders):
+        # Create a batch of folders in one pass - parents first, each only once
+        # A folder that can't be created is left out; the file that needs it reports the error
+        with self.lock:
+            missing = sorted(set(folders) - self.created)
+        for folder in missing:
+            try:
+                self.ensure(folder)
+            except OSError:
+                pass
+
+    def device(self, folder):
+        # st_dev of an existing folder, or None if it can't be told
+        device = self.devices.get(folder)
+        if device is None:
+            try:
+                device = os.stat(folder).st_dev
+            except OSError:
+                return None
+            with self.lock:
+                self.devices[folder] = device
+        return device
+
+    def forget(self, folder):
+        # A folder vanished behind our back - it is created again on next use
+        with self.lock:
+            self.created.discard(folder)
+            self.devices.pop(folder, None)
@@ -0,0 +1,245 @@
+# File Organizer - Duplicate Index
+# Finds files with identical content without hashing every file
+#
+# Two modes:
+#   full   - every file gets a full-content hash (the original behaviour)
+#   tiered - files are grouped by size first; only files whose size collides get a
+#            partial hash of their first/last PARTIAL_HASH_BYTES (see hashing.py), and only files whose
+#            partial hash also collides get a full-content hash
+# On libraries where nearly every file has a unique size, tiered mode reads almost nothing.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import threading
+from collections import defaultdict
+
+from hashing import DEFAULT_ALGORITHM, PARTIAL_HASH_BYTES, hash_file, hash_file_ends, partial_covers_file
+from run_stats import NO_TIMER
+
+
+DEDUPE_MODES = ["tiered", "full"]
+
+
+class DuplicateIndex:
+    # Content index of every file placed (or planned) in the current run
+    #
+    # Records are dicts: path (where the bytes can be read right now), existing (the
+    # destination reported to the user), size, partial and hash (full-content hash).
+    # Hashes of known files are computed lazily, the first time a newcomer of the same
+    # size shows up.
+    #
+    # With a LibraryIndex attached, files already organized in the destination are
+    # loaded as records the first time their size comes up, and every hash computed
+    # for them (or for newly placed files) is written back so it is never computed again.
+    #
+    # algorithm is used for full-content hashes, partial_algorithm (default: the same) for
+    # the pre-filter tier. A fast non-cryptographic pre-filter is fine because every
+    # partial match is confirmed with the full hash.
+    def __init__(self, mode="tiered", library=None, algorithm=DEFAULT_ALGORITHM, partial_algorithm=None):
+        self.mode = mode if mode in DEDUPE_MODES else "tiered"
+        self.library = library
+        self.algorithm = algorithm
+        self.partial_algorithm = partial_algorithm or algorithm
+        self.by_size = defaultdict(list)
+        self.by_hash = {}
+        self.by_path = {}
+        self.loaded_sizes = set()  # Sizes already pulled in from the library
+        self.lock = threading.RLock()
+        self.stats = {'partial_hashes': 0, 'full_hashes': 0}
+        self.run_stats = None  # RunStats of the current run, if it is instrumented
+
+    def __len__(self):
+        return len(self.by_path)
+
+    # ===== LIBRARY =====
+
+    def _load_sizes(self, sizes):
+        # Pull library files of these sizes into the index (once per size)
+        if self.library is None:
+            return
+        with self.lock:
+            sizes = set(sizes) - self.loaded_sizes
+            if not sizes:
+                return
+            self.loaded_sizes.update(sizes)
+            for record in self.library.records_with_sizes(sizes):
+                self._insert(record)
+
+    def _insert(self, record):
+        self.by_size[record['size']].append(record)
+        self.by_path[record['path']] = record
+        if record['hash'] is not None:
+            self.by_hash.setdefault(record['hash'], record)
+
+    def _remember(self, record):
+        # Persist freshly computed hashes of a library file
+        if record.get('library'):
+            self.library.store_hashes(record['path'], record.get('partial'), record.get('hash'))
+
+    # ===== HASHING =====
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _timed(self, stage, size):
+        # Time a hash and count the bytes it reads, when the run is instrumented
+        if self.run_stats is None:
+            return NO_TIMER
+        self.run_stats.add('bytes_read', size)
+        return self.run_stats.stage(stage)
+
+    def _partial(self, item):
+        # Partial hash of a file info or record, computed once
+        if item.get('partial') is None:
+            size = item['size']
+            with self._timed('partial_hash', size if partial_covers_file(size) else 2 * PARTIAL_HASH_BYTES):
+                item['partial'] = hash_file_ends(item_path(item), size, self.partial_algorithm)
+            self._count('partial_hashes')
+            if self._partial_is_full(item['size']):
+                item['hash'] = item['partial']
+            self._remember(item)
+        return item['partial']
+
+    def _full(self, item):
+        # Full-content hash of a file info or record, computed once
+        if item.get('hash') is None:
+            with self._timed('full_hash', item['size']):
+                item['hash'] = hash_file(item_path(item), self.algorithm)
+            self._count('full_hashes')
+            self._remember(item)
+        return item['hash']
+
+    def _partial_is_full(self, size):
+        # The partial hash of a small file is its full hash - when both use the same algorithm
+        return partial_covers_file(size) and self.partial_algorithm == self.algorithm
+
+    def _try(self, func, item):
+        # Pre-hash for prepare() - failures are retried (and reported) by find()
+        try:
+            func(item)
+        except OSError:
+            pass
+
+    def prepare(self, pool, infos):
+        # Hash, in parallel on pool, exactly what find() will need for this batch of files
+        sizes = {info['size'] for info in infos}
+        self._load_sizes(sizes)
+
+        if self.mode == "full":
+            with self.lock:
+                known = [record for size in sizes for record in self.by_size.get(size, ())
+                         if record.get('hash') is None]
+            list(pool.map(lambda item: self._try(self._full, item), list(infos) + known))
+            return
+
+        with self.lock:
+            size_counts = defaultdict(int)
+            for info in infos:
+                size_counts[info['size']] += 1
+
+            # Tier 2: partial hashes wherever a size collides (in the batch or with known files)
+            colliding = [info for info in infos
+                         if size_counts[info['size']] > 1 or info['size'] in self.by_size]
+            known = [record for size in {info['size'] for info in colliding}
+                     for record in self.by_size.get(size, ())
+                     if record.get('partial') is None]
+
+        list(pool.map(lambda item: self._try(self._partial, item), colliding + known))
+
+        with self.lock:
+            # Tier 3: full hashes wherever size and partial hash still collide
+            groups = defaultdict(list)
+            for item in colliding:
+                groups[(item['size'], item.get('partial'))].append(item)
+            for size in {info['size'] for info in colliding}:
+                for record in self.by_size.get(size, ()):
+                    groups[(size, record.get('partial'))].append(record)
+
+            need_full = [item for (size, partial), items in groups.items()
+                         if partial is not None and len(items) > 1
+                         for item in items if item.get('hash') is None]
+
+        list(pool.map(lambda item: self._try(self._full, item), need_full))
+
+    # ===== LOOKUP =====
+
+    def find(self, info):
+        # Return the record of a known file with the same content as info, or None
+        # Raises OSError if the new file itself can't be read
+        self._load_sizes([info['size']])
+        with self.lock:
+            candidates = self.by_size.get(info['size'])
+
+            if self.mode == "full":
+                full = self._full(info)
+                if full in self.by_hash:
+                    return self.by_hash[full]
+                # Library files of the same size that have never been hashed
+                for record in candidates or ():
+                    if self._known_hash(self._full, record) == full:
+                        return record
+                return None
+
+            if not candidates:
+                return None
+
+            partial = self._partial(info)
+            matches = [record for record in candidates if self._known_hash(self._partial, record) == partial]
+            if not matches:
+                return None
+            if self._partial_is_full(info['size']):
+                return matches[0]
+
+            full = self._full(info)
+            for record in matches:
+                if self._known_hash(self._full, record) == full:
+                    return record
+            return None
+
+    def _known_hash(self, func, record):
+        # Hash of an already indexed file - a file that vanished simply doesn't match
+        try:
+            return func(record)
+        except OSError:
+            return None
+
+    def add(self, info, existing):
+        # Index a file that is being placed at existing
+        with self.lock:
+            record = {
+                'path': info['source'],
+                'existing': existing,
+                'size': info['size'],
+                'partial': info.get('partial'),
+                'hash': info.get('hash'),
+            }
+            self._insert(record)
+            return record
+
+    def file_placed(self, source, destination, file_hash=None):
+        # The bytes of an indexed file now live at destination
+        # file_hash is the full-content hash if the caller got it for free (e.g. while copying)
+        with self.lock:
+            record = self.by_path.pop(source, None)
+            if record is None:
+                return
+            record['path'] = destination
+            self.by_path[destination] = record
+            if file_hash is not None and record['hash'] is None:
+                record['hash'] = file_hash
+                self.by_hash.setdefault(file_hash, record)
+
+            if self.library is not None:
+                self.library.add_file(destination, record['partial'], record['hash'])
+                record['library'] = True
+
+    def flush(self):
+        # Commit pending library writes
+        if self.library is not None:
+            self.library.flush()
+
+
+def item_path(item):
+    # Readable path of a file info ('source') or an index record ('path')
+    return item.get('path') or item['source']
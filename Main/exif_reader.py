@@ -0,0 +1,217 @@
+# File Organizer - Lightweight EXIF Date Reader
+# Reads the capture date of an image straight from its EXIF/TIFF header bytes,
+# without decoding the image (Pillow is only used as a fallback by the engine)
+#
+# Supported containers:
+#   JPEG          - APP1 "Exif" segment
+#   TIFF-based    - .tif/.tiff and most RAW formats (CR2, NEF, DNG, ARW, ...)
+#   PNG           - eXIf chunk
+#   WebP          - EXIF chunk
+#   HEIC/HEIF/AVIF - Exif item found by scanning the first MAX_HEADER_BYTES
+# At most MAX_HEADER_BYTES are read from the start of a file, plus a few small reads
+# for IFD entries that point further in.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import struct
+from datetime import datetime
+
+
+# Upper bound for the header bytes read from a file
+MAX_HEADER_BYTES = 256 * 1024
+
+# TIFF tags holding dates, in order of preference (capture time first)
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+
+DATE_TAGS = [TAG_DATETIME_ORIGINAL, TAG_DATETIME_DIGITIZED, TAG_DATETIME]
+
+EXIF_HEADER = b'Exif\x00\x00'
+NO_EXIF_SIGNATURES = (b'GIF8', b'\x00\x00\x01\x00')
+TIFF_HEADERS = (b'II*\x00', b'MM\x00*')
+
+# Most IFD entries to look at - guards against corrupt files with huge counts
+MAX_IFD_ENTRIES = 512
+
+
+class ExifFormatError(Exception):
+    # The file isn't a container this reader understands, or its header is corrupt
+    pass
+
+
+def read_exif_date(file_path):
+    # Capture date of an image, or None if its EXIF data has no usable date
+    # Raises ExifFormatError if the file can't be parsed here (caller may fall back to Pillow)
+    with open(file_path, 'rb') as f:
+        head = f.read(MAX_HEADER_BYTES)
+        try:
+            tiff_offset = find_tiff_header(head)
+            if tiff_offset is None:
+                return None
+            return TiffReader(f, head, tiff_offset).read_date()
+        except struct.error:
+            raise ExifFormatError("truncated EXIF data")
+
+
+def find_tiff_header(head):
+    # Offset of the TIFF header holding the EXIF data, or None if the file has no EXIF
+    if head[:4] in TIFF_HEADERS:
+        return 0
+    if head[:2] == b'\xff\xd8':
+        return _find_in_jpeg(head)
+    if head[:8] == b'\x89PNG\r\n\x1a\n':
+        return _find_in_png(head)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return _find_in_webp(head)
+    if head[4:8] == b'ftyp':
+        return _find_in_isobmff(head)
+    if head[:4] in NO_EXIF_SIGNATURES or head[:2] == b'BM' or head.lstrip()[:1] == b'<':
+        # GIF, BMP, ICO, SVG - formats without EXIF
+        return None
+    raise ExifFormatError("unsupported image container")
+
+
+def _find_in_jpeg(head):
+    # Walk the JPEG marker segments up to the start of the image data
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            raise ExifFormatError("corrupt JPEG marker")
+        marker = head[pos + 1]
+        if marker == 0xFF:
+            # Fill byte
+            pos += 1
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image / start of scan - no EXIF before the pixels
+            return None
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            pos += 2
+            continue
+        length = struct.unpack('>H', head[pos + 2:pos + 4])[0]
+        if marker == 0xE1 and head[pos + 4:pos + 10] == EXIF_HEADER:
+            return pos + 10
+        pos += 2 + length
+    raise ExifFormatError("EXIF segment beyond header limit")
+
+
+def _find_in_png(head):
+    # PNG chunks: length, type, data, crc - EXIF lives in eXIf, before IDAT
+    pos = 8
+    while pos + 8 <= len(head):
+        length, chunk_type = struct.unpack('>I4s', head[pos:pos + 8])
+        if chunk_type == b'eXIf':
+            start = pos + 8
+            if head[start:start + 6] == EXIF_HEADER:
+                start += 6
+            return start
+        if chunk_type in (b'IDAT', b'IEND'):
+            return None
+        pos += 12 + length
+    raise ExifFormatError("eXIf chunk beyond header limit")
+
+
+def _find_in_webp(head):
+    # RIFF chunks: fourcc, little-endian length, data padded to even size
+    pos = 12
+    while pos + 8 <= len(head):
+        chunk_type, length = struct.unpack('<4sI', head[pos:pos + 8])
+        if chunk_type == b'EXIF':
+            start = pos + 8
+            if head[start:start + 6] == EXIF_HEADER:
+                start += 6
+            return start
+        pos += 8 + length + (length & 1)
+    return None
+
+
+def _find_in_isobmff(head):
+    # HEIC/HEIF/AVIF keep EXIF as an item: "Exif\0\0" followed by a TIFF header
+    # A bounded scan is enough for files written by cameras and phones
+    pos = head.find(EXIF_HEADER)
+    while pos != -1:
+        start = pos + len(EXIF_HEADER)
+        if head[start:start + 4] in TIFF_HEADERS:
+            return start
+        pos = head.find(EXIF_HEADER, pos + 1)
+    raise ExifFormatError("EXIF item beyond header limit")
+
+
+class TiffReader:
+    # Minimal TIFF IFD reader - only what's needed to find the date tags
+    def __init__(self, f, head, base):
+        self.f = f
+        self.head = head
+        self.base = base
+        order = head[base:base + 2]
+        if order == b'II':
+            self.endian = '<'
+        elif order == b'MM':
+            self.endian = '>'
+        else:
+            raise ExifFormatError("bad TIFF byte order")
+
+    def read(self, offset, size):
+        # Bytes at an offset relative to the TIFF header - from the header buffer when possible
+        start = self.base + offset
+        if start + size <= len(self.head):
+            return self.head[start:start + size]
+        self.f.seek(start)
+        data = self.f.read(size)
+        if len(data) != size:
+            raise ExifFormatError("truncated TIFF data")
+        return data
+
+    def unpack(self, fmt, offset):
+        fmt = self.endian + fmt
+        return struct.unpack(fmt, self.read(offset, struct.calcsize(fmt)))
+
+    def read_ifd(self, offset):
+        # {tag: (type, count, value_or_offset_bytes)} for one IFD
+        count = self.unpack('H', offset)[0]
+        if count > MAX_IFD_ENTRIES:
+            raise ExifFormatError("corrupt IFD")
+        data = self.read(offset + 2, count * 12)
+        entries = {}
+        for i in range(count):
+            tag, value_type, value_count = struct.unpack(self.endian + 'HHI', data[i * 12:i * 12 + 8])
+            entries[tag] = (value_type, value_count, data[i * 12 + 8:i * 12 + 12])
+        return entries
+
+    def ascii_value(self, entry):
+        value_type, count, raw = entry
+        if value_type != 2 or count == 0:
+            return None
+        if count <= 4:
+            data = raw[:count]
+        else:
+            data = self.read(struct.unpack(self.endian + 'I', raw)[0], count)
+        return data.split(b'\x00', 1)[0].decode('ascii', 'replace').strip()
+
+    def read_date(self):
+        ifd0_offset = self.unpack('I', 4)[0]
+        ifd0 = self.read_ifd(ifd0_offset)
+        tags = dict(ifd0)
+
+        if TAG_EXIF_IFD in ifd0:
+            exif_offset = struct.unpack(self.endian + 'I', ifd0[TAG_EXIF_IFD][2])[0]
+            tags.update(self.read_ifd(exif_offset))
+
+        for tag in DATE_TAGS:
+            if tag in tags:
+                date_obj = parse_exif_date(self.ascii_value(tags[tag]))
+                if date_obj is not None:
+                    return date_obj
+        return None
+
+
+def parse_exif_date(value):
+    # EXIF dates look like "2024:01:31 13:45:10" - blank or zeroed dates are ignored
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:19], "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
@@ -6,47 +6,27 @@
 # © 2026 File Organizer. All rights reserved.
 
 import os
-import shutil
-from datetime import datetime
-from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image
-from PIL.ExifTags import TAGS
 import threading
-import json
-import hashlib
-import time
+import queue
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 import subprocess
 import platform
 
+from move_plan import PLAN_FILE
+from organizer_engine import OrganizerEngine, OrganizerError, OrganizerOptions
+from watch_checkpoint import WATCH_CHECKPOINT_FILE, WatchCheckpoint
+from watch_handler import FileOrganizerHandler
+from watch_metrics import METRICS_HOST, METRICS_PORT, MetricsServer, WatchMetrics
+from watch_queue import DEFAULT_SETTLE_SECONDS, WatchQueue
 
-class FileOrganizerHandler(FileSystemEventHandler):
-    # Handler for file system events in watch mode
-    def __init__(self, organizer_gui):
-        self.organizer_gui = organizer_gui
-        self.processing = set()  # Track files being processed to avoid duplicates
-        
-    def on_created(self, event):
-        if event.is_directory:
-            return
-        
-        # Avoid processing the same file multiple times
-        if event.src_path in self.processing:
-            return
-            
-        self.processing.add(event.src_path)
-        
-        # Small delay to ensure file is fully written
-        time.sleep(0.5)
-        
-        # Process the new file
-        self.organizer_gui.process_single_file_watch(event.src_path)
-        
-        # Remove from processing set after a delay
-        threading.Timer(2.0, lambda: self.processing.discard(event.src_path)).start()
+
+# How often queued log lines and progress updates are drawn (milliseconds)
+UI_REFRESH_MS = 100
+
+# Lines kept in the log box - older lines are dropped
+MAX_LOG_LINES = 5000
 
 
 class ImageOrganizerGUI:
@@ -87,41 +67,38 @@ class ImageOrganizerGUI:
         self.operation_mode = tk.StringVar(value="move")
         self.dry_run_mode = tk.BooleanVar(value=False)
         self.organization_method = tk.StringVar(value="date")  # date, alphabetical, or size
-        self.operation_log = []
-        self.log_file = "file_organizer_undo_log.json"
         
         # Watch mode variables
         self.watch_mode = tk.BooleanVar(value=False)
+        self.watch_settle_seconds = tk.DoubleVar(value=DEFAULT_SETTLE_SECONDS)
+        self.watch_metrics_enabled = tk.BooleanVar(value=False)
+        self.watch_metrics_port = tk.IntVar(value=METRICS_PORT)
+        self.metrics_server = None  # MetricsServer of the running watch session
         self.observer = None
-        self.watch_thread = None
+        self.watch_queue = None
+        self.plan_ready = False  # The last dry run saved a plan that can be applied
         
         # Duplicate detection variables
         self.detect_duplicates = tk.BooleanVar(value=False)
-        self.file_hashes = {}  # Store hash: filepath mapping
         self.duplicate_action = tk.StringVar(value="skip")  # skip, rename, or delete
+        self.dedupe_mode = tk.StringVar(value="tiered")  # tiered (size first) or full
+        self.persistent_index = tk.BooleanVar(value=True)  # remember hashes of the destination library
         
         # Cloud drive variables
         self.cloud_drive_path = tk.StringVar()
         self.sync_to_cloud = tk.BooleanVar(value=False)
         
-        # File type categories
-        self.file_categories = {
-            'Images': {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic', '.svg', '.raw', '.cr2', '.nef', '.ico'},
-            'Videos': {'.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg', '.3gp', '.f4v'},
-            'Audio': {'.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma', '.m4a', '.opus', '.aiff', '.ape'},
-            'Documents': {'.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.pages', '.tex', '.wpd', '.md'},
-            'Spreadsheets': {'.xls', '.xlsx', '.csv', '.ods', '.numbers', '.tsv'},
-            'Presentations': {'.ppt', '.pptx', '.key', '.odp'},
-            'Archives': {'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.iso', '.dmg'},
-            'Code': {'.py', '.js', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.html', '.css', '.xml', '.json', '.yaml', '.yml'},
-            'Executables': {'.exe', '.msi', '.app', '.deb', '.rpm', '.apk', '.dmg', '.pkg'},
-            'Fonts': {'.ttf', '.otf', '.woff', '.woff2', '.eot'},
-            'Database': {'.db', '.sqlite', '.sql', '.mdb', '.accdb'},
-            'Other': set()
-        }
+        # Headless engine does the actual work - the GUI only collects options and shows events
+        # (loads the undo log from disk)
+        self.engine = OrganizerEngine(on_event=self.handle_engine_event)
+        self.file_categories = self.engine.file_categories
+        
+        # Worker and watchdog threads never touch widgets - they queue events that the
+        # Tk main loop draws every UI_REFRESH_MS
+        self.ui_queue = queue.Queue()
         
         self.setup_ui()
-        self.load_undo_log()
+        self.root.after(UI_REFRESH_MS, self.drain_ui_queue)
         
     def setup_ui(self):
         # Configure style
@@ -246,6 +223,21 @@ class ImageOrganizerGUI:
         )
         self.organize_btn.pack(side="left", padx=4)
         
+        # Apply the last dry run's plan without analyzing everything again
+        self.apply_plan_btn = tk.Button(
+            button_inner,
+            text="Apply Preview",
+            command=lambda: self.start_organizing(PLAN_FILE),
+            bg="#16a085",
+            fg="white",
+            activebackground="#138d75",
+            activeforeground="white",
+            disabledforeground="#ecf0f1",
+            state="disabled",
+            **button_config
+        )
+        self.apply_plan_btn.pack(side="left", padx=4)
+        
         # Cancel button
         self.cancel_btn = tk.Button(
             button_inner,
@@ -639,6 +631,49 @@ class ImageOrganizerGUI:
             selectcolor="#e74c3c"
         ).pack(side="left", padx=6)
         
+        compare_frame = tk.Frame(dup_frame, bg="white")
+        compare_frame.pack(fill="x", padx=4, pady=(6, 0))
+        
+        tk.Label(
+            compare_frame,
+            text="Compare files by:",
+            font=("Segoe UI", 9, "bold"),
+            bg="white",
+            fg="#34495e"
+        ).pack(side="left", padx=(0, 12))
+        
+        tk.Radiobutton(
+            compare_frame,
+            text="⚡ Size first (hash only on collisions)",
+            variable=self.dedupe_mode,
+            value="tiered",
+            font=("Segoe UI", 8),
+            bg="white",
+            activebackground="white",
+            selectcolor="#27ae60"
+        ).pack(side="left", padx=6)
+        
+        tk.Radiobutton(
+            compare_frame,
+            text="🔒 Full hash of every file",
+            variable=self.dedupe_mode,
+            value="full",
+            font=("Segoe UI", 8),
+            bg="white",
+            activebackground="white",
+            selectcolor="#95a5a6"
+        ).pack(side="left", padx=6)
+        
+        tk.Checkbutton(
+            dup_frame,
+            text="Also check against files already in the destination (saved hash index)",
+            variable=self.persistent_index,
+            font=("Segoe UI", 9),
+            bg="white",
+            activebackground="white",
+            selectcolor="#e74c3c"
+        ).pack(anchor="w", padx=4, pady=(6, 0))
+        
         # Watch folder with better design
         watch_frame = tk.LabelFrame(
             container,
@@ -663,6 +698,55 @@ class ImageOrganizerGUI:
             selectcolor="#3498db"
         ).pack(anchor="w", padx=4, pady=(0, 4))
         
+        settle_frame = tk.Frame(watch_frame, bg="white")
+        settle_frame.pack(anchor="w", padx=4, pady=(0, 4))
+        
+        tk.Label(
+            settle_frame,
+            text="Wait until a new file stops changing for",
+            font=("Segoe UI", 9),
+            bg="white"
+        ).pack(side="left")
+        
+        tk.Spinbox(
+            settle_frame,
+            from_=0.5,
+            to=60,
+            increment=0.5,
+            width=5,
+            textvariable=self.watch_settle_seconds,
+            font=("Segoe UI", 9)
+        ).pack(side="left", padx=4)
+        
+        tk.Label(
+            settle_frame,
+            text="seconds (raise it for slow downloads)",
+            font=("Segoe UI", 9),
+            bg="white"
+        ).pack(side="left")
+        
+        metrics_frame = tk.Frame(watch_frame, bg="white")
+        metrics_frame.pack(anchor="w", padx=4, pady=(0, 4))
+        
+        tk.Checkbutton(
+            metrics_frame,
+            text=f"Serve live metrics (Prometheus) on http://{METRICS_HOST}: port",
+            variable=self.watch_metrics_enabled,
+            font=("Segoe UI", 9),
+            bg="white",
+            activebackground="white",
+            selectcolor="#3498db"
+        ).pack(side="left")
+        
+        tk.Spinbox(
+            metrics_frame,
+            from_=1024,
+            to=65535,
+            width=6,
+            textvariable=self.watch_metrics_port,
+            font=("Segoe UI", 9)
+        ).pack(side="left", padx=4)
+        
         info_frame = tk.Frame(watch_frame, bg="#e8f5e9", relief="solid", borderwidth=1)
         info_frame.pack(fill="x", padx=4, pady=4)
         
@@ -782,32 +866,91 @@ class ImageOrganizerGUI:
         if folder:
             self.cloud_drive_path.set(folder)
     
-    def calculate_file_hash(self, file_path, algorithm='sha256'):
-        # Calculate hash of file content
-        hash_func = hashlib.new(algorithm)
-        try:
-            with open(file_path, 'rb') as f:
-                # Read in chunks to handle large files
-                for chunk in iter(lambda: f.read(8192), b''):
-                    hash_func.update(chunk)
-            return hash_func.hexdigest()
-        except Exception as e:
-            self.log_message(f"Error calculating hash for {file_path}: {str(e)}")
-            return None
+    def build_options(self):
+        # Collect the current GUI settings into engine options
+        return OrganizerOptions(
+            source=self.source_folder.get(),
+            dest=self.dest_folder.get(),
+            selected_files=self.selected_files,
+            method=self.organization_method.get(),
+            file_type_filter=self.file_type_filter.get(),
+            operation=self.operation_mode.get(),
+            dry_run=self.dry_run_mode.get(),
+            detect_duplicates=self.detect_duplicates.get(),
+            duplicate_action=self.duplicate_action.get(),
+            dedupe_mode=self.dedupe_mode.get(),
+            persistent_index=self.persistent_index.get(),
+            sync_to_cloud=self.sync_to_cloud.get(),
+            cloud_drive_path=self.cloud_drive_path.get(),
+            # A preview is saved so "Apply Preview" can carry it out as shown
+            plan_file=PLAN_FILE if self.dry_run_mode.get() else None
+        )
     
-    def check_duplicate(self, file_path):
-        # Check if file is a duplicate based on hash
-        if not self.detect_duplicates.get():
-            return False, None
+    def handle_engine_event(self, event):
+        # Called from worker threads - log lines and progress are drawn by drain_ui_queue
+        if event['type'] in ('log', 'progress'):
+            self.ui_queue.put(event)
+    
+    def run_on_ui(self, func, *args):
+        # Run func on the Tk main loop, after everything queued before it
+        self.ui_queue.put({'type': 'call', 'func': func, 'args': args})
+    
+    def drain_ui_queue(self):
+        # Draw everything queued since the last tick in one go: all new log lines in a
+        # single insert, and only the latest progress value
+        # A failing call must not stop the loop - it is logged and the next tick still runs
+        lines = []
+        progress = None
+        try:
+            while True:
+                event = self.ui_queue.get_nowait()
+                if event['type'] == 'log':
+                    lines.append(event['message'])
+                elif event['type'] == 'progress':
+                    progress = event
+                elif event['type'] == 'call':
+                    # Keep the order: show what came before, then run the call
+                    self.show_log_lines(lines)
+                    self.show_progress(progress)
+                    lines, progress = [], None
+                    try:
+                        event['func'](*event['args'])
+                    except Exception as e:
+                        lines.append(f"✗ Error updating the window: {str(e)}")
+        except queue.Empty:
+            pass
+        finally:
+            self.root.after(UI_REFRESH_MS, self.drain_ui_queue)
         
-        file_hash = self.calculate_file_hash(file_path)
-        if file_hash is None:
-            return False, None
+        self.show_log_lines(lines)
+        self.show_progress(progress)
+    
+    def show_log_lines(self, lines):
+        if not lines:
+            return
+        self.status_text.config(state="normal")
+        self.status_text.insert("end", "\n".join(lines[-MAX_LOG_LINES:]) + "\n")
         
-        if file_hash in self.file_hashes:
-            return True, self.file_hashes[file_hash]
+        # Keep the widget from growing without bound
+        line_count = int(self.status_text.index("end-1c").split(".")[0])
+        if line_count > MAX_LOG_LINES:
+            self.status_text.delete("1.0", f"{line_count - MAX_LOG_LINES + 1}.0")
         
-        return False, None
+        self.status_text.see("end")
+        self.status_text.config(state="disabled")
+    
+    def show_progress(self, event):
+        if event is None:
+            return
+        if event['maximum'] is None:
+            # Folder scans don't know the total yet - just show activity
+            self.progress_bar.config(mode='indeterminate')
+            if event['value']:
+                self.progress_bar.step()
+        else:
+            self.progress_bar.config(mode='determinate')
+            self.progress_bar['maximum'] = max(event['maximum'], 1)
+            self.progress_bar['value'] = event['value']
     
     def toggle_watch_mode(self):
         # Start or stop watch mode
@@ -836,17 +979,46 @@ class ImageOrganizerGUI:
             return
         
         try:
+            # Options are read once here so the watchdog thread never touches Tk variables
+            self.engine.options = self.build_options()
+            self.engine.start_watch_session()
+            
+            try:
+                settle_seconds = max(0.0, float(self.watch_settle_seconds.get()))
+            except (tk.TclError, ValueError):
+                settle_seconds = DEFAULT_SETTLE_SECONDS
+            # Where the last watch session of this folder got to
+            checkpoint = WatchCheckpoint(WATCH_CHECKPOINT_FILE, source)
+            has_checkpoint = checkpoint.load()
+            metrics = self.start_watch_metrics()
+            self.watch_queue = WatchQueue(self.process_single_file_watch, settle_seconds,
+                                          workers=self.engine.options.workers,
+                                          process_batch=self.process_batch_watch,
+                                          checkpoint=checkpoint, metrics=metrics)
+            if metrics is not None:
+                metrics.work_queue = self.watch_queue
+            
             self.observer = Observer()
-            event_handler = FileOrganizerHandler(self)
+            event_handler = FileOrganizerHandler(self.watch_queue, dest, accept=self.engine.may_match_filter)
             self.observer.schedule(event_handler, source, recursive=True)
             self.observer.start()
             
             self.watch_btn.config(text="⏹ Stop Watching", bg="#e74c3c", activebackground="#c0392b")
-            self.organize_btn.config(state="disabled")
+            self.set_organize_buttons(False)
             self.log_message(f"👁️ Watch mode STARTED - Monitoring: {source}")
             self.log_message("Waiting for new files...")
             
+            # Files that arrived while watch mode was off - scanned after the observer is
+            # running, so nothing is missed in between
+            threading.Thread(target=self.watch_catch_up,
+                             args=(self.watch_queue, has_checkpoint, dest), daemon=True).start()
+            
         except Exception as e:
+            if self.watch_queue is not None:
+                self.watch_queue.stop(wait=False)
+                self.watch_queue = None
+            self.stop_watch_metrics()
+            self.observer = None
             messagebox.showerror("Error", f"Failed to start watch mode:\n{str(e)}")
     
     def stop_watch_mode(self):
@@ -855,154 +1027,90 @@ class ImageOrganizerGUI:
             self.observer.stop()
             self.observer.join()
             self.observer = None
+            # Files already settled are finished, files still settling are dropped
+            self.watch_queue.stop()
+            self.watch_queue = None
+            self.engine.stop_watch_session()
+            self.stop_watch_metrics()
             
             self.watch_btn.config(text="👁 Start Watching", bg="#3498db", activebackground="#2980b9")
-            self.organize_btn.config(state="normal")
+            self.set_organize_buttons(True)
             self.log_message("👁️ Watch mode STOPPED")
+            # Report the watch session's cloud uploads once they are done
+            threading.Thread(target=self.engine.wait_for_cloud_sync, daemon=True).start()
     
-    def process_single_file_watch(self, file_path):
-        # Process a single file in watch mode
+    def start_watch_metrics(self):
+        # Serve live metrics of the watch session, if enabled - returns the WatchMetrics or None
+        if not self.watch_metrics_enabled.get():
+            return None
         try:
-            if not os.path.exists(file_path):
-                return
-            
-            # Check if file matches filter
-            filter_type = self.file_type_filter.get()
-            if filter_type != "All Files":
-                filtered_extensions = self.file_categories.get(filter_type, set())
-                if Path(file_path).suffix.lower() not in filtered_extensions:
-                    return
-            
-            dest = self.dest_folder.get()
-            operation = self.operation_mode.get()
-            
-            # Check for duplicates
-            is_duplicate, existing_file = self.check_duplicate(file_path)
-            if is_duplicate:
-                action = self.duplicate_action.get()
-                filename = os.path.basename(file_path)
-                
-                if action == "skip":
-                    self.log_message(f"⚠️ Skipped duplicate: {filename} (matches {existing_file})")
-                    return
-                elif action == "delete":
-                    os.remove(file_path)
-                    self.log_message(f"🗑️ Deleted duplicate: {filename}")
-                    return
-                # If rename, continue with processing
-            
-            # Get file info and folder structure
-            folder_structure = self.get_folder_structure(file_path)
-            dest_path = os.path.join(dest, folder_structure)
-            os.makedirs(dest_path, exist_ok=True)
-            
-            filename = os.path.basename(file_path)
-            dest_file = os.path.join(dest_path, filename)
-            
-            # Handle duplicate filenames
-            counter = 1
-            base_name, ext = os.path.splitext(filename)
-            while os.path.exists(dest_file):
-                new_filename = f"{base_name}_{counter}{ext}"
-                dest_file = os.path.join(dest_path, new_filename)
-                counter += 1
-            
-            # Perform operation
-            if operation == "move":
-                shutil.move(file_path, dest_file)
-                action_text = "Moved"
-            else:
-                shutil.copy2(file_path, dest_file)
-                action_text = "Copied"
-            
-            # Store hash if duplicate detection is enabled
-            if self.detect_duplicates.get():
-                file_hash = self.calculate_file_hash(dest_file)
-                if file_hash:
-                    self.file_hashes[file_hash] = dest_file
-            
-            # Add to undo log
-            self.add_to_undo_log(operation, file_path, dest_file)
-            self.save_undo_log()
-            
-            self.log_message(f"✓ {action_text}: {filename} → {folder_structure}")
-            
-            # Sync to cloud if enabled
-            if self.sync_to_cloud.get():
-                self.sync_file_to_cloud(dest_file, folder_structure)
-            
-        except Exception as e:
-            self.log_message(f"✗ Error processing {os.path.basename(file_path)}: {str(e)}")
+            port = int(self.watch_metrics_port.get())
+        except (tk.TclError, ValueError):
+            port = METRICS_PORT
+        metrics = WatchMetrics(self.engine)
+        try:
+            self.metrics_server = MetricsServer(metrics, METRICS_HOST, port)
+        except OSError as e:
+            # Watch mode still runs - only the endpoint is missing
+            self.log_message(f"⚠️ Metrics endpoint unavailable on port {port}: {str(e)}")
+            return None
+        self.engine.on_event = metrics.watch_events(self.handle_engine_event)
+        self.log_message(f"📈 Live metrics: {self.metrics_server.url}")
+        return metrics
     
-    def sync_file_to_cloud(self, source_file, folder_structure):
-        # Sync a file to cloud drive - creates same folder structure in cloud and copies file
+    def stop_watch_metrics(self):
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        self.engine.on_event = self.handle_engine_event
+    
+    def watch_catch_up(self, work_queue, has_checkpoint, dest):
+        # Queue files changed since the last watch session (everything on a first start)
+        if has_checkpoint:
+            self.log_message("🔎 Catching up on files added since watch mode last ran...")
+        else:
+            self.log_message("🔎 Checking files already in the watched folder...")
         try:
-            cloud_path = self.cloud_drive_path.get()
-            if not cloud_path or not os.path.exists(cloud_path):
-                return
-            
-            # Create same folder structure in cloud
-            cloud_dest_path = os.path.join(cloud_path, folder_structure)
-            os.makedirs(cloud_dest_path, exist_ok=True)
-            
-            filename = os.path.basename(source_file)
-            cloud_dest_file = os.path.join(cloud_dest_path, filename)
-            
-            # Copy to cloud
-            shutil.copy2(source_file, cloud_dest_file)
-            self.log_message(f"☁️ Synced to cloud: {filename}")
-            
+            count = work_queue.catch_up(self.engine.scan_extensions(), exclude=[dest])
+            self.log_message(f"🔎 Catch-up scan done: {count} files queued")
         except Exception as e:
-            self.log_message(f"⚠️ Cloud sync failed for {os.path.basename(source_file)}: {str(e)}")
+            self.log_message(f"⚠️ Catch-up scan failed: {str(e)}")
+    
+    def process_single_file_watch(self, file_path):
+        # Process a single file in watch mode
+        self.engine.process_single_file(file_path)
+    
+    def process_batch_watch(self, file_paths):
+        # Process a burst of files in watch mode through the batched pipeline
+        self.log_message(f"📦 {len(file_paths)} new files - processing them as one batch")
+        summary = self.engine.process_batch(file_paths)
+        self.log_message(f"📦 Batch done: {summary['organized']} organized, {summary['duplicates']} duplicates, {summary['errors']} errors")
+        return summary
     
     def cancel_organizing(self):
         # Cancel the ongoing organization process 
         self.cancel_requested = True
+        self.engine.cancel()
         self.log_message("\n⚠️ Cancellation requested... stopping after current file")
     
-    def load_undo_log(self):
-        # Load the undo log from file
-        try:
-            if os.path.exists(self.log_file):
-                with open(self.log_file, 'r') as f:
-                    self.operation_log = json.load(f)
-        except Exception as e:
-            self.operation_log = []
-    
-    def save_undo_log(self):
-        # Save the undo log to file
-        try:
-            with open(self.log_file, 'w') as f:
-                json.dump(self.operation_log, f, indent=2)
-        except Exception as e:
-            self.log_message(f"Warning: Could not save undo log: {str(e)}")
-    
-    def add_to_undo_log(self, operation_type, source, destination):
-        # Add an operation to the undo log
-        operation = {
-            'type': operation_type,
-            'source': source,
-            'destination': destination,
-            'timestamp': datetime.now().isoformat()
-        }
-        self.operation_log.append(operation)
-    
     def update_undo_button_state(self):
         # Enable/disable undo button based on log
-        if self.operation_log and not self.is_organizing:
+        if self.engine.undo_batches and not self.is_organizing:
             self.undo_btn.config(state="normal")
         else:
             self.undo_btn.config(state="disabled")
     
     def undo_last_operation(self):
         # Undo the last batch of operations
-        if not self.operation_log:
+        batch = self.engine.last_undo_batch()
+        if batch is None:
             messagebox.showinfo("No Operations", "No operations to undo!")
             return
         
         result = messagebox.askyesno(
             "Confirm Undo",
-            f"This will undo the last operation batch containing {len(self.operation_log)} operations.\n\n"
+            f"This will undo the last operation batch ({batch['label']}, started {batch['started'][:19]}) "
+            f"containing {batch['operations']} operations.\n\n"
             "Do you want to continue?"
         )
         
@@ -1013,378 +1121,105 @@ class ImageOrganizerGUI:
         self.status_text.delete(1.0, "end")
         self.status_text.config(state="disabled")
         
-        self.log_message("Starting undo operation...")
-        self.log_message("="*50)
-        
-        success_count = 0
-        error_count = 0
-        
-        for operation in reversed(self.operation_log):
-            try:
-                dest = operation['destination']
-                src = operation['source']
-                op_type = operation['type']
-                
-                if op_type == 'move':
-                    if os.path.exists(dest):
-                        os.makedirs(os.path.dirname(src), exist_ok=True)
-                        shutil.move(dest, src)
-                        self.log_message(f"✓ Restored: {os.path.basename(dest)} → {src}")
-                        success_count += 1
-                    else:
-                        self.log_message(f"✗ File not found: {dest}")
-                        error_count += 1
-                        
-                elif op_type == 'copy':
-                    if os.path.exists(dest):
-                        os.remove(dest)
-                        self.log_message(f"✓ Removed copy: {dest}")
-                        success_count += 1
-                    else:
-                        self.log_message(f"✗ File not found: {dest}")
-                        error_count += 1
-                        
-            except Exception as e:
-                self.log_message(f"✗ Error undoing operation: {str(e)}")
-                error_count += 1
-        
-        self.operation_log = []
-        self.save_undo_log()
-        self.update_undo_button_state()
-        
-        self.log_message("="*50)
-        self.log_message(f"Undo complete!")
-        self.log_message(f"Successfully restored: {success_count} files")
-        if error_count > 0:
-            self.log_message(f"Errors: {error_count}")
-        
-        messagebox.showinfo("Undo Complete", f"Successfully restored {success_count} files!\nErrors: {error_count}")
-            
-    def log_message(self, message):
-        self.status_text.config(state="normal")
-        self.status_text.insert("end", message + "\n")
-        self.status_text.see("end")
-        self.status_text.config(state="disabled")
-        self.root.update_idletasks()
-        
-    def get_file_category(self, file_path):
-        # Determine which category a file belongs to based on extension
-        ext = Path(file_path).suffix.lower()
-        
-        for category, extensions in self.file_categories.items():
-            if ext in extensions:
-                return category
-        
-        return 'Other'
+        self.undo_btn.config(state="disabled")
+        self.set_organize_buttons(False)
+        self.progress_bar['value'] = 0
+        thread = threading.Thread(target=self.undo_batch_worker, args=(batch['batch'],))
+        thread.daemon = True
+        thread.start()
     
-    def get_file_date(self, file_path):
-        # Extract date from file - tries metadata for images, falls back to modification date
+    def undo_batch_worker(self, batch_id):
+        # Runs on a worker thread - progress streams in through the UI queue
         try:
-            ext = Path(file_path).suffix.lower()
-            
-            if ext in self.file_categories['Images']:
-                try:
-                    image = Image.open(file_path)
-                    exif_data = image._getexif()
-                    
-                    if exif_data:
-                        for tag_id, value in exif_data.items():
-                            tag = TAGS.get(tag_id, tag_id)
-                            
-                            if tag in ['DateTime', 'DateTimeOriginal', 'DateTimeDigitized']:
-                                try:
-                                    date_obj = datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
-                                    return date_obj
-                                except ValueError:
-                                    continue
-                except:
-                    pass
-            
-            mod_time = os.path.getmtime(file_path)
-            return datetime.fromtimestamp(mod_time)
-            
+            success_count, error_count = self.engine.undo_batch(batch_id)
+            self.run_on_ui(messagebox.showinfo, "Undo Complete",
+                           f"Successfully restored {success_count} files!\nErrors: {error_count}")
         except Exception as e:
-            mod_time = os.path.getmtime(file_path)
-            return datetime.fromtimestamp(mod_time)
-    
-    def get_alphabetical_folder(self, file_path):
-        # Get alphabetical folder structure based on filename
-        filename = os.path.basename(file_path)
-        first_char = filename[0].upper()
-        
-        # Check if it's a letter
-        if first_char.isalpha():
-            return first_char
-        elif first_char.isdigit():
-            return "0-9"
-        else:
-            return "Special"
+            self.run_on_ui(messagebox.showerror, "Error", f"Undo failed:\n{str(e)}")
+        finally:
+            self.run_on_ui(self.finish_undo)
     
-    def get_size_folder(self, file_path):
-        # Get size-based folder structure
-        try:
-            size_bytes = os.path.getsize(file_path)
-            size_mb = size_bytes / (1024 * 1024)
+    def finish_undo(self):
+        # Re-enable the buttons once the undo worker is done
+        if self.observer is None:
+            self.set_organize_buttons(True)
+        self.update_undo_button_state()
             
-            if size_mb < 1:
-                return "Small (< 1 MB)"
-            elif size_mb < 10:
-                return "Medium (1-10 MB)"
-            elif size_mb < 100:
-                return "Large (10-100 MB)"
-            else:
-                return "Very Large (> 100 MB)"
-        except:
-            return "Unknown Size"
-    
-    def get_folder_structure(self, file_path):
-        # Get folder structure based on organization method and file category
-        method = self.organization_method.get()
-        category = self.get_file_category(file_path)
-        
-        if method == "Date":
-            date_obj = self.get_file_date(file_path)
-            year = str(date_obj.year)
-            month_name = date_obj.strftime('%B')
-            month_folder = f"{month_name}_{year}"
-            day_folder = f"{date_obj.day:02d}_{month_name}_{year}"
-            return os.path.join(category, year, month_folder, day_folder)
-        
-        elif method == "Alphabetical":
-            alpha_folder = self.get_alphabetical_folder(file_path)
-            return os.path.join(category, alpha_folder)
-        
-        elif method == "File Size":
-            size_folder = self.get_size_folder(file_path)
-            return os.path.join(category, size_folder)
+    def log_message(self, message):
+        # Safe from any thread - the line is drawn on the next UI tick
+        self.ui_queue.put({'type': 'log', 'message': message})
         
-        else:
-            # Default to date
-            date_obj = self.get_file_date(file_path)
-            year = str(date_obj.year)
-            month_name = date_obj.strftime('%B')
-            month_folder = f"{month_name}_{year}"
-            day_folder = f"{date_obj.day:02d}_{month_name}_{year}"
-            return os.path.join(category, year, month_folder, day_folder)
-    
-    def organize_files(self):
+    def organize_files(self, plan_file=None):
+        # Runs on a worker thread - widgets are only touched through run_on_ui
+        # plan_file - carry out this saved preview instead of a new run
         try:
-            source = self.source_folder.get()
-            dest = self.dest_folder.get()
-            filter_type = self.file_type_filter.get()
-            is_dry_run = self.dry_run_mode.get()
-            operation = self.operation_mode.get()
-            
-            if not dest:
-                messagebox.showerror("Error", "Please select a destination folder!")
-                self.organize_btn.config(state="normal", text="▶ Organize Files")
-                self.cancel_btn.config(state="disabled")
-                self.is_organizing = False
-                return
-            
-            if not is_dry_run:
-                os.makedirs(dest, exist_ok=True)
-            
-            if not is_dry_run:
-                self.operation_log = []
-                self.file_hashes = {}  # Reset hash database
-            
-            mode_text = "DRY RUN - PREVIEW ONLY" if is_dry_run else f"{operation.upper()} MODE"
-            self.log_message(f"Mode: {mode_text}")
-            
-            if self.detect_duplicates.get():
-                self.log_message("Duplicate detection: ENABLED (SHA-256)")
-            if self.sync_to_cloud.get():
-                self.log_message(f"Cloud sync: ENABLED → {self.cloud_drive_path.get()}")
-            
-            self.log_message("="*50)
-            
-            all_files = []
-            
-            if self.selected_files:
-                all_files = self.selected_files
-                self.log_message(f"Processing {len(all_files)} selected files")
-            elif source and os.path.exists(source):
-                self.log_message(f"Scanning folder: {source}")
-                
-                for root, dirs, files in os.walk(source):
-                    for file in files:
-                        if not file.startswith('.'):
-                            all_files.append(os.path.join(root, file))
-            else:
-                messagebox.showerror("Error", "Please select a source folder or files!")
-                self.organize_btn.config(state="normal", text="▶ Organize Files")
-                self.cancel_btn.config(state="disabled")
-                self.is_organizing = False
-                return
-            
-            if filter_type != "All Files":
-                filtered_extensions = self.file_categories.get(filter_type, set())
-                files_to_process = [
-                    f for f in all_files 
-                    if Path(f).suffix.lower() in filtered_extensions
-                ]
-                self.log_message(f"Filter: {filter_type} - Found {len(files_to_process)} matching files")
+            if plan_file:
+                summary = self.engine.run_plan(plan_file)
             else:
-                files_to_process = all_files
-                self.log_message(f"Processing all file types")
+                summary = self.engine.run()
+            # Only the latest preview can be applied, and only once
+            self.plan_ready = 'plan_file' in summary
+            self.run_on_ui(self.show_run_summary, summary)
             
-            if not files_to_process:
-                messagebox.showwarning("No Files", f"No files found matching the selected filter: {filter_type}")
-                self.log_message("No matching files found!")
-                self.organize_btn.config(state="normal", text="▶ Organize Files")
-                self.cancel_btn.config(state="disabled")
-                self.is_organizing = False
-                return
-            
-            self.log_message(f"Found {len(files_to_process)} files to organize")
-            self.progress_bar['maximum'] = len(files_to_process)
-            
-            organized_count = 0
-            error_count = 0
-            duplicate_count = 0
-            category_counts = {}
-            
-            for idx, file_path in enumerate(files_to_process):
-                if self.cancel_requested:
-                    self.log_message("\n❌ Organization cancelled by user")
-                    break
-                    
-                try:
-                    # Check for duplicates
-                    is_duplicate, existing_file = self.check_duplicate(file_path)
-                    if is_duplicate:
-                        duplicate_count += 1
-                        action = self.duplicate_action.get()
-                        filename = os.path.basename(file_path)
-                        
-                        if action == "skip":
-                            self.log_message(f"⚠️ Skipped duplicate: {filename}")
-                            continue
-                        elif action == "delete" and not is_dry_run:
-                            os.remove(file_path)
-                            self.log_message(f"🗑️ Deleted duplicate: {filename}")
-                            continue
-                        # If rename or dry run, continue with processing
-                    
-                    category = self.get_file_category(file_path)
-                    category_counts[category] = category_counts.get(category, 0) + 1
-                    
-                    # Get folder structure based on organization method
-                    folder_structure = self.get_folder_structure(file_path)
-                    dest_path = os.path.join(dest, folder_structure)
-                    
-                    filename = os.path.basename(file_path)
-                    dest_file = os.path.join(dest_path, filename)
-                    
-                    counter = 1
-                    base_name, ext = os.path.splitext(filename)
-                    while os.path.exists(dest_file):
-                        new_filename = f"{base_name}_{counter}{ext}"
-                        dest_file = os.path.join(dest_path, new_filename)
-                        counter += 1
-                    
-                    if is_dry_run:
-                        action = "Would move" if operation == "move" else "Would copy"
-                        dup_suffix = " [DUPLICATE]" if is_duplicate else ""
-                        self.log_message(f"🔍 {action}: {filename}{dup_suffix} → {folder_structure}")
-                    else:
-                        os.makedirs(dest_path, exist_ok=True)
-                        
-                        if operation == "move":
-                            shutil.move(file_path, dest_file)
-                            self.log_message(f"✓ Moved {filename} → {folder_structure}")
-                        else:
-                            shutil.copy2(file_path, dest_file)
-                            self.log_message(f"✓ Copied {filename} → {folder_structure}")
-                        
-                        # Store hash
-                        if self.detect_duplicates.get():
-                            file_hash = self.calculate_file_hash(dest_file)
-                            if file_hash:
-                                self.file_hashes[file_hash] = dest_file
-                        
-                        self.add_to_undo_log(operation, file_path, dest_file)
-                        
-                        # Sync to cloud
-                        if self.sync_to_cloud.get():
-                            self.sync_file_to_cloud(dest_file, folder_structure)
-                    
-                    organized_count += 1
-                    
-                except Exception as e:
-                    error_count += 1
-                    self.log_message(f"✗ Error processing {os.path.basename(file_path)}: {str(e)}")
-                
-                self.progress_bar['value'] = idx + 1
-                self.root.update_idletasks()
-            
-            # Summary
-            self.log_message("\n" + "="*50)
-            if self.cancel_requested:
-                self.log_message(f"Operation cancelled!")
-                self.log_message(f"Processed: {organized_count} files before cancellation")
-            else:
-                if is_dry_run:
-                    self.log_message(f"DRY RUN PREVIEW COMPLETE!")
-                    self.log_message(f"Would organize: {organized_count} files")
-                    self.log_message(f"(No files were actually moved or copied)")
-                else:
-                    self.log_message(f"Organization complete!")
-                    action = "moved" if operation == "move" else "copied"
-                    self.log_message(f"Successfully {action}: {organized_count} files")
-            
-            if duplicate_count > 0:
-                self.log_message(f"Duplicates found: {duplicate_count}")
-            
-            if category_counts:
-                self.log_message("\nFiles by category:")
-                for cat, count in sorted(category_counts.items()):
-                    self.log_message(f"  • {cat}: {count} files")
-            
-            if error_count > 0:
-                self.log_message(f"\nErrors: {error_count} files")
-            self.log_message("="*50)
-            
-            if not is_dry_run and not self.cancel_requested:
-                self.save_undo_log()
-                self.update_undo_button_state()
-            
-            if not self.cancel_requested:
-                summary_text = ""
-                if is_dry_run:
-                    summary_text = f"DRY RUN PREVIEW\n\nWould organize {organized_count} files\n"
-                    summary_text += "(No files were actually moved or copied)\n\n"
-                else:
-                    action = "moved" if operation == "move" else "copied"
-                    summary_text = f"Successfully {action} {organized_count} files!\n"
-                    summary_text += f"Errors: {error_count}\n"
-                
-                if duplicate_count > 0:
-                    summary_text += f"Duplicates: {duplicate_count}\n"
-                
-                summary_text += "\nCategory breakdown:\n"
-                for cat, count in sorted(category_counts.items()):
-                    summary_text += f"  {cat}: {count}\n"
-                
-                messagebox.showinfo("Complete", summary_text)
+        except OrganizerError as e:
+            self.run_on_ui(messagebox.showerror, "Error", str(e))
+            return
             
         except Exception as e:
             self.log_message(f"\n❌ Unexpected error: {str(e)}")
-            messagebox.showerror("Error", f"An unexpected error occurred:\n{str(e)}")
+            self.run_on_ui(messagebox.showerror, "Error", f"An unexpected error occurred:\n{str(e)}")
+            return
         
         finally:
-            self.organize_btn.config(state="normal", text="▶ Organize Files")
-            self.cancel_btn.config(state="disabled")
-            self.is_organizing = False
-            self.cancel_requested = False
-            self.update_undo_button_state()
+            self.run_on_ui(self.finish_organizing)
         
-    def start_organizing(self):
+        # Cloud uploads finish in the background - the buttons are already usable again
+        self.engine.wait_for_cloud_sync()
+    
+    def show_run_summary(self, summary):
+        # Summary dialog at the end of a run
+        if summary['total'] == 0:
+            messagebox.showwarning("No Files", f"No files found matching the selected filter: {self.engine.options.file_type_filter}")
+        elif not summary['cancelled']:
+            organized_count = summary['organized']
+            summary_text = ""
+            if summary['dry_run']:
+                summary_text = f"DRY RUN PREVIEW\n\nWould organize {organized_count} files\n"
+                summary_text += "(No files were actually moved or copied)\n\n"
+            else:
+                action = "moved" if summary['operation'] == "move" else "copied"
+                summary_text = f"Successfully {action} {organized_count} files!\n"
+                summary_text += f"Errors: {summary['errors']}\n"
+            
+            if summary['duplicates'] > 0:
+                summary_text += f"Duplicates: {summary['duplicates']}\n"
+            
+            summary_text += "\nCategory breakdown:\n"
+            for cat, count in sorted(summary['categories'].items()):
+                summary_text += f"  {cat}: {count}\n"
+            
+            messagebox.showinfo("Complete", summary_text)
+    
+    def set_organize_buttons(self, enabled):
+        # Organize and Apply Preview are only usable while nothing else is running
+        self.organize_btn.config(state="normal" if enabled else "disabled")
+        self.apply_plan_btn.config(state="normal" if enabled and self.plan_ready else "disabled")
+    
+    def finish_organizing(self):
+        # Reset the buttons once the worker thread is done
+        self.organize_btn.config(state="normal", text="▶ Organize Files")
+        self.apply_plan_btn.config(state="normal" if self.plan_ready else "disabled")
+        self.cancel_btn.config(state="disabled")
+        self.is_organizing = False
+        self.cancel_requested = False
+        self.update_undo_button_state()
+        
+    def start_organizing(self, plan_file=None):
         if self.is_organizing:
             return
             
         self.organize_btn.config(state="disabled", text="Organizing...")
+        self.apply_plan_btn.config(state="disabled")
         self.cancel_btn.config(state="normal")
         self.undo_btn.config(state="disabled")
         self.progress_bar['value'] = 0
@@ -1395,7 +1230,10 @@ class ImageOrganizerGUI:
         self.status_text.delete(1.0, "end")
         self.status_text.config(state="disabled")
         
-        thread = threading.Thread(target=self.organize_files)
+        # Tk variables are read here, on the main thread
+        self.engine.options = self.build_options()
+        
+        thread = threading.Thread(target=self.organize_files, args=(plan_file,))
         thread.daemon = True
         thread.start()
 
@@ -1408,6 +1246,7 @@ def main():
     def on_closing():
         if app.observer:
             app.stop_watch_mode()
+        app.engine.close()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
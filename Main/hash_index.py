@@ -0,0 +1,212 @@
+# File Organizer - Persistent Library Index
+# SQLite index of every file in the destination library: path, size, mtime, inode and hashes
+# Lets duplicate detection compare new files against everything already organized
+# without re-reading the library - a lookup instead of a rescan
+#
+# Rows are revalidated with a single stat() before they are trusted: if size, mtime or
+# inode changed, the stored hashes are dropped and recomputed only when needed.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import sqlite3
+import threading
+
+from hashing import PARTIAL_HASH_BYTES
+
+
+# Stored in the destination folder - hidden so it is never organized itself
+LIBRARY_INDEX_FILE = ".file_organizer_index.sqlite"
+
+# Writes are committed in batches of this many rows (and on flush)
+COMMIT_EVERY = 500
+
+
+class LibraryIndex:
+    # Persistent index of one destination folder
+    #
+    # Paths are stored relative to the library root so the whole library can be moved
+    #
+    # Stored hashes are only valid for the algorithms they were made with - opening the
+    # index with different algorithms forgets them (sizes and stat data are kept)
+    def __init__(self, root, db_path=None, algorithms=('sha256', 'sha256')):
+        self.root = os.path.abspath(root)
+        self.algorithms = tuple(algorithms)
+        self.db_path = db_path or os.path.join(self.root, LIBRARY_INDEX_FILE)
+        self.lock = threading.Lock()
+        self.pending_writes = 0
+
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " inode INTEGER NOT NULL,"
+            " partial TEXT,"
+            " hash TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS files_size ON files(size)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        signature = f"{algorithms[0]}/{algorithms[1]}/{PARTIAL_HASH_BYTES}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'hashes'").fetchone()
+        if row is None or row[0] != signature:
+            self.conn.execute("UPDATE files SET partial = NULL, hash = NULL")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('hashes', ?)", (signature,))
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def relative(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def absolute(self, rel_path):
+        return os.path.join(self.root, rel_path)
+
+    # ===== WRITES =====
+
+    def _written(self, count=1):
+        # Called with the lock held - commit once enough rows are pending
+        self.pending_writes += count
+        if self.pending_writes >= COMMIT_EVERY:
+            self.conn.commit()
+            self.pending_writes = 0
+
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+            self.pending_writes = 0
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+    def add_file(self, path, partial=None, file_hash=None):
+        # Record a file that was just placed in the library
+        # The index is only a cache - a failed write just means the file gets hashed again later
+        try:
+            st = os.stat(path)
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, partial, hash) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.relative(path), st.st_size, st.st_mtime_ns, st.st_ino, partial, file_hash)
+                )
+                self._written()
+        except (OSError, sqlite3.Error):
+            pass
+
+    def store_hashes(self, path, partial, file_hash):
+        # Remember hashes computed for an indexed file
+        try:
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE files SET partial = ?, hash = ? WHERE path = ?",
+                    (partial, file_hash, self.relative(path))
+                )
+                self._written()
+        except sqlite3.Error:
+            pass
+
+    def rebuild(self):
+        # Bring the index in line with the library by stat only - nothing is hashed
+        # Returns (added_or_changed, removed)
+        with self.lock:
+            known = {
+                row[0]: row[1:]
+                for row in self.conn.execute("SELECT path, size, mtime_ns, inode FROM files")
+            }
+
+        changed = []
+        seen = set()
+        for entry in self._walk(self.root):
+            st = entry.stat()
+            rel_path = self.relative(entry.path)
+            seen.add(rel_path)
+            if known.get(rel_path) != (st.st_size, st.st_mtime_ns, st.st_ino):
+                changed.append((rel_path, st.st_size, st.st_mtime_ns, st.st_ino))
+
+        removed = [(rel_path,) for rel_path in known if rel_path not in seen]
+
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, inode, partial, hash) VALUES (?, ?, ?, ?, NULL, NULL)",
+                changed
+            )
+            self.conn.executemany("DELETE FROM files WHERE path = ?", removed)
+            self.conn.commit()
+            self.pending_writes = 0
+
+        return len(changed), len(removed)
+
+    def _walk(self, folder):
+        # Every visible file under folder
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from self._walk(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except OSError:
+            return
+
+    # ===== LOOKUP =====
+
+    def records_with_sizes(self, sizes):
+        # Indexed files having one of the given sizes, as duplicate index records
+        # Each row is revalidated by stat - vanished files are dropped, changed files lose their hashes
+        sizes = list(sizes)
+        rows = []
+        with self.lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(sizes), 500):
+                batch = sizes[start:start + 500]
+                rows.extend(self.conn.execute(
+                    f"SELECT path, size, mtime_ns, inode, partial, hash FROM files WHERE size IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+
+        records = []
+        stale = []
+        removed = []
+        for rel_path, size, mtime_ns, inode, partial, file_hash in rows:
+            path = self.absolute(rel_path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                removed.append((rel_path,))
+                continue
+
+            if (st.st_size, st.st_mtime_ns, st.st_ino) != (size, mtime_ns, inode):
+                stale.append((st.st_size, st.st_mtime_ns, st.st_ino, rel_path))
+                if st.st_size != size:
+                    continue
+                partial = file_hash = None
+
+            records.append({
+                'path': path,
+                'existing': path,
+                'size': size,
+                'partial': partial,
+                'hash': file_hash,
+                'library': True,
+            })
+
+        if stale or removed:
+            with self.lock:
+                self.conn.executemany(
+                    "UPDATE files SET size = ?, mtime_ns = ?, inode = ?, partial = NULL, hash = NULL WHERE path = ?",
+                    stale
+                )
+                self.conn.executemany("DELETE FROM files WHERE path = ?", removed)
+                self._written(len(stale) + len(removed))
+
+        return records
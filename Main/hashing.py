@@ -0,0 +1,153 @@
+# File Organizer - Hashing Engine
+# File hashing used by duplicate detection
+#
+# Algorithms:
+#   sha256, sha1, md5, blake2b, blake2s - hashlib (cryptographic)
+#   xxh3_128, xxh64                     - optional, needs the xxhash package (pip install xxhash)
+#   crc32                               - zlib, always available, non-cryptographic
+# Non-cryptographic hashes are only meant for the partial-hash pre-filter: a match there
+# is always confirmed with the full (cryptographic) hash before a file is called a duplicate.
+#
+# Read methods:
+#   readinto    - one reusable buffer of HASH_BUFFER_SIZE filled with readinto (default)
+#   mmap        - the whole file mapped and hashed in one update call
+#   file_digest - hashlib.file_digest (Python 3.11+, hashlib algorithms only)
+#   chunked     - the original 8 KiB read loop, kept for benchmarking
+# hashlib and zlib release the GIL while digesting large buffers, so hashing on the
+# worker pool runs in parallel.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import hashlib
+import mmap
+import os
+import shutil
+import zlib
+
+try:
+    import xxhash
+except ImportError:
+    # Optional - the xxh* algorithms are just not offered without it
+    xxhash = None
+
+
+DEFAULT_ALGORITHM = 'sha256'
+
+# Read buffer for full-file hashing and copy-while-hashing
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Bytes hashed from each end of a file for the partial-hash tier
+PARTIAL_HASH_BYTES = 1024 * 1024
+
+HASH_METHODS = ["readinto", "mmap", "file_digest", "chunked"]
+
+CRYPTOGRAPHIC_ALGORITHMS = ['sha256', 'blake2b', 'blake2s', 'sha1', 'md5']
+
+
+class Crc32:
+    # hashlib-style wrapper around zlib.crc32
+    name = 'crc32'
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+
+def available_algorithms():
+    # Algorithm names usable on this installation
+    algorithms = list(CRYPTOGRAPHIC_ALGORITHMS)
+    if xxhash is not None:
+        algorithms += ['xxh3_128', 'xxh64']
+    algorithms.append('crc32')
+    return algorithms
+
+
+def is_cryptographic(algorithm):
+    return algorithm in CRYPTOGRAPHIC_ALGORITHMS
+
+
+def new_hasher(algorithm=DEFAULT_ALGORITHM):
+    # Hash object with update() and hexdigest() for any supported algorithm
+    if algorithm == 'crc32':
+        return Crc32()
+    if algorithm in ('xxh3_128', 'xxh64'):
+        if xxhash is None:
+            raise ValueError(f"{algorithm} needs the xxhash package (pip install xxhash)")
+        return getattr(xxhash, algorithm)()
+    return hashlib.new(algorithm)
+
+
+def hash_file(file_path, algorithm=DEFAULT_ALGORITHM, method="readinto", buffer_size=HASH_BUFFER_SIZE):
+    # Hash the full content of a file - raises OSError if it can't be read
+    hasher = new_hasher(algorithm)
+    with open(file_path, 'rb', buffering=0) as f:
+        if method == "mmap":
+            _update_mmap(hasher, f)
+        elif method == "file_digest" and hasattr(hashlib, 'file_digest') and is_cryptographic(algorithm):
+            return hashlib.file_digest(f, lambda: hasher).hexdigest()
+        elif method == "chunked":
+            for chunk in iter(lambda: f.read(8192), b''):
+                hasher.update(chunk)
+        else:
+            _update_readinto(hasher, f, buffer_size)
+    return hasher.hexdigest()
+
+
+def _update_readinto(hasher, f, buffer_size):
+    # Fill one buffer over and over - no per-chunk bytes objects
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    while True:
+        size = f.readinto(buffer)
+        if not size:
+            break
+        hasher.update(view[:size])
+
+
+def _update_mmap(hasher, f):
+    # Map the file and hash it in one call (empty files can't be mapped)
+    if os.fstat(f.fileno()).st_size == 0:
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        hasher.update(mapped)
+
+
+def hash_file_ends(file_path, size, algorithm=DEFAULT_ALGORITHM):
+    # Hash the first and last PARTIAL_HASH_BYTES of a file
+    # Files small enough to be covered completely are hashed whole
+    if partial_covers_file(size):
+        return hash_file(file_path, algorithm)
+
+    hasher = new_hasher(algorithm)
+    with open(file_path, 'rb') as f:
+        hasher.update(f.read(PARTIAL_HASH_BYTES))
+        f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+        hasher.update(f.read(PARTIAL_HASH_BYTES))
+    return hasher.hexdigest()
+
+
+def partial_covers_file(size):
+    # True when the partial hash reads the whole file
+    return size <= 2 * PARTIAL_HASH_BYTES
+
+
+def copy_with_hash(src, dst, algorithm=DEFAULT_ALGORITHM, buffer_size=HASH_BUFFER_SIZE):
+    # Copy src to dst like shutil.copy2 and hash the bytes on the way through,
+    # so the copy and its hash cost a single read of the source
+    hasher = new_hasher(algorithm)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(src, 'rb', buffering=0) as fsrc, open(dst, 'wb') as fdst:
+        while True:
+            size = fsrc.readinto(buffer)
+            if not size:
+                break
+            hasher.update(view[:size])
+            fdst.write(view[:size])
+    shutil.copystat(src, dst)
+    return hasher.hexdigest()
@@ -0,0 +1,193 @@
+# File Organizer - Metadata Cache
+# Persistent cache of what the engine learned about a file: capture date and hashes
+# A dry run followed by the real run, or repeated watch-mode events for the same file,
+# reuse these results instead of re-reading the file
+#
+# Entries are keyed by path and only trusted while (size, mtime_ns, inode) still match the
+# file - any change to the file makes its entry a miss. The cache keeps at most max_entries
+# rows; evict() drops the least recently used ones (the engine calls it after each run).
+# Categories are not cached: they depend on the category rules, and classifying a name is
+# cheaper than a lookup. Caches from earlier versions keep an unused category column.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+# Stored next to the undo log
+METADATA_CACHE_FILE = "file_organizer_metadata.sqlite"
+
+# Size cap - least recently used entries beyond this are evicted
+DEFAULT_MAX_ENTRIES = 200000
+
+# Writes are committed in batches of this many rows (and on flush)
+COMMIT_EVERY = 500
+
+# Fields stored per file
+FIELDS = ('date', 'partial', 'hash')
+
+
+class MetadataCache:
+    # Path -> metadata cache in SQLite, safe to use from the worker pool
+    #
+    # hash_signature names the algorithms the stored hashes were made with (see
+    # OrganizerEngine.open_metadata_cache) - hashes made with anything else are not returned
+    def __init__(self, db_path=METADATA_CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES, hash_signature=""):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hash_signature = hash_signature
+        self.lock = threading.Lock()
+        self.pending_writes = 0
+        self.touched = {}  # path -> last use time, written on commit
+        self.stats = {'hits': 0, 'misses': 0}
+
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " inode INTEGER NOT NULL,"
+            " date TEXT,"
+            " hash_signature TEXT,"
+            " partial TEXT,"
+            " hash TEXT,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS metadata_last_used ON metadata(last_used)")
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+
+    # ===== LOOKUP =====
+
+    def get(self, path, st):
+        # Cached metadata of an unchanged file as a dict of FIELDS (missing ones are None),
+        # or None on a miss
+        path = os.path.abspath(path)
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT size, mtime_ns, inode, date, hash_signature, partial, hash"
+                    " FROM metadata WHERE path = ?", (path,)
+                ).fetchone()
+                if row is None or tuple(row[:3]) != (st.st_size, st.st_mtime_ns, st.st_ino):
+                    self.stats['misses'] += 1
+                    return None
+                self.stats['hits'] += 1
+                self.touched[path] = time.time()
+        except sqlite3.Error:
+            return None
+
+        date_text, signature, partial, file_hash = row[3:]
+        if signature != self.hash_signature:
+            partial = file_hash = None
+        return {
+            'date': datetime.fromisoformat(date_text) if date_text else None,
+            'partial': partial,
+            'hash': file_hash,
+        }
+
+    # ===== WRITES =====
+
+    def put(self, path, st, **fields):
+        # Store metadata of a file as it is described by st - fields left out keep
+        # their cached value as long as the file is unchanged
+        path = os.path.abspath(path)
+        values = {field: fields.get(field) for field in FIELDS}
+        if isinstance(values['date'], datetime):
+            values['date'] = values['date'].isoformat()
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT size, mtime_ns, inode, date, hash_signature, partial, hash"
+                    " FROM metadata WHERE path = ?", (path,)
+                ).fetchone()
+                if row is not None and tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino):
+                    old = dict(zip(FIELDS, (row[3], row[5], row[6])))
+                    if row[4] != self.hash_signature:
+                        old['partial'] = old['hash'] = None
+                    for field in FIELDS:
+                        if values[field] is None:
+                            values[field] = old[field]
+
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO metadata"
+                    " (path, size, mtime_ns, inode, date, hash_signature, partial, hash, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, st.st_size, st.st_mtime_ns, st.st_ino, values['date'],
+                     self.hash_signature, values['partial'], values['hash'], time.time())
+                )
+                self.touched.pop(path, None)
+                self._written()
+        except sqlite3.Error:
+            # Only a cache - the file is simply read again next time
+            pass
+
+    def moved(self, source, destination):
+        # A file was renamed - its entry follows it (size, mtime and inode survive a rename)
+        try:
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE OR REPLACE metadata SET path = ? WHERE path = ?",
+                    (os.path.abspath(destination), os.path.abspath(source))
+                )
+                self._written()
+        except sqlite3.Error:
+            pass
+
+    def _written(self, count=1):
+        # Called with the lock held - commit once enough rows are pending
+        self.pending_writes += count
+        if self.pending_writes >= COMMIT_EVERY:
+            self._commit()
+
+    def _commit(self):
+        # Called with the lock held
+        if self.touched:
+            self.conn.executemany(
+                "UPDATE metadata SET last_used = ? WHERE path = ?",
+                [(used, path) for path, used in self.touched.items()]
+            )
+            self.touched = {}
+        self.conn.commit()
+        self.pending_writes = 0
+
+    def evict(self):
+        # Drop least recently used entries above max_entries - returns how many were dropped
+        with self.lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+            excess = count - self.max_entries
+            if excess <= 0:
+                return 0
+            self.conn.execute(
+                "DELETE FROM metadata WHERE path IN"
+                " (SELECT path FROM metadata ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.conn.commit()
+            return excess
+
+    def flush(self):
+        # Commit pending writes
+        try:
+            with self.lock:
+                self._commit()
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        self.flush()
+        try:
+            self.evict()
+        except sqlite3.Error:
+            pass
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,116 @@
+# File Organizer - Move Plan
+# A dry run's decisions written to disk, so the real run can replay them instead of
+# reading EXIF, hashing and probing for free names a second time
+#
+# JSON Lines, one object per line:
+#   {"type": "plan", "version": 1, ...}       header - operation, destination, method
+#   {"op": "move", "source": ..., "destination": ..., "folder": ..., "hash": ...,
+#    "size": ..., "mtime_ns": ...}             one line per planned file
+#   {"type": "end", "count": N, ...}          footer - missing if the dry run never finished
+# op is move, copy, skip_duplicate or delete_duplicate; duplicates also carry "existing",
+# and the size and mtime_ns it had if it was already on disk ("existing_size",
+# "existing_mtime_ns"), so a replay can tell whether the kept copy changed.
+# The file is written under a temporary name and renamed into place when complete.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import json
+import os
+from datetime import datetime
+
+
+PLAN_FILE = "file_organizer_plan.jsonl"
+
+PLAN_VERSION = 1
+
+
+class PlanError(Exception):
+    # The plan file is missing, damaged or from an unknown version
+    pass
+
+
+class PlanWriter:
+    # Streams planned entries to a plan file
+    def __init__(self, path, header):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.count = 0
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+        header = dict(header, type='plan', version=PLAN_VERSION, created=datetime.now().isoformat())
+        self.write_record(header)
+
+    def write_record(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+    def add(self, entry):
+        # One planned entry (as made by OrganizerEngine.plan_file) - paths are stored
+        # absolute, so the plan can be executed from any working folder
+        destination = entry['destination']
+        record = {
+            'op': entry['op'],
+            'source': os.path.abspath(entry['source']),
+            'destination': os.path.abspath(destination) if destination else None,
+            'folder': entry['folder'],
+            'hash': entry['hash'],
+            'size': entry['size'],
+            'mtime_ns': entry['mtime_ns'],
+        }
+        if entry['duplicate']:
+            record['duplicate'] = True
+            record['existing'] = os.path.abspath(entry['existing'])
+            try:
+                st = os.stat(record['existing'])
+                record['existing_size'], record['existing_mtime_ns'] = st.st_size, st.st_mtime_ns
+            except OSError:
+                # Planned in this same dry run - not placed yet
+                pass
+        self.write_record(record)
+        self.count += 1
+
+    def close(self, cancelled=False):
+        # Finish the plan and put it in place
+        self.write_record({'type': 'end', 'count': self.count, 'cancelled': cancelled})
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        # Drop an unfinished plan
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def read_plan_header(path):
+    # Header and footer of a plan file - only its first and last lines are read
+    try:
+        with open(path, 'rb') as f:
+            first = f.readline()
+            header = json.loads(first) if first.strip() else None
+            f.seek(max(f.tell(), os.fstat(f.fileno()).st_size - 4096))
+            lines = f.read().splitlines()
+            last = json.loads(lines[-1]) if lines else None
+            footer = last if isinstance(last, dict) and last.get('type') == 'end' else None
+    except OSError as e:
+        raise PlanError(f"Cannot read plan {path}: {e}") from e
+    except ValueError as e:
+        raise PlanError(f"Damaged plan {path}: {e}") from e
+    if not header or header.get('type') != 'plan':
+        raise PlanError(f"{path} is not a plan file")
+    if header.get('version') != PLAN_VERSION:
+        raise PlanError(f"Plan {path} has unsupported version {header.get('version')}")
+    if footer is None:
+        raise PlanError(f"Plan {path} is incomplete - run the dry run again")
+    return header, footer
+
+
+def read_plan_entries(path):
+    # Yield the planned entries of a plan file, streaming it line by line
+    with open(path, 'r', encoding='utf-8') as f:
+        f.readline()
+        for line in f:
+            record = json.loads(line)
+            if record.get('type') == 'end':
+                return
+            yield record
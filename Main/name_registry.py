@@ -0,0 +1,86 @@
+# File Organizer - Destination Name Registry
+# Hands out free file names in destination folders: photo.jpg, photo_1.jpg, photo_2.jpg, ...
+#
+# Each folder is listed once with os.scandir the first time a name is needed in it; after
+# that every name placed there is remembered, and the next free suffix per base name is
+# kept as a counter, so a thousand IMG_0001.jpg landing in one day folder cost a thousand
+# steps instead of half a million exists() probes.
+#
+# The chosen name is still checked with one exists() call, so files that appear in the
+# folder behind the registry's back (other programs, watch mode sessions) are never overwritten.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import threading
+
+
+class FolderNames:
+    # Taken names and suffix counters of one destination folder
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.taken = None  # Filled from the folder listing on first use
+        self.counters = {}  # base name -> next suffix to try
+
+
+class NameRegistry:
+    # Per-folder name registries - safe to use from several workers at once
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.folders = {}
+
+    def _folder(self, folder):
+        key = os.path.normcase(os.path.abspath(folder))
+        with self.lock:
+            names = self.folders.get(key)
+            if names is None:
+                names = self.folders[key] = FolderNames()
+            return names
+
+    def _seed(self, folder):
+        # Names already in the folder - a folder that doesn't exist yet is empty
+        try:
+            with os.scandir(folder) as entries:
+                return {os.path.normcase(entry.name) for entry in entries}
+        except OSError:
+            return set()
+
+    def _claim(self, names, folder, filename):
+        # Take filename if it is free - called with the folder lock held
+        key = os.path.normcase(filename)
+        if key in names.taken:
+            return None
+        path = os.path.join(folder, filename)
+        names.taken.add(key)
+        if os.path.exists(path):
+            return None
+        return path
+
+    def reserve(self, folder, filename):
+        # Free path for filename in folder, appending _1, _2, ... to the name if it is taken
+        # The name counts as taken from now on, whether or not the file is ever written
+        names = self._folder(folder)
+        with names.lock:
+            if names.taken is None:
+                names.taken = self._seed(folder)
+
+            path = self._claim(names, folder, filename)
+            if path is not None:
+                return path
+
+            base_name, ext = os.path.splitext(filename)
+            counter_key = os.path.normcase(filename)
+            counter = names.counters.get(counter_key, 1)
+            while path is None:
+                path = self._claim(names, folder, f"{base_name}_{counter}{ext}")
+                counter += 1
+            names.counters[counter_key] = counter
+            return path
+
+    def release(self, path):
+        # A reserved name was never used (the file failed to land) - hand it out again
+        names = self._folder(os.path.dirname(path))
+        with names.lock:
+            if names.taken is not None:
+                names.taken.discard(os.path.normcase(os.path.basename(path)))
+                names.counters.clear()
@@ -0,0 +1,346 @@
+# File Organizer - Command Line Runner
+# Headless front end for the organizing engine, for servers and cron jobs
+# Usage: python -m organizer_cli organize SOURCE DEST [options]
+#        python -m organizer_cli organize DEST --files FILE [FILE ...] [options]
+#        python -m organizer_cli watch SOURCE DEST [--metrics-port 9464] [options]
+#        python -m organizer_cli undo [--list] [--batch ID]
+# Use --json to stream every engine event as one JSON object per line
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import argparse
+import json
+import os
+import signal
+import sys
+
+from classifier import CATEGORY_RULES_FILE
+from duplicates import DEDUPE_MODES
+from hashing import DEFAULT_ALGORITHM, available_algorithms, is_cryptographic
+from move_plan import PLAN_FILE
+from organizer_engine import (
+    DEFAULT_WORKERS,
+    METADATA_CACHE_FILE,
+    METHOD_ALIASES,
+    UNDO_LOG_FILE,
+    OrganizerEngine,
+    OrganizerError,
+    OrganizerOptions,
+)
+from run_stats import PROFILERS, STATS_FILE
+from watch_checkpoint import WATCH_CHECKPOINT_FILE, WatchCheckpoint
+from watch_metrics import (
+    DEFAULT_METRICS_INTERVAL,
+    METRICS_HOST,
+    METRICS_PORT,
+    MetricsFile,
+    MetricsServer,
+    WatchMetrics,
+)
+from watch_queue import DEFAULT_SETTLE_SECONDS, WatchQueue
+
+
+def make_event_printer(as_json):
+    # Build the on_event callback - JSON lines or plain log text
+    def print_event(event):
+        if as_json:
+            sys.stdout.write(json.dumps(event, default=str) + "\n")
+            sys.stdout.flush()
+        elif event['type'] == 'log':
+            print(event['message'])
+    return print_event
+
+
+def add_run_arguments(parser):
+    # How files are organized - shared by organize and watch
+    parser.add_argument("--method", default="date", choices=sorted(METHOD_ALIASES),
+                        help="organization method (default: %(default)s)")
+    parser.add_argument("--filter", dest="file_type_filter", default="All Files",
+                        help="only organize one file category - a built-in one or one from the "
+                             "category rules file")
+    parser.add_argument("--copy", dest="operation", action="store_const", const="copy", default="move",
+                        help="copy files instead of moving them")
+    parser.add_argument("--duplicates", choices=["skip", "rename", "delete"], default=None,
+                        help="enable hash-based duplicate detection with this action")
+    parser.add_argument("--dedupe-mode", choices=DEDUPE_MODES, default="tiered",
+                        help="tiered compares sizes first and hashes only on collisions; "
+                             "full hashes every file (default: %(default)s)")
+    parser.add_argument("--hash", dest="hash_algorithm", default=DEFAULT_ALGORITHM,
+                        choices=[a for a in available_algorithms() if is_cryptographic(a)],
+                        help="full-content hash used to confirm duplicates (default: %(default)s)")
+    parser.add_argument("--prefilter-hash", dest="prefilter_algorithm", default=None,
+                        choices=available_algorithms(),
+                        help="hash for the partial pre-filter tier, e.g. a fast non-cryptographic "
+                             "xxh3_128 or crc32 (default: same as --hash)")
+    parser.add_argument("--no-index", dest="persistent_index", action="store_false",
+                        help="don't keep a hash index of the destination library - "
+                             "duplicates are then only checked within this run")
+    parser.add_argument("--reindex", action="store_true",
+                        help="re-stat the whole destination library before organizing")
+    parser.add_argument("--no-cache", dest="metadata_cache", action="store_false",
+                        help="don't reuse dates/hashes of unchanged files from earlier runs")
+    parser.add_argument("--cloud", default="", help="also sync organized files to this cloud drive folder")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="worker threads for metadata and file operations (default: %(default)s)")
+
+
+def add_stats_arguments(parser):
+    # Instrumentation options shared by organize and execute-plan
+    parser.add_argument("--stats", dest="stats_file", nargs="?", const=STATS_FILE, default=None,
+                        help=f"time every pipeline stage and save the statistics as JSON (default file: {STATS_FILE})")
+    parser.add_argument("--profile", choices=PROFILERS, default=None,
+                        help="profile the run with cProfile or a stack sampler - saved next to the stats file")
+
+
+def add_metrics_arguments(parser):
+    # Live metrics options shared by organize, execute-plan and watch
+    parser.add_argument("--metrics-port", type=int, nargs="?", const=METRICS_PORT, default=None,
+                        help=f"serve live metrics in Prometheus format on this port (default port: {METRICS_PORT})")
+    parser.add_argument("--metrics-host", default=METRICS_HOST,
+                        help="address the metrics endpoint listens on (default: %(default)s)")
+    parser.add_argument("--metrics-file", default=None,
+                        help="also write the metrics as JSON to this file every --metrics-interval seconds")
+    parser.add_argument("--metrics-interval", type=float, default=DEFAULT_METRICS_INTERVAL,
+                        help="seconds between metrics file updates (default: %(default)s)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="organizer_cli",
+        description="Organize files into Category/Year/Month_Year/Day_Month_Year folders without the GUI."
+    )
+    parser.add_argument("--undo-log", default=UNDO_LOG_FILE, help="undo log file (default: %(default)s)")
+    parser.add_argument("--cache-file", default=METADATA_CACHE_FILE,
+                        help="metadata cache of dates and hashes (default: %(default)s)")
+    parser.add_argument("--category-rules", default=CATEGORY_RULES_FILE,
+                        help="JSON file of extra category rules, used if it exists (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="stream structured events as JSON lines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    organize = subparsers.add_parser("organize", help="organize a folder or a list of files")
+    organize.add_argument("source", nargs="?", default=None,
+                          help="source folder to organize (not needed with --files)")
+    organize.add_argument("dest", help="destination folder")
+    organize.add_argument("--files", nargs="+", default=None,
+                          help="organize only these files instead of scanning the source folder")
+    add_run_arguments(organize)
+    organize.add_argument("--dry-run", action="store_true", help="preview only - no changes")
+    organize.add_argument("--plan", dest="plan_file", default=None,
+                          help=f"with --dry-run, save the preview as a plan file for execute-plan (e.g. {PLAN_FILE})")
+    add_stats_arguments(organize)
+    add_metrics_arguments(organize)
+
+    execute = subparsers.add_parser("execute-plan", help="carry out a plan saved by organize --dry-run --plan")
+    execute.add_argument("plan_file", nargs="?", default=PLAN_FILE, help="plan file (default: %(default)s)")
+    execute.add_argument("--cloud", default="", help="also sync organized files to this cloud drive folder")
+    execute.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                         help="worker threads for file operations (default: %(default)s)")
+    add_stats_arguments(execute)
+    add_metrics_arguments(execute)
+
+    watch = subparsers.add_parser("watch", help="organize new files as they arrive, until interrupted")
+    watch.add_argument("source", help="folder to watch")
+    watch.add_argument("dest", help="destination folder")
+    add_run_arguments(watch)
+    watch.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                       help="seconds a new file must stop changing before it is organized (default: %(default)s)")
+    watch.add_argument("--checkpoint-file", default=WATCH_CHECKPOINT_FILE,
+                       help="where watch mode remembers how far it got (default: %(default)s)")
+    add_metrics_arguments(watch)
+    watch.set_defaults(files=None, dry_run=False, plan_file=None, stats_file=None, profile=None)
+
+    undo = subparsers.add_parser("undo", help="undo the last organize batch (or any earlier one)")
+    undo.add_argument("--batch", type=int, default=None, help="id of the batch to undo (see --list)")
+    undo.add_argument("--list", action="store_true", help="list the batches that can be undone")
+    return parser
+
+
+def options_from_args(args):
+    return OrganizerOptions(
+        source=args.source or "",
+        dest=args.dest,
+        selected_files=args.files,
+        method=args.method,
+        file_type_filter=args.file_type_filter,
+        operation=args.operation,
+        dry_run=args.dry_run,
+        detect_duplicates=args.duplicates is not None,
+        duplicate_action=args.duplicates or "skip",
+        dedupe_mode=args.dedupe_mode,
+        persistent_index=args.persistent_index,
+        reindex=args.reindex,
+        hash_algorithm=args.hash_algorithm,
+        prefilter_algorithm=args.prefilter_algorithm,
+        metadata_cache=args.metadata_cache,
+        sync_to_cloud=bool(args.cloud),
+        cloud_drive_path=args.cloud,
+        workers=args.workers,
+        plan_file=args.plan_file,
+        stats_file=args.stats_file,
+        profile=args.profile,
+    )
+
+
+def stop_on_sigterm(signum, frame):
+    # A service manager stopping watch mode gets the same clean shutdown as Ctrl+C
+    raise KeyboardInterrupt
+
+
+def start_metrics_exporters(engine, metrics, args):
+    # Metrics endpoint and/or file asked for on the command line - returns them, to be stopped
+    # Raises OSError if the port can't be opened
+    exporters = []
+    try:
+        if args.metrics_port is not None:
+            server = MetricsServer(metrics, args.metrics_host, args.metrics_port)
+            exporters.append(server)
+            engine.log(f"📈 Live metrics: {server.url}")
+        if args.metrics_file:
+            exporters.append(MetricsFile(metrics, args.metrics_file, args.metrics_interval))
+            engine.log(f"📈 Metrics file: {args.metrics_file} (every {args.metrics_interval:g}s)")
+    except OSError:
+        for exporter in exporters:
+            exporter.stop()
+        raise
+    return exporters
+
+
+def run_watch(engine, args):
+    # Organize files arriving in the source folder until interrupted - returns the exit code
+    try:
+        from watchdog.observers import Observer
+        from watch_handler import FileOrganizerHandler
+    except ImportError:
+        print("Error: watch mode needs the watchdog package (pip install watchdog)", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.source):
+        print(f"Error: {args.source} is not a folder", file=sys.stderr)
+        return 2
+
+    engine.start_watch_session()
+    checkpoint = WatchCheckpoint(args.checkpoint_file, args.source)
+    has_checkpoint = checkpoint.load()
+    metrics = WatchMetrics(engine)
+    engine.on_event = metrics.watch_events(engine.on_event)
+    work_queue = WatchQueue(engine.process_single_file, max(0.0, args.settle), workers=args.workers,
+                            process_batch=engine.process_batch, checkpoint=checkpoint, metrics=metrics)
+    metrics.work_queue = work_queue
+
+    exporters = []
+    observer = None
+    try:
+        exporters = start_metrics_exporters(engine, metrics, args)
+
+        observer = Observer()
+        observer.schedule(FileOrganizerHandler(work_queue, args.dest, accept=engine.may_match_filter),
+                          args.source, recursive=True)
+        observer.start()
+        engine.log(f"👁️ Watch mode STARTED - Monitoring: {args.source} (Ctrl+C to stop)")
+
+        # Files that arrived while watch mode was off
+        if has_checkpoint:
+            engine.log("🔎 Catching up on files added since watch mode last ran...")
+        count = work_queue.catch_up(engine.scan_extensions(), exclude=[args.dest])
+        engine.log(f"🔎 Catch-up scan done: {count} files queued")
+
+        while observer.is_alive():
+            observer.join(1)
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        # Files already settled are finished, files still settling are dropped
+        work_queue.stop()
+        engine.stop_watch_session()
+        for exporter in exporters:
+            exporter.stop()
+        engine.log("👁️ Watch mode STOPPED")
+
+    snapshot = metrics.snapshot()
+    engine.log(f"Organized {snapshot['files_organized']} files, {snapshot['duplicates']} duplicates, "
+               f"{snapshot['errors']} errors")
+    cloud = engine.wait_for_cloud_sync()
+    return 1 if snapshot['errors'] or (cloud and cloud['failed']) else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "organize" and args.source is None and not args.files:
+        parser.error("organize needs a SOURCE folder or --files")
+    on_event = make_event_printer(args.json)
+
+    if args.command == "undo":
+        engine = OrganizerEngine(on_event=on_event, log_file=args.undo_log, rules_file=args.category_rules)
+        if not engine.undo_batches:
+            print("No operations to undo!", file=sys.stderr)
+            return 1
+        if args.list:
+            for batch in engine.undo_batches.values():
+                print(f"{batch['batch']:>5}  {batch['started'][:19]}  {batch['operations']:>8} operations  {batch['label']}")
+            return 0
+        try:
+            if args.batch is None:
+                success_count, error_count = engine.undo_last_batch()
+            else:
+                success_count, error_count = engine.undo_batch(args.batch)
+        except OrganizerError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        finally:
+            engine.close()
+        return 1 if error_count else 0
+
+    if args.command == "execute-plan":
+        options = OrganizerOptions(sync_to_cloud=bool(args.cloud), cloud_drive_path=args.cloud, workers=args.workers,
+                                   stats_file=args.stats_file, profile=args.profile)
+    else:
+        options = options_from_args(args)
+    engine = OrganizerEngine(options, on_event=on_event, log_file=args.undo_log,
+                             cache_file=args.cache_file, rules_file=args.category_rules)
+    # Categories are only known once the rules file is loaded
+    file_type_filter = getattr(args, 'file_type_filter', "All Files")
+    if file_type_filter != "All Files" and file_type_filter not in engine.file_categories:
+        choices = ", ".join(["All Files"] + sorted(engine.file_categories))
+        print(f"Error: unknown --filter category '{file_type_filter}' (choose from {choices})", file=sys.stderr)
+        engine.close()
+        return 2
+    if args.command == "watch":
+        signal.signal(signal.SIGTERM, stop_on_sigterm)
+        try:
+            return run_watch(engine, args)
+        finally:
+            engine.close()
+
+    exporters = []
+    try:
+        if args.metrics_port is not None or args.metrics_file:
+            metrics = WatchMetrics(engine)
+            engine.on_event = metrics.watch_events(engine.on_event)
+            exporters = start_metrics_exporters(engine, metrics, args)
+        if args.command == "execute-plan":
+            summary = engine.run_plan(args.plan_file)
+        else:
+            summary = engine.run()
+        cloud = engine.wait_for_cloud_sync()
+    except (OrganizerError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        # Final numbers, cloud uploads included, before the engine lets go of the upload queue
+        for exporter in exporters:
+            exporter.stop()
+        engine.close()
+
+    return 1 if summary['errors'] or (cloud and cloud['failed']) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
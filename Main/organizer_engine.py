@@ -0,0 +1,1428 @@
+# File Organizer - Headless Engine
+# GUI-free organizing pipeline shared by the Tk app and the command line runner
+# Scans, classifies, dedupes, moves/copies, records undo operations and syncs to cloud
+# Progress is reported as structured event dicts through an on_event callback
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import json
+import sqlite3
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from classifier import CATEGORY_RULES_FILE, FileClassifier
+from cloud_sync import CloudSyncQueue
+from copy_engine import copy_file, move_file
+from directory_cache import DirectoryCache
+from duplicates import DuplicateIndex
+from exif_reader import ExifFormatError, read_exif_date
+from hashing import DEFAULT_ALGORITHM, PARTIAL_HASH_BYTES, copy_with_hash, hash_file
+from hash_index import LIBRARY_INDEX_FILE, LibraryIndex
+from move_plan import PlanError, PlanWriter, read_plan_entries, read_plan_header
+from metadata_cache import METADATA_CACHE_FILE, MetadataCache
+from name_registry import NameRegistry
+from run_stats import HISTOGRAM_BOUNDS_MS, NO_TIMER, Profiler, RunStats, profile_path, write_stats_file
+from scanner import scan_files
+from undo_journal import UndoJournal
+
+try:
+    from PIL import Image
+    from PIL.ExifTags import TAGS
+except ImportError:
+    # Pillow is optional - it is only the fallback for images exif_reader can't parse
+    Image = None
+    TAGS = {}
+
+
+UNDO_LOG_FILE = "file_organizer_undo_log.jsonl"
+
+# Undo log of earlier versions (one JSON list) - converted to the journal on first load
+LEGACY_UNDO_LOG_FILE = "file_organizer_undo_log.json"
+
+ORGANIZATION_METHODS = ["Date", "Alphabetical", "File Size"]
+
+# Worker threads for the metadata and execute stages (same default as ThreadPoolExecutor)
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Files pushed through the pipeline stages at a time
+PIPELINE_CHUNK_SIZE = 512
+
+# Short names accepted on the command line
+METHOD_ALIASES = {
+    'date': "Date",
+    'alphabetical': "Alphabetical",
+    'alpha': "Alphabetical",
+    'size': "File Size",
+    'file size': "File Size",
+}
+
+
+class OrganizerError(Exception):
+    # Raised when a run cannot start (missing source/destination etc.)
+    pass
+
+
+class OrganizerOptions:
+    # Settings for one organizing run - mirrors the controls of the GUI
+    def __init__(self, source="", dest="", selected_files=None, method="Date",
+                 file_type_filter="All Files", operation="move", dry_run=False,
+                 detect_duplicates=False, duplicate_action="skip", dedupe_mode="tiered",
+                 persistent_index=True, reindex=False, hash_algorithm=DEFAULT_ALGORITHM,
+                 prefilter_algorithm=None, metadata_cache=True,
+                 sync_to_cloud=False, cloud_drive_path="", workers=DEFAULT_WORKERS, plan_file=None,
+                 stats_file=None, profile=None):
+        self.source = source
+        self.dest = dest
+        self.selected_files = list(selected_files or [])
+        self.method = METHOD_ALIASES.get(str(method).lower(), method)
+        self.file_type_filter = file_type_filter
+        self.operation = operation  # move or copy
+        self.dry_run = dry_run
+        self.detect_duplicates = detect_duplicates
+        self.duplicate_action = duplicate_action  # skip, rename, or delete
+        self.dedupe_mode = dedupe_mode  # tiered (size first) or full (hash every file)
+        self.persistent_index = persistent_index  # keep a hash index of the destination library
+        self.reindex = reindex  # re-stat the whole destination before organizing
+        self.hash_algorithm = hash_algorithm  # full-content hash (see hashing.py)
+        self.prefilter_algorithm = prefilter_algorithm or hash_algorithm  # partial-hash tier
+        self.metadata_cache = metadata_cache  # reuse dates/categories/hashes of unchanged files
+        self.sync_to_cloud = sync_to_cloud
+        self.cloud_drive_path = cloud_drive_path
+        self.workers = max(1, int(workers))
+        self.plan_file = plan_file  # a dry run saves its plan here, for run_plan() to replay
+        self.stats_file = stats_file  # time every pipeline stage and save the statistics here
+        self.profile = profile  # cprofile or sample - profile the run (see run_stats.py)
+
+
+class OrganizerEngine:
+    # Organizes files without any GUI dependency
+    #
+    # Every message, progress tick and per-file result is passed to on_event as a dict
+    # with a 'type' key: start, log, progress, file, summary
+    def __init__(self, options=None, on_event=None, log_file=UNDO_LOG_FILE, cache_file=METADATA_CACHE_FILE,
+                 rules_file=CATEGORY_RULES_FILE):
+        self.options = options or OrganizerOptions()
+        self.on_event = on_event
+        self.log_file = log_file
+        self.cache_file = cache_file
+        self.event_lock = threading.Lock()
+        try:
+            self.classifier = FileClassifier.from_file(rules_file)
+        except ValueError as e:
+            self.log(f"⚠️ {str(e)} - using the built-in categories")
+            self.classifier = FileClassifier()
+        for error in self.classifier.errors:
+            self.log(f"⚠️ {rules_file}: {error}")
+        self.file_categories = self.classifier.categories  # Category -> extensions, for the filter list
+        self.undo_batches = {}  # Batch id -> summary of every batch that can still be undone
+        self.current_batch = None  # Batch new operations are added to
+        self.next_batch_id = 1
+        self.duplicate_index = DuplicateIndex(self.options.dedupe_mode)
+        self.library_index = None  # LibraryIndex of the current destination
+        self.metadata_cache = None  # MetadataCache shared by dry runs, real runs and watch mode
+        self.name_registry = NameRegistry()  # Destination names handed out, per folder
+        self.directories = DirectoryCache()  # Destination folders created so far
+        self.cloud_sync = None  # Background cloud uploads, started on first use
+        self.plan_writer = None  # PlanWriter while a dry run saves its plan
+        self.plan_renames = {}  # Planned destination -> name a replayed plan placed it under
+        self.stats = None  # RunStats of the last run, when statistics are on
+        self.stats_summary = None  # Summary saved to the stats file, updated once cloud uploads finish
+        self.profiler = None  # Profiler waiting for the next run_pipeline()
+        self.plan_lock = threading.Lock()
+        self.undo_lock = threading.RLock()
+        self.cancel_requested = False
+        self.undo_journal = UndoJournal(log_file)
+        self.load_undo_log()
+
+    # ===== EVENTS =====
+
+    def emit(self, event_type, **data):
+        # Send a structured event to the consumer (GUI, CLI, benchmark...)
+        # Events can come from several worker threads - deliver them one at a time
+        if self.on_event:
+            event = {'type': event_type}
+            event.update(data)
+            with self.event_lock:
+                self.on_event(event)
+
+    def log(self, message):
+        self.emit('log', message=message)
+
+    def cancel(self):
+        # Ask the running organize loop to stop after the current file
+        self.cancel_requested = True
+
+    # ===== STATISTICS =====
+
+    def start_stats(self):
+        # Fresh per-stage statistics (and profiler) for a run, if the options ask for them
+        options = self.options
+        self.stats = RunStats() if options.stats_file or options.profile else None
+        self.stats_summary = None
+        self.profiler = None
+        if options.profile:
+            self.profiler = Profiler(options.profile, profile_path(options.stats_file, options.profile))
+        self.duplicate_index.run_stats = self.stats
+        if self.cloud_sync is not None:
+            self.cloud_sync.run_stats = self.stats
+
+    def timed(self, stage):
+        # Timer for one pass through a pipeline stage - a no-op when statistics are off
+        return self.stats.stage(stage) if self.stats is not None else NO_TIMER
+
+    def add_stat(self, counter, amount=1):
+        if self.stats is not None:
+            self.stats.add(counter, amount)
+
+    def save_stats(self, summary):
+        # Write the summary with its statistics to the stats file
+        try:
+            write_stats_file(self.options.stats_file, summary)
+        except (OSError, TypeError, ValueError) as e:
+            self.log(f"⚠️ Could not save run statistics: {str(e)}")
+
+    # ===== HASHING / DUPLICATES =====
+
+    def open_library_index(self, dest):
+        # Persistent hash index of the destination folder, or None if it can't be used
+        # A dry run only reads an existing index - it never creates one
+        dest = os.path.abspath(dest)
+        algorithms = (self.options.hash_algorithm, self.options.prefilter_algorithm)
+        if (self.library_index is not None and self.library_index.root == dest
+                and self.library_index.algorithms == algorithms):
+            return self.library_index
+        self.close()
+
+        db_exists = os.path.exists(os.path.join(dest, LIBRARY_INDEX_FILE))
+        if not os.path.isdir(dest) or (self.options.dry_run and not db_exists):
+            return None
+
+        try:
+            self.library_index = LibraryIndex(dest, algorithms=algorithms)
+            if not db_exists or self.options.reindex:
+                self.log(f"Indexing destination library: {dest}")
+                changed, removed = self.library_index.rebuild()
+                self.log(f"Library index updated: {changed} new/changed, {removed} removed")
+        except (OSError, sqlite3.Error) as e:
+            self.log(f"⚠️ Library index unavailable, duplicates are only checked within this run: {str(e)}")
+            self.library_index = None
+        return self.library_index
+
+    def open_duplicate_index(self):
+        # Fresh duplicate index for a run or watch session, backed by the library index
+        options = self.options
+        library = None
+        if options.detect_duplicates and options.persistent_index and options.dest:
+            library = self.open_library_index(options.dest)
+        self.duplicate_index = DuplicateIndex(options.dedupe_mode, library, options.hash_algorithm,
+                                              options.prefilter_algorithm)
+        return self.duplicate_index
+
+    def open_metadata_cache(self):
+        # Persistent metadata cache, or None if disabled or unusable
+        options = self.options
+        if not options.metadata_cache:
+            return None
+        signature = f"{options.hash_algorithm}/{options.prefilter_algorithm}/{PARTIAL_HASH_BYTES}"
+        if self.metadata_cache is None:
+            try:
+                self.metadata_cache = MetadataCache(self.cache_file, hash_signature=signature)
+            except (OSError, sqlite3.Error) as e:
+                self.log(f"⚠️ Metadata cache unavailable, every file will be read: {str(e)}")
+                return None
+        self.metadata_cache.hash_signature = signature
+        return self.metadata_cache
+
+    def close(self):
+        # Release the library index and metadata cache (commits pending writes)
+        if self.library_index is not None:
+            try:
+                self.library_index.close()
+            except sqlite3.Error:
+                pass
+            self.library_index = None
+        if self.metadata_cache is not None:
+            try:
+                self.metadata_cache.close()
+            except sqlite3.Error:
+                pass
+            self.metadata_cache = None
+        try:
+            self.undo_journal.close()
+        except OSError:
+            pass
+        if self.cloud_sync is not None:
+            # Uploads still queued are finished first
+            self.cloud_sync.close()
+            self.cloud_sync = None
+
+    def find_duplicate(self, info):
+        # Destination of an earlier file with the same content, or None
+        try:
+            record = self.duplicate_index.find(info)
+        except OSError as e:
+            self.log(f"Error calculating hash for {info['source']}: {str(e)}")
+            return None
+        return record['existing'] if record else None
+
+    # ===== CLASSIFICATION =====
+
+    def get_file_category(self, file_path):
+        # Determine which category a file belongs to (see classifier.py)
+        return self.classifier.category(file_path)
+
+    def matches_filter(self, file_path):
+        # Check if file passes the file type filter - the same classification the planner uses
+        filter_type = self.options.file_type_filter
+        if filter_type == "All Files":
+            return True
+        return self.classifier.category(file_path) == filter_type
+
+    def may_match_filter(self, file_path):
+        # Cheap pre-check from the name only, for events of files that may still be written
+        filter_type = self.options.file_type_filter
+        return filter_type == "All Files" or self.classifier.may_be(file_path, filter_type)
+
+    def get_file_date(self, file_path):
+        # Extract date from file - EXIF capture date for images, falls back to modification date
+        # EXIF is read from the header bytes by exif_reader; Pillow only handles what it can't parse
+        if self.classifier.suffix_category(file_path) == 'Images':
+            try:
+                date_obj = read_exif_date(file_path)
+            except ExifFormatError:
+                date_obj = self.get_pillow_exif_date(file_path)
+            except OSError:
+                date_obj = None
+            if date_obj is not None:
+                return date_obj
+
+        mod_time = os.path.getmtime(file_path)
+        return datetime.fromtimestamp(mod_time)
+
+    def get_pillow_exif_date(self, file_path):
+        # EXIF date through Pillow - slower, but understands every format Pillow can open
+        if Image is None:
+            return None
+        try:
+            with Image.open(file_path) as image:
+                exif_data = image._getexif()
+
+            if exif_data:
+                for tag_id, value in exif_data.items():
+                    tag = TAGS.get(tag_id, tag_id)
+
+                    if tag in ['DateTime', 'DateTimeOriginal', 'DateTimeDigitized']:
+                        try:
+                            return datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
+                        except ValueError:
+                            continue
+        except Exception:
+            pass
+        return None
+
+    def get_alphabetical_folder(self, file_path):
+        # Get alphabetical folder structure based on filename
+        filename = os.path.basename(file_path)
+        first_char = filename[0].upper()
+
+        # Check if it's a letter
+        if first_char.isalpha():
+            return first_char
+        elif first_char.isdigit():
+            return "0-9"
+        else:
+            return "Special"
+
+    def get_size_folder(self, file_path, size_bytes=None):
+        # Get size-based folder structure
+        try:
+            if size_bytes is None:
+                size_bytes = os.path.getsize(file_path)
+            size_mb = size_bytes / (1024 * 1024)
+
+            if size_mb < 1:
+                return "Small (< 1 MB)"
+            elif size_mb < 10:
+                return "Medium (1-10 MB)"
+            elif size_mb < 100:
+                return "Large (10-100 MB)"
+            else:
+                return "Very Large (> 100 MB)"
+        except Exception:
+            return "Unknown Size"
+
+    def get_date_folder(self, date_obj):
+        # Category-relative Year/Month_Year/Day_Month_Year path for a date
+        year = str(date_obj.year)
+        month_name = date_obj.strftime('%B')
+        month_folder = f"{month_name}_{year}"
+        day_folder = f"{date_obj.day:02d}_{month_name}_{year}"
+        return os.path.join(year, month_folder, day_folder)
+
+    def get_file_metadata(self, file_path, st, cached=None):
+        # Category and (for the Date method) capture date of a file
+        # Taken from the cache entry when there is one, otherwise computed and cached
+        metadata = dict(cached) if cached else {}
+        missing = {}
+        # Always classified afresh - a lookup is cheaper than trusting a category cached
+        # under different rules
+        metadata['category'] = self.get_file_category(file_path)
+        if self.options.method == "Date" and metadata.get('date') is None:
+            with self.timed('date'):
+                metadata['date'] = missing['date'] = self.get_file_date(file_path)
+        if missing and self.metadata_cache is not None:
+            self.metadata_cache.put(file_path, st, **missing)
+        return metadata
+
+    def get_folder_structure(self, file_path, st=None, cached=None):
+        # Get folder structure based on organization method and file category
+        if st is None:
+            st = os.stat(file_path)
+        method = self.options.method
+        metadata = self.get_file_metadata(file_path, st, cached)
+        category = metadata['category']
+
+        if method == "Alphabetical":
+            return os.path.join(category, self.get_alphabetical_folder(file_path))
+
+        elif method == "File Size":
+            return os.path.join(category, self.get_size_folder(file_path, st.st_size))
+
+        # Date is the default
+        return os.path.join(category, self.get_date_folder(metadata['date']))
+
+    # ===== SCANNING =====
+
+    def scan_extensions(self):
+        # Suffixes a folder scan keeps for the file type filter, or None for all files
+        # (a superset - matches_filter() has the final say)
+        if self.options.file_type_filter == "All Files":
+            return None
+        return self.classifier.suffixes_for(self.options.file_type_filter)
+
+    def collect_files(self):
+        # Stream the files to process from the selected files or the source folder
+        # Returns a generator - the source is checked right away, the scan happens as it is consumed
+        options = self.options
+
+        if options.selected_files:
+            self.log(f"Processing {len(options.selected_files)} selected files")
+            files = (f for f in options.selected_files if self.matches_filter(f))
+        elif options.source and os.path.exists(options.source):
+            self.log(f"Scanning folder: {options.source}")
+            # Files placed this run must not be scanned again if the destination is inside the source
+            files = scan_files(options.source, self.scan_extensions(), exclude=[options.dest] if options.dest else ())
+            if options.file_type_filter != "All Files":
+                files = (entry for entry in files if self.matches_filter(entry.path))
+        else:
+            raise OrganizerError("Please select a source folder or files!")
+
+        if options.file_type_filter != "All Files":
+            self.log(f"Filter: {options.file_type_filter}")
+        else:
+            self.log("Processing all file types")
+
+        return files
+
+    # ===== PIPELINE STAGES =====
+    #
+    # Files flow through four stages in chunks of PIPELINE_CHUNK_SIZE:
+    #   scan     - collect_files(), a generator that feeds chunks while the scan goes on
+    #   metadata - analyze_file(), run on the worker pool (EXIF, stat), then the
+    #              duplicate index hashes whatever it needs on the same pool
+    #   plan     - plan_file(), run in order on one thread (duplicate decisions, destination names)
+    #   execute  - create_folders() makes every folder the chunk needs in one pass, then
+    #              execute_plan() runs on the worker pool (move/copy, cloud sync)
+    # Planning is the only stage that hands out destination names, and it does so under
+    # plan_lock, so two workers can never be given the same destination file.
+
+    def analyze_file(self, file_path):
+        # Metadata stage - reads the source file but never touches the destination
+        # file_path may be a DirEntry from the scanner - its cached stat result is reused
+        entry = file_path
+        file_path = os.fspath(entry)
+        info = {'source': file_path, 'hash': None}
+        if self.cancel_requested:
+            info['cancelled'] = True
+            return info
+
+        # One stat per file - it keys the metadata cache and gives the size
+        st = entry.stat() if isinstance(entry, os.DirEntry) else os.stat(file_path)
+        cached = self.metadata_cache.get(file_path, st) if self.metadata_cache is not None else None
+        info['stat'] = st
+        if self.options.detect_duplicates:
+            info['size'] = st.st_size
+            if cached:
+                # Hashes from an earlier run (e.g. the dry run before this one)
+                info['partial'] = cached['partial']
+                info['hash'] = cached['hash']
+            info['cached_hashes'] = (info.get('partial'), info['hash'])
+        info['folder'] = self.get_folder_structure(file_path, st, cached)
+        return info
+
+    def cache_hashes(self, info):
+        # Remember hashes the duplicate check computed for a source file
+        if self.metadata_cache is None or 'stat' not in info:
+            return
+        hashes = (info.get('partial'), info.get('hash'))
+        if hashes != info.get('cached_hashes') and any(hashes):
+            self.metadata_cache.put(info['source'], info['stat'], partial=hashes[0], hash=hashes[1])
+            info['cached_hashes'] = hashes
+
+    def analyze_file_safely(self, file_path):
+        # Worker wrapper - one unreadable file must not take down the whole chunk
+        try:
+            with self.timed('analyze'):
+                return self.analyze_file(file_path)
+        except Exception as e:
+            file_path = os.fspath(file_path)
+            self.log(f"✗ Error processing {os.path.basename(file_path)}: {str(e)}")
+            return {'source': file_path, 'error': str(e)}
+
+    def get_unique_destination(self, dest_path, filename):
+        # Handle duplicate filenames by appending _1, _2, ...
+        # Names already handed out in this run count as taken even before the file lands
+        with self.timed('name_probe'):
+            return self.name_registry.reserve(dest_path, filename)
+
+    def plan_file(self, info, dest):
+        # Plan stage - decide what happens to one analyzed file
+        # op is one of: move, copy, skip_duplicate, delete_duplicate
+        options = self.options
+        entry = {
+            'source': info['source'],
+            'destination': None,
+            'folder': info['folder'],
+            'duplicate': False,
+            'existing': None,
+            'hash': info.get('hash'),
+            'op': options.operation,
+            # 0 where the platform's scandir doesn't fill it in (Windows) - unknown
+            'device': info['stat'].st_dev if 'stat' in info else 0,
+            # What the file looked like when it was planned - a saved plan is checked against it
+            'size': info['stat'].st_size if 'stat' in info else None,
+            'mtime_ns': info['stat'].st_mtime_ns if 'stat' in info else None,
+        }
+
+        with self.plan_lock:
+            # Check for duplicates
+            existing = self.find_duplicate(info) if options.detect_duplicates else None
+            if options.detect_duplicates:
+                self.cache_hashes(info)
+            if existing is not None:
+                entry['duplicate'] = True
+                entry['existing'] = existing
+                # Hashed by the duplicate check - a replayed plan checks the kept copy against it
+                entry['hash'] = info.get('hash')
+                action = options.duplicate_action
+
+                if action == "skip":
+                    entry['op'] = 'skip_duplicate'
+                    return entry
+                elif action == "delete":
+                    entry['op'] = 'delete_duplicate'
+                    return entry
+                # If rename, continue with processing
+
+            dest_path = os.path.join(dest, info['folder'])
+            entry['destination'] = self.get_unique_destination(dest_path, os.path.basename(info['source']))
+
+            # Later files with the same content are duplicates of this one
+            if options.detect_duplicates:
+                self.duplicate_index.add(info, entry['destination'])
+                entry['hash'] = info.get('hash')
+
+        return entry
+
+    def execute_plan(self, entry):
+        # Execute stage - carry out one planned operation and return the file result
+        options = self.options
+        file_path = entry['source']
+        filename = os.path.basename(file_path)
+        folder_structure = entry['folder']
+        dest_file = entry['destination']
+        result = {'source': file_path, 'destination': dest_file, 'folder': folder_structure,
+                  'duplicate': entry['duplicate']}
+
+        if entry['op'] == 'skip_duplicate':
+            self.log(f"⚠️ Skipped duplicate: {filename} (matches {entry['existing']})")
+            result['status'] = 'skipped_duplicate'
+            return result
+
+        if entry['op'] == 'delete_duplicate':
+            if options.dry_run:
+                self.log(f"🔍 Would delete duplicate: {filename} (matches {entry['existing']})")
+                result['status'] = 'would_delete_duplicate'
+                return result
+            if not os.path.exists(entry['existing']):
+                # Never delete the last copy
+                self.log(f"⚠️ Kept {filename}: the file it duplicates is gone ({entry['existing']})")
+                result['status'] = 'skipped_duplicate'
+                return result
+            if entry.get('verify_existing') and not self.kept_copy_matches(entry):
+                self.log(f"⚠️ Kept {filename}: the file it duplicates changed since the dry run ({entry['existing']})")
+                result['status'] = 'skipped_duplicate'
+                return result
+            with self.timed('delete'):
+                os.remove(file_path)
+            self.log(f"🗑️ Deleted duplicate: {filename}")
+            result['status'] = 'deleted_duplicate'
+            return result
+
+        if options.dry_run:
+            action = "Would move" if entry['op'] == "move" else "Would copy"
+            dup_suffix = " [DUPLICATE]" if entry['duplicate'] else ""
+            self.log(f"🔍 {action}: {filename}{dup_suffix} → {folder_structure}")
+            result['status'] = 'would_move' if entry['op'] == "move" else 'would_copy'
+            return result
+
+        dest_folder = os.path.dirname(dest_file)
+        self.directories.ensure(dest_folder)
+        try:
+            with self.timed('transfer'):
+                file_hash, method = self.transfer_file(entry)
+        except FileNotFoundError:
+            # The folder was removed after it was created (e.g. during a long watch session)
+            if not os.path.exists(file_path) or os.path.isdir(dest_folder):
+                raise
+            self.add_stat('retries')
+            self.directories.forget(dest_folder)
+            self.directories.ensure(dest_folder)
+            with self.timed('transfer'):
+                file_hash, method = self.transfer_file(entry)
+        if method != "rename" and self.stats is not None and entry['size'] is not None:
+            # Copied byte for byte (a reflink only counts once the file is changed)
+            self.stats.add('bytes_read', entry['size'])
+            self.stats.add('bytes_written', entry['size'])
+
+        if entry['op'] == "move":
+            result['status'] = 'moved'
+            if method == "rename":
+                self.log(f"✓ Moved {filename} → {folder_structure}")
+                result['move_method'] = 'rename'
+                if self.metadata_cache is not None:
+                    self.metadata_cache.moved(file_path, dest_file)
+            else:
+                self.log(f"✓ Moved {filename} → {folder_structure} (copied across filesystems)")
+                result['move_method'] = 'cross-device'
+                result['copy_method'] = method
+        else:
+            self.log(f"✓ Copied {filename} → {folder_structure}")
+            result['status'] = 'copied'
+            result['copy_method'] = method
+
+        # Store hash
+        if options.detect_duplicates:
+            self.duplicate_index.file_placed(file_path, dest_file, file_hash)
+
+        with self.timed('undo_log'):
+            self.add_to_undo_log(entry['op'], file_path, dest_file)
+
+        # Sync to cloud - queued, the upload happens in the background
+        if options.sync_to_cloud:
+            self.sync_file_to_cloud(dest_file, folder_structure, file_hash)
+
+        return result
+
+    def kept_copy_matches(self, entry):
+        # True if the kept copy of a replayed duplicate still has the duplicate's content -
+        # unchanged since the dry run looked at it, or hashed again
+        existing = entry['existing']
+        try:
+            st = os.stat(existing)
+        except OSError:
+            return False
+        if st.st_size != entry['size']:
+            return False
+        if (st.st_size, st.st_mtime_ns) == (entry.get('existing_size'), entry.get('existing_mtime_ns')):
+            return True
+        if entry['hash'] is None:
+            return False
+        try:
+            with self.timed('full_hash'):
+                return hash_file(existing, self.options.hash_algorithm) == entry['hash']
+        except OSError:
+            return False
+
+    def transfer_file(self, entry):
+        # Move or copy the file of a planned entry
+        # Returns (full-content hash if known, copy method - "rename" for a same-filesystem move)
+        # Hash from the duplicate check - the destination is never read back to re-hash it
+        file_hash = entry['hash']
+        source, destination = entry['source'], entry['destination']
+        if entry['op'] == "move":
+            dest_device = self.directories.device(os.path.dirname(destination))
+            same_device = None
+            if entry['device'] and dest_device:
+                same_device = entry['device'] == dest_device
+            # Across filesystems the copy is checked against the hash before the source goes
+            return file_hash, move_file(source, destination, same_device, content_hash=file_hash,
+                                        algorithm=self.options.hash_algorithm)
+
+        if self.options.detect_duplicates and file_hash is None:
+            # Size-first mode didn't need the hash yet - a reflink costs nothing, so the hash is
+            # left for later; otherwise take it while the bytes stream past
+            method = copy_file(source, destination, ["reflink"])
+            if method is None:
+                file_hash = copy_with_hash(source, destination, self.options.hash_algorithm)
+                method = "buffered"
+            return file_hash, method
+
+        return file_hash, copy_file(source, destination)
+
+    def create_folders(self, planned):
+        # Create every destination folder a batch of planned files needs in one pass, so the
+        # execute stage only moves and copies (cloud folders are made by the upload workers)
+        if self.options.dry_run:
+            return
+        with self.timed('folders'):
+            self.directories.ensure_all(os.path.dirname(entry['destination']) for entry in planned
+                                        if entry['op'] in ('move', 'copy'))
+
+    def execute_plan_safely(self, entry):
+        # Worker wrapper - one failing file must not take down the whole chunk
+        if self.cancel_requested:
+            return {'status': 'cancelled', 'source': entry['source']}
+        try:
+            return self.execute_plan(entry)
+        except Exception as e:
+            self.release_destination(entry)
+            self.log(f"✗ Error processing {os.path.basename(entry['source'])}: {str(e)}")
+            return {'status': 'error', 'source': entry['source'], 'error': str(e)}
+
+    def sync_file_to_cloud(self, source_file, folder_structure, file_hash=None):
+        # Queue a copy of an organized file to the cloud drive, in the same folder structure
+        # Returns at once - see wait_for_cloud_sync() for the outcome
+        cloud_path = self.options.cloud_drive_path
+        if not cloud_path:
+            return
+        if self.cloud_sync is None:
+            with self.plan_lock:
+                if self.cloud_sync is None:
+                    self.cloud_sync = CloudSyncQueue(log=self.log)
+                    self.cloud_sync.run_stats = self.stats
+        self.cloud_sync.submit(source_file, cloud_path, folder_structure, file_hash, self.options.hash_algorithm)
+
+    def wait_for_cloud_sync(self):
+        # Block until queued cloud uploads are done - returns their counts since the last
+        # call, or None if nothing was synced
+        if self.cloud_sync is None:
+            return None
+        pending = len(self.cloud_sync)
+        if pending:
+            self.log(f"☁️ Waiting for {pending} cloud uploads to finish...")
+        self.cloud_sync.wait()
+        counts = self.cloud_sync.take_counts()
+        self.log(f"☁️ Cloud sync: {counts['completed']} uploaded, {counts['unchanged']} already up to date, "
+                 f"{counts['failed']} failed ({counts['retries']} retries)")
+        self.emit('cloud_summary', **counts)
+        if self.stats_summary is not None:
+            # The stats file was written before the uploads were done - bring it up to date
+            self.stats_summary['cloud'] = {key: value for key, value in counts.items() if key != 'failures'}
+            self.stats_summary['stats'] = self.stats.as_dict()
+            self.save_stats(self.stats_summary)
+        return counts
+
+    def process_file(self, file_path, dest):
+        # Organize one file through all stages on the calling thread
+        # Returns a result dict whose status is one of:
+        # moved, copied, would_move, would_copy, skipped_duplicate, deleted_duplicate,
+        # or cancelled when a cancel came in before the file was analyzed
+        info = self.analyze_file(file_path)
+        if info.get('cancelled'):
+            return {'status': 'cancelled', 'source': info['source']}
+        entry = self.plan_file(info, dest)
+        try:
+            return self.execute_plan(entry)
+        except Exception:
+            self.release_destination(entry)
+            raise
+
+    def release_destination(self, entry):
+        # The file never landed - its destination name is free again
+        if entry['destination'] is not None and not self.options.dry_run:
+            self.name_registry.release(entry['destination'])
+
+    def process_single_file(self, file_path):
+        # Process a single file as it arrives (watch mode) - saves the undo log right away
+        try:
+            if not os.path.exists(file_path):
+                return None
+
+            # Check if file matches filter
+            if not self.matches_filter(file_path):
+                return None
+
+            self.open_metadata_cache()
+            result = self.process_file(file_path, self.options.dest)
+            if result['status'] == 'cancelled':
+                return result
+            self.emit('file', **result)
+
+            if result['status'] in ('moved', 'copied'):
+                # The undo record is already in the journal (fsync'ed in batches)
+                self.duplicate_index.flush()
+            if self.metadata_cache is not None:
+                self.metadata_cache.flush()
+            return result
+
+        except Exception as e:
+            self.log(f"✗ Error processing {os.path.basename(file_path)}: {str(e)}")
+            result = {'status': 'error', 'source': file_path, 'error': str(e)}
+            self.emit('file', **result)
+            return result
+
+    def run(self):
+        # Organize every file from the configured source - returns the run summary dict
+        options = self.options
+        is_dry_run = options.dry_run
+        operation = options.operation
+        dest = options.dest
+        self.cancel_requested = False
+
+        if not dest:
+            raise OrganizerError("Please select a destination folder!")
+
+        if not is_dry_run:
+            os.makedirs(dest, exist_ok=True)
+            # A new run is a new undo batch
+            self.start_undo_batch(f"{operation}: {options.source or 'selected files'} → {dest}")
+        self.name_registry = NameRegistry()
+        self.directories = DirectoryCache()
+
+        mode_text = "DRY RUN - PREVIEW ONLY" if is_dry_run else f"{operation.upper()} MODE"
+        self.emit('start', mode=mode_text, source=options.source, dest=dest)
+        self.log(f"Mode: {mode_text}")
+
+        if options.detect_duplicates:
+            if options.dedupe_mode == "tiered":
+                compare = f"size first, {options.prefilter_algorithm} pre-filter"
+            else:
+                compare = "full hash"
+            self.log(f"Duplicate detection: ENABLED ({options.hash_algorithm.upper()}, {compare})")
+            # Reset hash database - files already in the destination come from the library index
+            self.open_duplicate_index()
+            if self.library_index is not None:
+                self.log(f"Library index: {len(self.library_index)} files already in destination")
+        if options.sync_to_cloud:
+            self.log(f"Cloud sync: ENABLED → {options.cloud_drive_path}")
+        self.log(f"Workers: {options.workers}")
+        self.start_stats()
+        if self.profiler is not None:
+            self.log(f"Profiling: {options.profile} → {self.profiler.path}")
+        cache = self.open_metadata_cache()
+        cache_stats = dict(cache.stats) if cache is not None else None
+
+        self.log("="*50)
+
+        files_to_process = self.collect_files()
+
+        summary = self.new_summary()
+
+        if is_dry_run and options.plan_file:
+            self.plan_writer = PlanWriter(options.plan_file, {
+                'operation': operation,
+                'source': os.path.abspath(options.source) if options.source else None,
+                'dest': os.path.abspath(dest),
+                'method': options.method,
+                'detect_duplicates': options.detect_duplicates,
+                'duplicate_action': options.duplicate_action,
+                'hash_algorithm': options.hash_algorithm,
+            })
+
+        # The total is only known up front for a list of selected files - a folder scan
+        # reports a running count (maximum None)
+        maximum = len(options.selected_files) if options.selected_files else None
+        self.emit('progress', value=0, maximum=maximum)
+
+        try:
+            self.run_pipeline(files_to_process, dest, summary, maximum)
+        except BaseException:
+            if self.plan_writer is not None:
+                self.plan_writer.discard()
+            raise
+        else:
+            if self.plan_writer is not None:
+                self.plan_writer.close(cancelled=self.cancel_requested)
+                summary['plan_file'] = options.plan_file
+        finally:
+            self.plan_writer = None
+            if cache is not None:
+                cache.evict()
+
+        if summary['total'] == 0 and not self.cancel_requested:
+            self.log("No matching files found!")
+            self.emit('summary', **summary)
+            return summary
+
+        self.log(f"Scan complete: {summary['total']} matching files")
+
+        if options.detect_duplicates:
+            summary['hashed'] = dict(self.duplicate_index.stats)
+        if cache is not None:
+            summary['cache'] = {key: cache.stats[key] - cache_stats[key] for key in cache.stats}
+
+        if self.cloud_sync is not None:
+            # Uploads carry on in the background - reported by wait_for_cloud_sync()
+            summary['cloud_pending'] = len(self.cloud_sync)
+
+        return self.finish_run(summary)
+
+    def finish_run(self, summary):
+        # Log, save and report the summary at the end of a run
+        if self.cancel_requested:
+            self.log("\n❌ Organization cancelled by user")
+            summary['cancelled'] = True
+
+        if self.stats is not None:
+            summary['stats'] = self.stats.as_dict()
+            if self.options.stats_file:
+                summary['stats_file'] = self.options.stats_file
+
+        self.log_summary(summary)
+
+        if 'stats_file' in summary:
+            self.stats_summary = dict(summary)
+            self.save_stats(self.stats_summary)
+
+        if not summary['dry_run']:
+            self.save_undo_log()
+
+        self.emit('summary', **summary)
+        return summary
+
+    def run_plan(self, plan_path):
+        # Carry out a plan saved by a dry run - returns the run summary dict
+        # Nothing is analyzed or hashed again: each file is checked with one stat against
+        # what the dry run saw, and left alone if it changed
+        try:
+            header, footer = read_plan_header(plan_path)
+        except PlanError as e:
+            raise OrganizerError(str(e))
+
+        options = self.options
+        options.dry_run = False
+        options.operation = header['operation']
+        options.dest = dest = header['dest']
+        options.detect_duplicates = header.get('detect_duplicates', False)
+        # The plan's hashes were made with this algorithm
+        options.hash_algorithm = header.get('hash_algorithm', options.hash_algorithm)
+        self.cancel_requested = False
+
+        os.makedirs(dest, exist_ok=True)
+        self.start_undo_batch(f"plan {plan_path}: {header.get('source') or 'selected files'} → {dest}")
+        self.name_registry = NameRegistry()
+        self.directories = DirectoryCache()
+        self.plan_renames = {}
+
+        mode_text = f"EXECUTE PLAN - {options.operation.upper()} MODE"
+        self.emit('start', mode=mode_text, source=header.get('source'), dest=dest)
+        self.log(f"Mode: {mode_text}")
+        self.log(f"Plan: {plan_path} ({footer['count']} files, made {header.get('created', '?')})")
+        if footer.get('cancelled'):
+            self.log("⚠️ The dry run was cancelled - the plan only has the files it got to")
+        if options.detect_duplicates:
+            # Only to keep the library index up to date - duplicates were decided by the dry run
+            self.open_duplicate_index()
+        if options.sync_to_cloud:
+            self.log(f"Cloud sync: ENABLED → {options.cloud_drive_path}")
+        self.start_stats()
+        if self.profiler is not None:
+            self.log(f"Profiling: {options.profile} → {self.profiler.path}")
+        self.log("="*50)
+
+        summary = self.new_summary()
+        summary['stale'] = 0
+        self.emit('progress', value=0, maximum=footer['count'])
+        self.run_pipeline(read_plan_entries(plan_path), dest, summary, footer['count'],
+                          process_chunk=self.run_plan_chunk)
+
+        if self.cloud_sync is not None:
+            summary['cloud_pending'] = len(self.cloud_sync)
+        return self.finish_run(summary)
+
+    def run_plan_chunk(self, pool, records, dest):
+        # Push one chunk of plan records through check -> reserve -> execute
+        checked = list(pool.map(self.check_plan_record, records))
+        results = [entry for entry in checked if 'status' in entry]
+        planned = [entry for entry in checked if 'status' not in entry]
+
+        with self.plan_lock:
+            for entry in planned:
+                if entry['destination'] is None:
+                    continue
+                folder, name = os.path.split(entry['destination'])
+                reserved = self.name_registry.reserve(folder, name)
+                if reserved != entry['destination']:
+                    self.log(f"⚠️ {name} is taken since the dry run - placing as {os.path.basename(reserved)}")
+                    self.plan_renames[entry['destination']] = reserved
+                    entry['destination'] = reserved
+            # Duplicates of a file placed under another name point at that name
+            for entry in planned:
+                if entry['op'] == 'delete_duplicate' and entry['existing'] in self.plan_renames:
+                    entry['existing'] = self.plan_renames[entry['existing']]
+                    entry['existing_size'] = entry['existing_mtime_ns'] = None
+
+        # A duplicate is only deleted once the file it duplicates is in place
+        placing = [entry for entry in planned if entry['op'] != 'delete_duplicate']
+        self.create_folders(placing)
+        placed = list(pool.map(self.execute_plan_safely, placing))
+        if self.library_index is not None:
+            hashes = {entry['source']: entry['hash'] for entry in placing}
+            for result in placed:
+                if result['status'] in ('moved', 'copied'):
+                    self.library_index.add_file(result['destination'], None, hashes.get(result['source']))
+        deleting = [self.execute_plan_safely(entry) for entry in planned if entry['op'] == 'delete_duplicate']
+        return results + placed + deleting
+
+    def check_plan_record(self, record):
+        # Planned entry for a plan record, or a 'stale' result if the file changed since the dry run
+        source = record['source']
+        if self.cancel_requested:
+            return {'status': 'cancelled', 'source': source}
+        try:
+            st = os.stat(source)
+        except OSError:
+            st = None
+        if st is None or (st.st_size, st.st_mtime_ns) != (record['size'], record['mtime_ns']):
+            self.log(f"⚠️ Changed since the dry run, left alone: {os.path.basename(source)}")
+            return {'status': 'stale', 'source': source}
+        return {
+            'source': source,
+            'destination': record['destination'],
+            'folder': record['folder'],
+            'duplicate': record.get('duplicate', False),
+            'existing': record.get('existing'),
+            'existing_size': record.get('existing_size'),
+            'existing_mtime_ns': record.get('existing_mtime_ns'),
+            # The kept copy may have changed since the dry run compared it
+            'verify_existing': True,
+            'hash': record['hash'],
+            'op': record['op'],
+            'device': st.st_dev,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+        }
+
+    def new_summary(self):
+        # Empty run summary - filled in by count_result
+        return {
+            'operation': self.options.operation,
+            'dry_run': self.options.dry_run,
+            'total': 0,
+            'organized': 0,
+            'errors': 0,
+            'duplicates': 0,
+            'categories': {},
+            'cancelled': False,
+        }
+
+    def run_pipeline(self, files, dest, summary, maximum=None, progress=True, process_chunk=None):
+        # Push files through analyze -> plan -> create folders -> execute, one chunk at a time
+        # (or through process_chunk(pool, chunk, dest), e.g. to replay a plan)
+        # The duplicate index and metadata cache are flushed once at the end, not per file
+        process_chunk = process_chunk or self.run_chunk
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None:
+            profiler.start()
+        try:
+            # Every pool worker is profiled too
+            initializer = profiler.thread_started if profiler is not None else None
+            with ThreadPoolExecutor(max_workers=self.options.workers, initializer=initializer) as pool:
+                done = 0
+                while not self.cancel_requested:
+                    # The folder scan runs while the chunk is pulled from the generator
+                    with self.timed('scan'):
+                        chunk = list(islice(files, PIPELINE_CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    summary['total'] += len(chunk)
+                    for result in process_chunk(pool, chunk, dest):
+                        if result['status'] == 'cancelled':
+                            continue
+                        self.emit('file', **result)
+                        self.count_result(summary, result)
+                        done += 1
+                        if progress:
+                            self.emit('progress', value=done, maximum=maximum)
+        finally:
+            with self.timed('flush'):
+                self.duplicate_index.flush()
+                if self.metadata_cache is not None:
+                    self.metadata_cache.flush()
+            if profiler is not None:
+                profile_file = profiler.stop()
+                if profile_file:
+                    summary['profile_file'] = profile_file
+        return summary
+
+    def start_watch_session(self):
+        # Get ready for watch mode - files then come in through process_single_file() and
+        # process_batch(), all in one undo batch
+        options = self.options
+        options.dry_run = False
+        # A cancelled run before must not cancel every watched file
+        self.cancel_requested = False
+        self.open_duplicate_index()
+        self.start_undo_batch(f"watch: {options.source} → {options.dest}")
+
+    def stop_watch_session(self):
+        # Write out what watch mode left pending (cloud uploads are left to wait_for_cloud_sync)
+        self.duplicate_index.flush()
+        self.save_undo_log()
+
+    def process_batch(self, file_paths):
+        # Process a burst of files at once (watch mode) through the same batched pipeline
+        # as run() - a worker pool, and one index/cache flush and journal sync for the batch
+        # Files the batch never got to are listed in summary['unhandled'], to be retried
+        # A cancelled run before must not skip the whole batch
+        self.cancel_requested = False
+        self.open_metadata_cache()
+        wanted = [path for path in file_paths if os.path.exists(path) and self.matches_filter(path)]
+        summary = self.new_summary()
+        handled = set()
+
+        def process_chunk(pool, chunk, dest):
+            results = self.run_chunk(pool, chunk, dest)
+            handled.update(result['source'] for result in results if result['status'] != 'cancelled')
+            return results
+
+        try:
+            self.run_pipeline(iter(wanted), self.options.dest, summary, progress=False, process_chunk=process_chunk)
+        except Exception as e:
+            self.log(f"✗ Error processing a batch of {len(file_paths)} files: {str(e)}")
+            summary['errors'] += 1
+        self.save_undo_log()
+        summary['unhandled'] = [path for path in wanted if path not in handled]
+        return summary
+
+    def run_chunk(self, pool, chunk, dest):
+        # Push one chunk of files through metadata -> plan -> execute
+        analyzed = list(pool.map(self.analyze_file_safely, chunk))
+
+        if self.options.detect_duplicates:
+            self.duplicate_index.prepare(pool, [info for info in analyzed if 'size' in info])
+
+        planned = []
+        failed = []
+        for info in analyzed:
+            if info.get('cancelled'):
+                continue
+            if 'error' in info:
+                failed.append({'status': 'error', 'source': info['source'], 'error': info['error']})
+                continue
+            try:
+                with self.timed('plan'):
+                    planned.append(self.plan_file(info, dest))
+            except Exception as e:
+                self.log(f"✗ Error processing {os.path.basename(info['source'])}: {str(e)}")
+                failed.append({'status': 'error', 'source': info['source'], 'error': str(e)})
+
+        if self.plan_writer is not None:
+            for entry in planned:
+                self.plan_writer.add(entry)
+
+        # A duplicate is only deleted once the file it duplicates is in place - the kept
+        # original may be placed by another worker of this same chunk
+        placing = [entry for entry in planned if entry['op'] != 'delete_duplicate']
+        deleting = [entry for entry in planned if entry['op'] == 'delete_duplicate']
+        self.create_folders(placing)
+        placed = list(pool.map(self.execute_plan_safely, placing))
+        return failed + placed + list(pool.map(self.execute_plan_safely, deleting))
+
+    def count_result(self, summary, result):
+        # Add one file result to the run summary counters
+        if result['status'] == 'error':
+            summary['errors'] += 1
+            return
+        if result['status'] == 'stale':
+            summary['stale'] = summary.get('stale', 0) + 1
+            return
+        for key, counts in (('copy_method', 'copy_methods'), ('move_method', 'move_methods')):
+            if result.get(key):
+                methods = summary.setdefault(counts, {})
+                methods[result[key]] = methods.get(result[key], 0) + 1
+        if result['duplicate']:
+            summary['duplicates'] += 1
+        if result['status'] in ('skipped_duplicate', 'deleted_duplicate', 'would_delete_duplicate'):
+            return
+        category = result['folder'].split(os.sep)[0]
+        summary['categories'][category] = summary['categories'].get(category, 0) + 1
+        summary['organized'] += 1
+
+    def log_summary(self, summary):
+        # Write the end-of-run summary to the log
+        self.log("\n" + "="*50)
+        if summary['cancelled']:
+            self.log("Operation cancelled!")
+            self.log(f"Processed: {summary['organized']} files before cancellation")
+        elif summary['dry_run']:
+            self.log("DRY RUN PREVIEW COMPLETE!")
+            self.log(f"Would organize: {summary['organized']} files")
+            self.log("(No files were actually moved or copied)")
+        else:
+            self.log("Organization complete!")
+            action = "moved" if summary['operation'] == "move" else "copied"
+            self.log(f"Successfully {action}: {summary['organized']} files")
+
+        if summary['duplicates'] > 0:
+            self.log(f"Duplicates found: {summary['duplicates']}")
+        if 'hashed' in summary:
+            hashed = summary['hashed']
+            self.log(f"Duplicate check hashed: {hashed['partial_hashes']} partial, {hashed['full_hashes']} full")
+        if 'copy_methods' in summary:
+            methods = ", ".join(f"{method}: {count}" for method, count in sorted(summary['copy_methods'].items()))
+            self.log(f"Copy methods: {methods}")
+        if 'move_methods' in summary:
+            moves = summary['move_methods']
+            self.log(f"Moves: {moves.get('rename', 0)} renamed in place, "
+                     f"{moves.get('cross-device', 0)} copied across filesystems")
+        if summary.get('cloud_pending'):
+            self.log(f"Cloud uploads still running: {summary['cloud_pending']}")
+        if 'cache' in summary:
+            self.log(f"Metadata cache: {summary['cache']['hits']} reused, {summary['cache']['misses']} read")
+
+        if summary['categories']:
+            self.log("\nFiles by category:")
+            for cat, count in sorted(summary['categories'].items()):
+                self.log(f"  • {cat}: {count} files")
+
+        if 'stats' in summary:
+            self.log_stats(summary['stats'])
+        if 'profile_file' in summary:
+            self.log(f"Profile saved: {summary['profile_file']}")
+        if 'stats_file' in summary:
+            self.log(f"Statistics saved: {summary['stats_file']}")
+
+        if 'plan_file' in summary:
+            self.log(f"\nPlan saved: {summary['plan_file']} - execute it to apply exactly this preview")
+        if summary.get('stale'):
+            self.log(f"\nChanged since the dry run (left alone): {summary['stale']} files")
+        if summary['errors'] > 0:
+            self.log(f"\nErrors: {summary['errors']} files")
+        self.log("="*50)
+
+    def log_stats(self, stats):
+        # Time by stage, slowest first - worker time adds up, so stages can exceed the run
+        self.log(f"\nTime by stage ({stats['wall_seconds']:.2f}s run):")
+        for name, stage in sorted(stats['stages'].items(), key=lambda item: -item[1]['seconds']):
+            p99 = f"≤ {stage['p99_ms']}" if stage['p99_ms'] is not None else f"> {HISTOGRAM_BOUNDS_MS[-1]}"
+            self.log(f"  • {name}: {stage['seconds']:.3f}s, {stage['count']} × {stage['mean_ms']:.2f} ms "
+                     f"(p99 {p99} ms, max {stage['max_ms']:.1f} ms)")
+        counters = stats['counters']
+        megabyte = 1024 * 1024
+        self.log(f"Read {counters['bytes_read'] / megabyte:.1f} MB, wrote {counters['bytes_written'] / megabyte:.1f} MB, "
+                 f"{counters['retries']} retries")
+
+    # ===== UNDO LOG =====
+    #
+    # The journal holds every batch not undone yet: a 'batch' header, then one record per
+    # operation tagged with the batch id. Only the per-batch summaries in undo_batches are
+    # kept in memory; the operations of a batch are streamed from the journal when it is undone.
+
+    def load_undo_log(self):
+        # Read batch summaries from the journal, streaming it line by line
+        self.undo_batches = {}
+        self.current_batch = None
+        self.next_batch_id = 1
+        try:
+            legacy = self.read_legacy_undo_log()
+            if legacy is not None:
+                # Convert the JSON list of earlier versions to the journal (as one batch)
+                self.undo_journal.compact(self.with_batch_headers(legacy))
+
+            undone = set()
+            for record in self.undo_journal.read():
+                if record['type'] == 'batch':
+                    self.undo_batches[record['batch']] = dict(record, operations=0)
+                elif record['type'] == 'undone':
+                    undone.add(record['batch'])
+                elif record.get('batch') in self.undo_batches:
+                    self.undo_batches[record['batch']]['operations'] += 1
+                self.next_batch_id = max(self.next_batch_id, int(record.get('batch', 0)) + 1)
+
+            for batch_id in undone:
+                self.undo_batches.pop(batch_id, None)
+            if undone or self.undo_journal.damaged_lines:
+                # An undo was interrupted, or a crash tore a line - rewrite without them
+                self.compact_undo_log()
+        except Exception:
+            self.undo_batches = {}
+
+    def with_batch_headers(self, operations):
+        # Records for operations logged without a batch id, as batch 1
+        # An empty legacy log becomes an empty journal, not a batch of nothing to undo
+        if not operations:
+            return
+        yield {'type': 'batch', 'batch': 1, 'started': operations[0]['timestamp'], 'label': "organize"}
+        for operation in operations:
+            yield dict(operation, batch=1)
+
+    def read_legacy_undo_log(self):
+        # Operations from an undo log written as one JSON list, or None if there is none
+        path = self.log_file
+        if not os.path.exists(path):
+            legacy_path = os.path.join(os.path.dirname(path), LEGACY_UNDO_LOG_FILE)
+            if os.path.basename(path) != UNDO_LOG_FILE or not os.path.exists(legacy_path):
+                return None
+            path = legacy_path
+
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read(1) != '[':
+                return None
+            f.seek(0)
+            operations = json.load(f)
+
+        if path != self.log_file:
+            os.remove(path)
+        return operations
+
+    def compact_undo_log(self):
+        # Rewrite the journal with only the records of batches still in undo_batches
+        live = set(self.undo_batches)
+        try:
+            self.undo_journal.compact(
+                record for record in self.undo_journal.read()
+                if record['type'] != 'undone' and record.get('batch') in live
+            )
+        except Exception as e:
+            self.log(f"Warning: Could not save undo log: {str(e)}")
+
+    def save_undo_log(self):
+        # Make every recorded operation durable (records are appended as they happen)
+        try:
+            self.undo_journal.sync()
+        except Exception as e:
+            self.log(f"Warning: Could not save undo log: {str(e)}")
+
+    def start_undo_batch(self, label):
+        # Operations recorded from now on form a new batch (an organize run or watch session)
+        # The batch header is only written once the first operation is recorded
+        with self.undo_lock:
+            self.current_batch = {
+                'type': 'batch',
+                'batch': self.next_batch_id,
+                'started': datetime.now().isoformat(),
+                'label': label,
+            }
+            self.next_batch_id += 1
+
+    def add_to_undo_log(self, operation_type, source, destination):
+        # Add an operation to the undo log - one journal line, nothing is rewritten
+        with self.undo_lock:
+            if self.current_batch is None:
+                self.start_undo_batch("watch mode")
+            batch = self.current_batch
+            operation = {
+                'type': operation_type,
+                'batch': batch['batch'],
+                'source': source,
+                'destination': destination,
+                'timestamp': datetime.now().isoformat()
+            }
+            try:
+                if batch['batch'] not in self.undo_batches:
+                    self.undo_journal.append(batch)
+                    self.undo_batches[batch['batch']] = dict(batch, operations=0)
+                self.undo_journal.append(operation)
+                self.undo_batches[batch['batch']]['operations'] += 1
+            except Exception as e:
+                self.log(f"Warning: Could not save undo log: {str(e)}")
+
+    def last_undo_batch(self):
+        # Summary dict of the most recent batch that can be undone, or None
+        return list(self.undo_batches.values())[-1] if self.undo_batches else None
+
+    def undo_last_batch(self):
+        # Undo the last batch of operations - returns (success_count, error_count)
+        batch = self.last_undo_batch()
+        return self.undo_batch(batch['batch'] if batch else None)
+
+    def undo_batch(self, batch_id):
+        # Undo every operation of one batch - returns (success_count, error_count)
+        # Source folders are created up front, then the operations are reversed on the
+        # worker pool; operations that touch the same path again are reversed in order
+        if batch_id not in self.undo_batches:
+            raise OrganizerError(f"No undo batch {batch_id}")
+        if self.current_batch is not None and self.current_batch['batch'] == batch_id:
+            # Later operations must not be added to a batch that has been undone
+            self.current_batch = None
+
+        self.log(f"Starting undo operation (batch {batch_id})...")
+        self.log("="*50)
+
+        operations = [record for record in self.undo_journal.read()
+                      if record.get('batch') == batch_id and record['type'] in ('move', 'copy')]
+        operations.reverse()
+        total = len(operations)
+        self.emit('progress', value=0, maximum=total)
+
+        # Paths touched more than once must be restored one after the other, newest first
+        seen = {}
+        for operation in operations:
+            for path in (operation['source'], operation['destination']):
+                seen[path] = seen.get(path, 0) + 1
+        ordered = [op for op in operations if seen[op['source']] > 1 or seen[op['destination']] > 1]
+        independent = [op for op in operations if seen[op['source']] == 1 and seen[op['destination']] == 1]
+
+        DirectoryCache().ensure_all(os.path.dirname(op['source']) for op in operations if op['type'] == 'move')
+
+        restored = []
+        with ThreadPoolExecutor(max_workers=self.options.workers) as pool:
+            for operation in ordered:
+                restored.append(self.undo_operation(operation))
+            self.emit('progress', value=len(restored), maximum=total)
+            for start in range(0, len(independent), PIPELINE_CHUNK_SIZE):
+                restored.extend(pool.map(self.undo_operation, independent[start:start + PIPELINE_CHUNK_SIZE]))
+                self.emit('progress', value=len(restored), maximum=total)
+        success_count = sum(restored)
+        error_count = total - success_count
+
+        # Mark the batch undone first - if compaction is interrupted, the next load finishes it
+        self.undo_batches.pop(batch_id, None)
+        try:
+            self.undo_journal.append({'type': 'undone', 'batch': batch_id})
+            self.undo_journal.sync()
+        except Exception as e:
+            self.log(f"Warning: Could not save undo log: {str(e)}")
+        self.compact_undo_log()
+
+        self.log("="*50)
+        self.log("Undo complete!")
+        self.log(f"Successfully restored: {success_count} files")
+        if error_count > 0:
+            self.log(f"Errors: {error_count}")
+
+        self.emit('undo_summary', batch=batch_id, restored=success_count, errors=error_count)
+        return success_count, error_count
+
+    def undo_operation(self, operation):
+        # Reverse one operation - returns True if it was undone
+        try:
+            dest = operation['destination']
+            src = operation['source']
+            op_type = operation['type']
+
+            if not os.path.exists(dest):
+                self.log(f"✗ File not found: {dest}")
+                return False
+
+            if op_type == 'move':
+                if os.path.exists(src):
+                    self.log(f"✗ Not restored, a file already exists at: {src}")
+                    return False
+                # Same filesystem - a rename, no data is copied
+                move_file(dest, src)
+                self.log(f"✓ Restored: {os.path.basename(dest)} → {src}")
+                return True
+
+            os.remove(dest)
+            self.log(f"✓ Removed copy: {dest}")
+            return True
+
+        except Exception as e:
+            self.log(f"✗ Error undoing operation: {str(e)}")
+            return False
@@ -0,0 +1,228 @@
+# File Organizer - Run Statistics
+# Optional instrumentation of the organizing pipeline: where the time of a run went
+#
+# RunStats keeps, per stage (scan, analyze, exif date, partial/full hash, plan, name probing,
+# folders, transfer, cloud upload...), how often it ran, the total time and a histogram of
+# the time per pass, plus counters (bytes read and written, retries). Most stages run once
+# per file; scan, folders and flush run once per chunk. Stages on the worker pool overlap,
+# so their totals add up to more than the wall time of the run.
+# Stages are timed with "with stats.stage(name):" - NO_TIMER stands in when statistics are
+# off, so the hot paths cost nothing extra then.
+#
+# Profiler is the opt-in profiling hook for a run:
+#   cprofile - cProfile of the run and of every pool worker, merged into one pstats file
+#              (open it with "python -m pstats FILE" or snakeviz)
+#   sample   - every thread's stack sampled every SAMPLE_INTERVAL seconds, written as
+#              collapsed stacks ("frame;frame;frame count"), the input of flamegraph.pl or speedscope
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+
+STATS_FILE = "file_organizer_stats.json"
+
+PROFILERS = ["cprofile", "sample"]
+
+# Upper bounds of the histogram buckets (milliseconds) - one more bucket for anything slower
+HISTOGRAM_BOUNDS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+
+# Time between two stack samples of the sampling profiler
+SAMPLE_INTERVAL = 0.005
+
+# Shared stand-in for stage() when statistics are off
+NO_TIMER = nullcontext()
+
+
+class Histogram:
+    # Counts of values (milliseconds) per HISTOGRAM_BOUNDS_MS bucket
+    def __init__(self, bounds=HISTOGRAM_BOUNDS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+
+    def add(self, value):
+        index = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.total += 1
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding this fraction of the values - None when empty or
+        # past the last bound (inf would be written as Infinity, which isn't valid JSON)
+        if not self.total:
+            return None
+        wanted = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted:
+                return self.bounds[index] if index < len(self.bounds) else None
+        return None
+
+    def as_dict(self):
+        labels = [f"<={bound}ms" for bound in self.bounds] + [f">{self.bounds[-1]}ms"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+class StageTimer:
+    # Context manager timing one pass through a stage
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class RunStats:
+    # Per-stage timers and counters of one run - safe to share between threads
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}  # name -> [count, seconds, max seconds, Histogram]
+        self.counters = {'bytes_read': 0, 'bytes_written': 0, 'retries': 0}
+        self.started = time.perf_counter()
+
+    def stage(self, name):
+        return StageTimer(self, name)
+
+    def record(self, name, seconds):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = [0, 0.0, 0.0, Histogram()]
+            stage[0] += 1
+            stage[1] += seconds
+            stage[2] = max(stage[2], seconds)
+            stage[3].add(seconds * 1000)
+
+    def add(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def as_dict(self):
+        # Plain dict for the run summary and the stats file
+        with self.lock:
+            stages = {}
+            for name, (count, seconds, longest, histogram) in self.stages.items():
+                stages[name] = {
+                    'count': count,
+                    'seconds': round(seconds, 4),
+                    'mean_ms': round(seconds * 1000 / count, 3),
+                    'max_ms': round(longest * 1000, 3),
+                    'p50_ms': histogram.percentile(0.5),
+                    'p99_ms': histogram.percentile(0.99),
+                    'histogram': histogram.as_dict(),
+                }
+            return {
+                'wall_seconds': round(time.perf_counter() - self.started, 4),
+                'stages': stages,
+                'counters': dict(self.counters),
+            }
+
+
+def write_stats_file(path, summary):
+    # Save a run summary (with its 'stats') as JSON - written whole, then renamed into place
+    record = dict(summary, written=datetime.now().isoformat())
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def profile_path(stats_file, kind):
+    # Where the profile of a run goes - next to its stats file
+    base = os.path.splitext(stats_file or STATS_FILE)[0]
+    return base + (".prof" if kind == "cprofile" else ".stacks.txt")
+
+
+class Profiler:
+    # Opt-in profiling of a run - start(), thread_started() in every pool worker, stop()
+    def __init__(self, kind, path):
+        self.kind = kind
+        self.path = path
+        self.lock = threading.Lock()
+        self.profiles = []  # cProfile.Profile per thread
+        self.samples = {}  # collapsed stack -> times seen
+        self.sampler = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        if self.kind == "cprofile":
+            self.thread_started()
+        else:
+            self.sampler = threading.Thread(target=self.run_sampler, daemon=True)
+            self.sampler.start()
+
+    def thread_started(self):
+        # Pool initializer - cProfile only follows the thread it was enabled on
+        if self.kind != "cprofile" or not self.running:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from the first enable() already
+            return
+        with self.lock:
+            self.profiles.append(profile)
+
+    def run_sampler(self):
+        own = threading.get_ident()
+        while self.running:
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+            time.sleep(SAMPLE_INTERVAL)
+
+    def stop(self):
+        # Stop profiling and write the profile - returns its path, or None if nothing was seen
+        if not self.running:
+            return None
+        self.running = False
+        if self.kind == "cprofile":
+            with self.lock:
+                profiles, self.profiles = self.profiles, []
+            if not profiles:
+                return None
+            # The calling thread's profile first - disabling it must not wait for the rest
+            profiles[0].disable()
+            merged = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                merged.add(profile)
+            merged.dump_stats(self.path)
+            return self.path
+
+        self.sampler.join()
+        if not self.samples:
+            return None
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+        return self.path
@@ -0,0 +1,51 @@
+# File Organizer - Streaming Scanner
+# Walks a source folder with os.scandir and yields files as they are found, so the
+# pipeline can start on the first chunk while the rest of the tree is still being read
+#
+# Files are yielded as os.DirEntry objects: their stat() result is cached (and on Windows
+# comes free with the directory listing), so the metadata stage never stats a file twice.
+# Each directory is listed completely before its files are yielded - files moved out of
+# it meanwhile can't confuse the listing.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+
+
+def scan_files(folder, extensions=None, exclude=()):
+    # Yield a DirEntry for every visible file under folder, depth first
+    # extensions - only files with one of these (lower case) suffixes, or all files if None
+    # exclude    - folders not to descend into (e.g. a destination inside the source)
+    excluded = {os.path.normcase(os.path.abspath(path)) for path in exclude}
+    stack = [folder]
+
+    while stack:
+        current = stack.pop()
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            # Like os.walk: symlinked folders are not followed
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+
+                    if entry.name.startswith('.'):
+                        continue
+                    if extensions is not None and os.path.splitext(entry.name)[1].lower() not in extensions:
+                        continue
+                    files.append(entry)
+        except OSError:
+            # Unreadable folder - skipped, like os.walk does
+            continue
+
+        yield from files
+
+        for path in reversed(subdirs):
+            if os.path.normcase(os.path.abspath(path)) not in excluded:
+                stack.append(path)
@@ -0,0 +1,37 @@
+# File Organizer - Test Setup
+# The modules live side by side in the Main folder - put it on the path, as the benchmarks do
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from organizer_engine import UNDO_LOG_FILE, OrganizerEngine, OrganizerOptions  # noqa: E402
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    # OrganizerEngine(options) factory with its undo log and metadata cache in tmp_path,
+    # and only the built-in categories
+    engines = []
+
+    def make(**options):
+        engine = OrganizerEngine(OrganizerOptions(**options), log_file=str(tmp_path / UNDO_LOG_FILE),
+                                 cache_file=str(tmp_path / "metadata.sqlite"), rules_file=None)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.close()
+
+
+def write_file(path, content):
+    # Create a file (and its folder) with this text content - returns its path as a string
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    return str(path)
@@ -0,0 +1,120 @@
+# File Organizer - Classifier Tests
+# Category rules: extensions, glob/regex patterns, compound suffixes and bad rules
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import json
+
+import pytest
+
+from classifier import FileClassifier
+from conftest import write_file
+
+
+def test_builtin_categories():
+    classifier = FileClassifier()
+    assert classifier.category("photo.JPG") == "Images"
+    assert classifier.category("notes.txt") == "Documents"
+    assert classifier.category("no_suffix", sniff=False) == "Other"
+    assert classifier.category(".hidden") == "Other"
+
+
+def test_longest_suffix_wins():
+    classifier = FileClassifier(rules={'extensions': {'.tar.zst': "Backups", 'zst': "Archives"}})
+    assert classifier.category("site.tar.zst") == "Backups"
+    assert classifier.category("site.zst") == "Archives"
+    assert classifier.category("site.tar.gz") == "Archives"
+
+
+def test_extension_rule_moves_the_suffix():
+    classifier = FileClassifier(rules={'extensions': {'.md': "Code"}})
+    assert classifier.category("README.md") == "Code"
+    assert '.md' in classifier.categories["Code"]
+    assert '.md' not in classifier.categories["Documents"]
+
+
+def test_patterns_come_before_extensions_in_order():
+    classifier = FileClassifier(rules={'patterns': [
+        {'glob': "Screenshot*", 'category': "Screenshots"},
+        {'regex': r"^IMG_\d+", 'category': "Camera"},
+        {'glob': "*.png", 'category': "Graphics"},
+    ]})
+    assert classifier.category("screenshot 2024.PNG") == "Screenshots"
+    assert classifier.category("IMG_0042.jpg") == "Camera"
+    assert classifier.category("img_0042.jpg") == "Images"
+    assert classifier.category("logo.png") == "Graphics"
+    assert {"Screenshots", "Camera", "Graphics"} <= set(classifier.categories)
+
+
+def test_glob_matches_the_whole_name():
+    classifier = FileClassifier(rules={'patterns': [{'glob': "report", 'category': "Reports"}]})
+    assert classifier.category("report") == "Reports"
+    assert classifier.category("report.pdf") == "Documents"
+
+
+def test_regex_with_inline_flags():
+    classifier = FileClassifier(rules={'patterns': [
+        {'glob': "*.tmp", 'category': "Temporary"},
+        {'regex': r"(?i)^img_", 'category': "Camera"},
+    ]})
+    assert classifier.errors == []
+    assert classifier.category("img_1.jpg") == "Camera"
+    assert classifier.category("IMG_1.jpg") == "Camera"
+
+
+def test_regex_backreferences_count_from_their_own_rule():
+    classifier = FileClassifier(rules={'patterns': [
+        {'glob': "*.tmp", 'category': "Temporary"},
+        {'regex': r"^(a)\1", 'category': "Doubled"},
+    ]})
+    assert classifier.category("aa.txt") == "Doubled"
+    assert classifier.category("ab.txt") == "Documents"
+
+
+def test_bad_pattern_is_skipped_by_rule_number():
+    classifier = FileClassifier(rules={'patterns': [
+        {'regex': "(unclosed", 'category': "Broken"},
+        {'glob': "*.log"},
+        {'glob': "Screenshot*", 'category': "Screenshots"},
+    ]})
+    assert len(classifier.errors) == 2
+    assert classifier.errors[0].startswith("pattern rule 1 ")
+    assert classifier.errors[1].startswith("pattern rule 2 ")
+    assert "Broken" not in classifier.categories
+    assert classifier.category("Screenshot.png") == "Screenshots"
+
+
+def test_sniffs_files_without_a_suffix(tmp_path):
+    path = tmp_path / "scan"
+    path.write_bytes(b"%PDF-1.7\n")
+    assert FileClassifier().category(str(path)) == "Other"
+    assert FileClassifier(rules={'sniff_extensionless': True}).category(str(path)) == "Documents"
+
+
+def test_rules_file(tmp_path):
+    path = write_file(tmp_path / "rules.json", json.dumps({
+        'extensions': {'.blend': "3D Models"},
+        'patterns': [{'regex': "(", 'category': "Broken"}, {'glob': "Screenshot*", 'category': "Screenshots"}],
+    }))
+    classifier = FileClassifier.from_file(path)
+    assert classifier.category("scene.blend") == "3D Models"
+    assert classifier.category("Screenshot.png") == "Screenshots"
+    assert len(classifier.errors) == 1
+
+
+def test_missing_rules_file_uses_the_builtin_table(tmp_path):
+    classifier = FileClassifier.from_file(str(tmp_path / "missing.json"))
+    assert classifier.patterns == []
+    assert classifier.category("a.mp3") == "Audio"
+
+
+def test_unreadable_rules_file_raises_value_error(tmp_path):
+    path = write_file(tmp_path / "rules.json", "{not json")
+    with pytest.raises(ValueError):
+        FileClassifier.from_file(path)
+
+
+def test_suffixes_for_a_category():
+    classifier = FileClassifier()
+    assert '.gz' in classifier.suffixes_for("Archives")
+    assert FileClassifier(rules={'patterns': [{'glob': "x*", 'category': "X"}]}).suffixes_for("Archives") is None
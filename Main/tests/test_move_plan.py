@@ -0,0 +1,128 @@
+# File Organizer - Plan Replay Tests
+# Dry run -> execute-plan -> undo, and what a replay does with files changed in between
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+
+from conftest import write_file
+from move_plan import read_plan_entries
+
+
+def files_under(folder):
+    # Relative path -> text of every file under folder (the library index and its kin aside)
+    found = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            if name.startswith('.'):
+                continue
+            path = os.path.join(root, name)
+            with open(path, encoding='utf-8') as f:
+                found[os.path.relpath(path, folder)] = f.read()
+    return found
+
+
+def dry_run(make_engine, tmp_path, source, **options):
+    plan = str(tmp_path / "plan.jsonl")
+    make_engine(source=str(source), dest=str(tmp_path / "library"), method="alpha",
+                dry_run=True, plan_file=plan, **options).run()
+    return plan
+
+
+def test_plan_round_trip(make_engine, tmp_path):
+    source = tmp_path / "inbox"
+    write_file(source / "apple.txt", "apple")
+    write_file(source / "banana.jpg", "banana")
+    plan = dry_run(make_engine, tmp_path, source)
+
+    # The dry run leaves everything where it is
+    assert files_under(str(source)) == {"apple.txt": "apple", "banana.jpg": "banana"}
+    assert not os.path.exists(tmp_path / "library")
+
+    engine = make_engine()
+    summary = engine.run_plan(plan)
+    assert summary['organized'] == 2
+    assert summary['stale'] == 0
+    assert files_under(str(source)) == {}
+    placed = files_under(str(tmp_path / "library"))
+    assert sorted(placed.values()) == ["apple", "banana"]
+
+    assert engine.undo_last_batch() == (2, 0)
+    assert files_under(str(source)) == {"apple.txt": "apple", "banana.jpg": "banana"}
+    assert files_under(str(tmp_path / "library")) == {}
+
+
+def test_file_changed_since_the_dry_run_is_left_alone(make_engine, tmp_path):
+    source = tmp_path / "inbox"
+    write_file(source / "apple.txt", "apple")
+    write_file(source / "cherry.txt", "cherry")
+    plan = dry_run(make_engine, tmp_path, source)
+    write_file(source / "cherry.txt", "cherry pie")
+
+    summary = make_engine().run_plan(plan)
+    assert summary['organized'] == 1
+    assert summary['stale'] == 1
+    assert files_under(str(source)) == {"cherry.txt": "cherry pie"}
+
+
+def plan_duplicate(make_engine, tmp_path):
+    # Organize apple.txt into the library, then dry-run an identical copy with delete
+    # Returns (plan path, path of the kept library copy, path of the duplicate)
+    write_file(tmp_path / "first" / "apple.txt", "apple")
+    make_engine(source=str(tmp_path / "first"), dest=str(tmp_path / "library"), method="alpha",
+                detect_duplicates=True).run()
+    [kept] = files_under(str(tmp_path / "library"))
+    duplicate = write_file(tmp_path / "inbox" / "apple copy.txt", "apple")
+    plan = dry_run(make_engine, tmp_path, tmp_path / "inbox", detect_duplicates=True, duplicate_action="delete")
+    assert os.path.exists(duplicate)
+    return plan, str(tmp_path / "library" / kept), duplicate
+
+
+def test_duplicate_is_deleted_on_replay(make_engine, tmp_path):
+    plan, kept, duplicate = plan_duplicate(make_engine, tmp_path)
+    summary = make_engine().run_plan(plan)
+    assert summary['duplicates'] == 1
+    assert not os.path.exists(duplicate)
+    assert os.path.exists(kept)
+
+
+def test_duplicate_is_kept_when_the_kept_copy_changed(make_engine, tmp_path):
+    plan, kept, duplicate = plan_duplicate(make_engine, tmp_path)
+    # Same size, other content
+    write_file(tmp_path / "library" / os.path.relpath(kept, tmp_path / "library"), "APPLE")
+
+    make_engine().run_plan(plan)
+    assert os.path.exists(duplicate)
+    with open(kept, encoding='utf-8') as f:
+        assert f.read() == "APPLE"
+
+
+def test_kept_copy_with_a_new_date_is_hashed_again(make_engine, tmp_path):
+    plan, kept, duplicate = plan_duplicate(make_engine, tmp_path)
+    st = os.stat(kept)
+    os.utime(kept, ns=(st.st_atime_ns, st.st_mtime_ns + 5 * 10**9))
+
+    make_engine().run_plan(plan)
+    assert not os.path.exists(duplicate)
+    assert os.path.exists(kept)
+
+
+def test_duplicate_follows_a_renamed_destination(make_engine, tmp_path):
+    # The dry run places one banana and marks the other as a duplicate of its planned
+    # destination; a file taking that name before the replay places it under another name
+    source = tmp_path / "inbox"
+    write_file(source / "banana.txt", "banana")
+    write_file(source / "banana copy.txt", "banana")
+    plan = dry_run(make_engine, tmp_path, source, detect_duplicates=True, duplicate_action="delete")
+    [placing, duplicate] = sorted(read_plan_entries(plan), key=lambda record: record['op'] == "delete_duplicate")
+    assert (placing['op'], duplicate['op']) == ("move", "delete_duplicate")
+    assert duplicate['existing'] == placing['destination']
+    taken = placing['destination']
+    write_file(tmp_path / "library" / os.path.relpath(taken, tmp_path / "library"), "other")
+
+    make_engine().run_plan(plan)
+    assert files_under(str(source)) == {}
+    placed = files_under(os.path.dirname(taken))
+    name = os.path.basename(taken)
+    assert placed.pop(name) == "other"
+    assert list(placed.values()) == ["banana"]
@@ -0,0 +1,79 @@
+# File Organizer - Undo Journal Tests
+# Undo logs written as one JSON list by earlier versions are converted to the journal
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import json
+
+from conftest import write_file
+from organizer_engine import LEGACY_UNDO_LOG_FILE, UNDO_LOG_FILE
+
+
+def legacy_moves(tmp_path, names):
+    # Files "moved" to dest by an earlier version, and the operations it logged for them
+    operations = []
+    for name in names:
+        destination = write_file(tmp_path / "dest" / name, name)
+        operations.append({'type': 'move', 'source': str(tmp_path / "src" / name),
+                           'destination': destination, 'timestamp': f"2024-01-01T00:00:0{len(operations)}"})
+    return operations
+
+
+def test_legacy_file_becomes_one_batch(tmp_path, make_engine):
+    operations = legacy_moves(tmp_path, ["a.txt", "b.txt"])
+    legacy = tmp_path / LEGACY_UNDO_LOG_FILE
+    legacy.write_text(json.dumps(operations), encoding='utf-8')
+
+    engine = make_engine()
+
+    assert list(engine.undo_batches) == [1]
+    batch = engine.undo_batches[1]
+    assert batch['operations'] == 2
+    assert batch['started'] == "2024-01-01T00:00:00"
+    assert not legacy.exists()
+    assert (tmp_path / UNDO_LOG_FILE).exists()
+
+
+def test_legacy_list_in_the_log_file_itself(tmp_path, make_engine):
+    operations = legacy_moves(tmp_path, ["a.txt"])
+    (tmp_path / UNDO_LOG_FILE).write_text(json.dumps(operations), encoding='utf-8')
+
+    engine = make_engine()
+
+    assert engine.undo_batches[1]['operations'] == 1
+    first_line = (tmp_path / UNDO_LOG_FILE).read_text(encoding='utf-8').splitlines()[0]
+    assert json.loads(first_line)['type'] == 'batch'
+
+
+def test_converted_batch_can_be_undone(tmp_path, make_engine):
+    operations = legacy_moves(tmp_path, ["a.txt", "b.txt"])
+    (tmp_path / LEGACY_UNDO_LOG_FILE).write_text(json.dumps(operations), encoding='utf-8')
+
+    engine = make_engine()
+
+    assert engine.undo_last_batch() == (2, 0)
+    assert (tmp_path / "src" / "a.txt").read_text(encoding='utf-8') == "a.txt"
+    assert (tmp_path / "src" / "b.txt").exists()
+    assert not (tmp_path / "dest" / "a.txt").exists()
+    assert engine.undo_batches == {}
+
+
+def test_new_batches_follow_the_converted_one(tmp_path, make_engine):
+    (tmp_path / LEGACY_UNDO_LOG_FILE).write_text(json.dumps(legacy_moves(tmp_path, ["a.txt"])), encoding='utf-8')
+    source = write_file(tmp_path / "new" / "c.txt", "c")
+
+    engine = make_engine(selected_files=[source], dest=str(tmp_path / "organized"), method="alpha")
+    engine.run()
+
+    assert list(engine.undo_batches) == [1, 2]
+    assert engine.undo_batches[2]['operations'] == 1
+
+
+def test_empty_legacy_log_has_no_batches(tmp_path, make_engine):
+    (tmp_path / LEGACY_UNDO_LOG_FILE).write_text("[]", encoding='utf-8')
+
+    engine = make_engine()
+
+    assert engine.undo_batches == {}
+    assert engine.last_undo_batch() is None
+    assert (tmp_path / UNDO_LOG_FILE).read_text(encoding='utf-8') == ""
@@ -0,0 +1,183 @@
+# File Organizer - Watch Queue Tests
+# Events for the same file are coalesced, and a file is only processed once it settled
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import threading
+import time
+
+import pytest
+
+from conftest import write_file
+from watch_queue import WatchQueue
+
+
+SETTLE = 0.5
+
+
+def wait_until(condition, timeout=5.0):
+    # True as soon as condition() holds, False if it doesn't within timeout seconds
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class Recorder:
+    # process(path) callback that remembers what it was given, and when
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, path):
+        with self.lock:
+            self.calls.append((path, time.monotonic()))
+
+    def paths(self):
+        with self.lock:
+            return [path for path, _ in self.calls]
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def make_queue(recorder):
+    queues = []
+
+    def make(**kwargs):
+        kwargs.setdefault('settle_seconds', SETTLE)
+        queue = WatchQueue(recorder, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.stop()
+
+
+def test_repeated_events_are_processed_once(tmp_path, recorder, make_queue):
+    path = write_file(tmp_path / "a.txt", "a")
+    queue = make_queue()
+
+    for _ in range(20):
+        queue.notify(path)
+
+    assert wait_until(lambda: recorder.paths() == [path])
+    time.sleep(SETTLE * 2)
+    assert recorder.paths() == [path]
+    assert queue.stats['events'] == 20
+    assert queue.stats['coalesced'] == 19
+    assert len(queue) == 0
+
+
+def test_growing_file_waits_until_it_settles(tmp_path, recorder, make_queue):
+    target = tmp_path / "download.bin"
+    path = write_file(target, "")
+    queue = make_queue()
+
+    last_write = None
+    for index in range(10):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("x" * (index + 1))
+        last_write = time.monotonic()
+        queue.notify(path)
+        time.sleep(0.1)
+        assert recorder.paths() == []
+
+    assert wait_until(lambda: recorder.paths() == [path])
+    assert recorder.calls[0][1] - last_write >= SETTLE
+
+
+def test_size_change_without_event_restarts_the_wait(tmp_path, recorder, make_queue):
+    path = write_file(tmp_path / "copy.bin", "x")
+    queue = make_queue()
+    queue.notify(path)
+
+    # Written to without an event - only the size/mtime check can notice
+    time.sleep(SETTLE * 0.8)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("more")
+    changed = time.monotonic()
+
+    assert wait_until(lambda: recorder.paths() == [path])
+    assert recorder.calls[0][1] - changed >= SETTLE * 0.9
+
+
+def test_closed_file_skips_the_settle_wait(tmp_path, recorder, make_queue):
+    path = write_file(tmp_path / "a.txt", "a")
+    queue = make_queue(settle_seconds=30)
+
+    queue.notify(path, closed=True)
+
+    assert wait_until(lambda: recorder.paths() == [path], timeout=3)
+
+
+def test_file_gone_before_it_settled_is_dropped(tmp_path, recorder, make_queue):
+    queue = make_queue()
+
+    queue.notify(str(tmp_path / "never-written.tmp"))
+
+    assert wait_until(lambda: len(queue) == 0)
+    time.sleep(SETTLE)
+    assert recorder.paths() == []
+
+
+def test_event_while_processing_queues_the_file_again(tmp_path, make_queue):
+    path = write_file(tmp_path / "a.txt", "a")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_process(p):
+        calls.append(p)
+        started.set()
+        release.wait(5)
+
+    queue = make_queue()
+    queue.process = slow_process
+    queue.notify(path)
+    assert started.wait(5)
+
+    queue.notify(path)
+    release.set()
+
+    assert wait_until(lambda: len(calls) == 2)
+    assert queue.stats['processed'] == 2
+
+
+def test_batch_files_left_unhandled_are_retried(tmp_path, make_queue):
+    paths = [write_file(tmp_path / f"{index}.txt", str(index)) for index in range(4)]
+    batches = []
+
+    def process_batch(batch):
+        batches.append(sorted(batch))
+        # The first batch only gets to half of its files
+        unhandled = sorted(batch)[2:] if len(batches) == 1 else []
+        return {'unhandled': unhandled}
+
+    queue = make_queue(process_batch=process_batch, batch_threshold=1)
+    for path in paths:
+        queue.notify(path, closed=True)
+
+    assert wait_until(lambda: len(batches) >= 2 and len(queue) == 0)
+    assert batches[0] == sorted(paths)
+    assert batches[1] == sorted(paths)[2:]
+    assert queue.stats['processed'] == 4
+
+
+def test_engine_batch_ignores_a_stale_cancel(tmp_path, make_engine):
+    paths = [write_file(tmp_path / "src" / f"{index}.txt", str(index)) for index in range(3)]
+    engine = make_engine(source=str(tmp_path / "src"), dest=str(tmp_path / "dest"), method="alpha")
+    engine.start_watch_session()
+    # A cancelled run before
+    engine.cancel_requested = True
+
+    summary = engine.process_batch(paths)
+
+    assert summary['organized'] == 3
+    assert summary['unhandled'] == []
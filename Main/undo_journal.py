@@ -0,0 +1,112 @@
+# File Organizer - Undo Journal
+# Append-only undo log: one JSON object per line (JSON Lines), one line per operation
+#
+# Recording an operation appends one line instead of rewriting the whole log, so a long
+# watch-mode session writes each operation once. Lines are flushed to the OS right away
+# and fsync'ed in batches (every FSYNC_EVERY records or FSYNC_SECONDS, and on sync()).
+# A line cut short by a crash is skipped when the journal is read back.
+#
+# Records carry a batch id (one batch per organize run or watch session). Undoing a batch
+# appends an "undone" marker, then compact() rewrites the journal without that batch,
+# atomically (temporary file + os.replace).
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import json
+import os
+import threading
+import time
+
+
+# fsync after this many appended records...
+FSYNC_EVERY = 100
+
+# ...or when this many seconds have passed since the last fsync
+FSYNC_SECONDS = 2.0
+
+
+class UndoJournal:
+    # JSON Lines journal of undo records - safe to append to from several workers
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.damaged_lines = 0  # Unreadable lines seen by the last read()
+
+    # ===== READING =====
+
+    def read(self):
+        # Yield every record in the journal, streaming it line by line
+        self.damaged_lines = 0
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Torn write from a crash - the operation never completed its record
+                    self.damaged_lines += 1
+
+    # ===== WRITING =====
+
+    def _open(self):
+        # Called with the lock held
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        return self.file
+
+    def append(self, record):
+        # Add one record - it reaches the OS immediately and the disk within the fsync batch
+        line = json.dumps(record, separators=(',', ':')) + "\n"
+        with self.lock:
+            f = self._open()
+            f.write(line)
+            f.flush()
+            self.unsynced += 1
+            if self.unsynced >= FSYNC_EVERY or time.monotonic() - self.last_sync >= FSYNC_SECONDS:
+                self._sync()
+
+    def _sync(self):
+        # Called with the lock held
+        if self.file is not None and self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def sync(self):
+        # Make every appended record durable
+        with self.lock:
+            self._sync()
+
+    def compact(self, records):
+        # Replace the journal with records (e.g. what is left after an undo)
+        # records may be a generator reading this same journal - it is streamed, never
+        # held in memory, and only replaces the journal once it is completely written
+        tmp_path = self.path + ".tmp"
+        with self.lock:
+            self.close_file()
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(',', ':')) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.unsynced = 0
+
+    def close_file(self):
+        # Called with the lock held
+        if self.file is not None:
+            self._sync()
+            self.file.close()
+            self.file = None
+
+    def close(self):
+        with self.lock:
+            self.close_file()
@@ -0,0 +1,131 @@
+# File Organizer - Watch Mode Checkpoint
+# Remembers how far watch mode got, so a restart only catches up on what changed meanwhile
+#
+# The checkpoint holds, per watched folder:
+#   watermark_ns - every file changed before this time has been handled
+#   seen         - (device, inode, change time) of files handled since the watermark, so a
+#                  file left in the source (copy mode) isn't organized a second time
+# A file's change time is the later of its mtime and ctime: a file moved or copied in with
+# an old mtime still gets a fresh ctime.
+#
+# The catch-up scan compares every file's change time with the watermark - a folder's mtime
+# only moves when entries are added, removed or renamed, not when a file in it is
+# rewritten in place, so no folder can be skipped. The scan reuses the stat results
+# os.scandir already has (free on Windows; one stat per file elsewhere).
+# The file is written atomically (temporary file + os.replace).
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import json
+import os
+import threading
+
+from scanner import scan_files
+
+
+WATCH_CHECKPOINT_FILE = "file_organizer_watch_checkpoint.json"
+
+# Margin for coarse file timestamps (FAT has 2 second mtimes) and event delivery delay
+WATERMARK_SLACK_NS = 2 * 1000 * 1000 * 1000
+
+
+def changed_ns(st):
+    # Last time the file's content or directory entry changed
+    return max(st.st_mtime_ns, st.st_ctime_ns)
+
+
+class WatchCheckpoint:
+    # Persisted progress of watch mode for one source folder
+    def __init__(self, path, source):
+        self.path = path
+        self.source = os.path.normcase(os.path.abspath(source))
+        self.lock = threading.Lock()
+        self.watermark_ns = None  # None - no checkpoint yet, everything is new
+        self.seen = {}  # (device, inode) -> change time
+        self.dirty = False
+
+    # ===== LOADING =====
+
+    def load(self):
+        # Read the checkpoint for this source - returns False if there is none
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f).get(self.source)
+        except (OSError, ValueError, AttributeError):
+            return False
+        if not data:
+            return False
+        try:
+            self.watermark_ns = int(data['watermark_ns'])
+            self.seen = {(dev, ino): ns for dev, ino, ns in data.get('seen', [])}
+        except (KeyError, TypeError, ValueError):
+            self.watermark_ns = None
+            self.seen = {}
+            return False
+        return True
+
+    # ===== CHECKS =====
+
+    def is_new(self, st):
+        # True if a file with this stat result hasn't been handled yet
+        if self.watermark_ns is None:
+            return True
+        changed = changed_ns(st)
+        if changed < self.watermark_ns:
+            return False
+        with self.lock:
+            return self.seen.get((st.st_dev, st.st_ino)) != changed
+
+    def catch_up_files(self, extensions=None, exclude=()):
+        # Yield a DirEntry for every file under the source that changed since the checkpoint
+        for entry in scan_files(self.source, extensions, exclude):
+            try:
+                if self.is_new(entry.stat()):
+                    yield entry
+            except OSError:
+                continue
+
+    # ===== UPDATING =====
+
+    def mark_seen(self, st):
+        # A file was handled
+        with self.lock:
+            self.seen[(st.st_dev, st.st_ino)] = changed_ns(st)
+            self.dirty = True
+
+    def advance(self, watermark_ns):
+        # Everything changed before watermark_ns has been handled
+        watermark_ns -= WATERMARK_SLACK_NS
+        with self.lock:
+            if self.watermark_ns is not None and watermark_ns <= self.watermark_ns:
+                return
+            self.watermark_ns = watermark_ns
+            self.seen = {key: ns for key, ns in self.seen.items() if ns >= watermark_ns}
+            self.dirty = True
+
+    def save(self):
+        # Write the checkpoint if it changed - other folders' checkpoints are kept
+        with self.lock:
+            if not self.dirty or self.watermark_ns is None:
+                return
+            entry = {
+                'watermark_ns': self.watermark_ns,
+                'seen': [[dev, ino, ns] for (dev, ino), ns in self.seen.items()],
+            }
+            self.dirty = False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                data = {}
+        except (OSError, ValueError):
+            data = {}
+        data[self.source] = entry
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,47 @@
+# File Organizer - Watch Event Handler
+# Hands watchdog file system events to a WatchQueue - shared by the GUI and the command line runner
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+
+from watchdog.events import FileSystemEventHandler
+
+
+class FileOrganizerHandler(FileSystemEventHandler):
+    # Handler for file system events in watch mode
+    # Runs on the observer thread - events are only handed to the WatchQueue, which waits
+    # for each file to settle and processes it on its own worker pool
+    def __init__(self, work_queue, ignore_folder=None, accept=None):
+        self.work_queue = work_queue
+        # Name-only file type filter - files that can't match are never queued
+        self.accept = accept
+        # Files landing in a destination inside the watched folder are not new files
+        self.ignore_folder = os.path.join(os.path.abspath(ignore_folder), "") if ignore_folder else None
+        
+    def queue_path(self, path, closed=False):
+        if os.path.basename(path).startswith('.'):
+            return
+        if self.ignore_folder and os.path.abspath(path).startswith(self.ignore_folder):
+            return
+        if self.accept is not None and not self.accept(path):
+            return
+        self.work_queue.notify(path, closed)
+        
+    def on_created(self, event):
+        if not event.is_directory:
+            self.queue_path(event.src_path)
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.queue_path(event.src_path)
+    
+    def on_moved(self, event):
+        # Renamed into place (e.g. a finished download) - the new name is what matters
+        if not event.is_directory:
+            self.queue_path(event.dest_path)
+    
+    def on_closed(self, event):
+        # The writer closed the file (Linux) - it is complete and can be processed sooner
+        if not event.is_directory:
+            self.queue_path(event.src_path, closed=True)
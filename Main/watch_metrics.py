@@ -0,0 +1,255 @@
+# File Organizer - Watch Mode Metrics
+# Live counters of a long-running watch session, for sizing hardware and catching stalls
+#
+# WatchMetrics is fed by the engine's events (one 'file' event per handled file) and by the
+# WatchQueue (time from a file's creation to its placement), and reads queue depth, event
+# counts and the cloud upload backlog, failures and retries when asked. organize and
+# execute-plan runs can be watched the same way - without a queue, the queue metrics stay 0.
+# It can be exposed two ways:
+#   MetricsServer - Prometheus text format on http://HOST:PORT/metrics (JSON on /metrics.json)
+#   MetricsFile   - the JSON snapshot rewritten every few seconds, for tools that tail a file
+# Both only listen on / write to the local machine unless told otherwise.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+METRICS_HOST = "127.0.0.1"
+
+METRICS_PORT = 9464
+
+METRICS_FILE = "file_organizer_metrics.json"
+
+# How often the metrics file is rewritten
+DEFAULT_METRICS_INTERVAL = 15.0
+
+# Files per second is measured over this window
+RATE_WINDOW_SECONDS = 60.0
+
+# Latency percentiles are taken over the most recent files
+LATENCY_SAMPLES = 10000
+
+PLACED_STATUSES = ('moved', 'copied')
+
+
+def percentile(values, fraction):
+    # Nearest-rank percentile of a sorted list, or None if it is empty
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class WatchMetrics:
+    # Counters of one watch session (or organize run) - safe to update from any thread
+    def __init__(self, engine, work_queue=None):
+        self.engine = engine
+        self.work_queue = work_queue
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.files = {}  # result status -> files
+        self.duplicates = 0
+        self.errors = 0
+        self.placed_times = deque()  # monotonic time of each placement in the rate window
+        self.last_placed = None  # wall-clock time of the last placement
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+
+    # ===== FEEDS =====
+
+    def watch_events(self, on_event):
+        # Wrap an engine on_event callback so every event is counted first
+        def counting_on_event(event):
+            if event['type'] == 'file':
+                self.file_done(event)
+            if on_event is not None:
+                on_event(event)
+        return counting_on_event
+
+    def file_done(self, result):
+        now = time.monotonic()
+        status = result.get('status')
+        with self.lock:
+            self.files[status] = self.files.get(status, 0) + 1
+            if result.get('duplicate'):
+                self.duplicates += 1
+            if status == 'error':
+                self.errors += 1
+            if status in PLACED_STATUSES:
+                self.placed_times.append(now)
+                self.last_placed = time.time()
+            self.trim(now)
+
+    def record_latency(self, seconds):
+        # Time from a file's first event (or change, for catch-up files) until it was handled
+        with self.lock:
+            self.latencies.append(seconds)
+            self.latency_sum += seconds
+            self.latency_count += 1
+
+    def trim(self, now):
+        while self.placed_times and now - self.placed_times[0] > RATE_WINDOW_SECONDS:
+            self.placed_times.popleft()
+
+    # ===== OUTPUT =====
+
+    def snapshot(self):
+        # Every metric as a plain dict
+        queue_stats = dict(self.work_queue.stats) if self.work_queue is not None else {}
+        depth = len(self.work_queue) if self.work_queue is not None else 0
+        cloud_sync = self.engine.cloud_sync
+        cloud = {}
+        if cloud_sync is not None:
+            with cloud_sync.lock:
+                cloud = dict(cloud_sync.totals)
+        with self.lock:
+            now = time.monotonic()
+            self.trim(now)
+            window = min(RATE_WINDOW_SECONDS, max(time.time() - self.started, 1e-9))
+            latencies = sorted(self.latencies)
+            return {
+                'time': datetime.now().isoformat(),
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'queue_depth': depth,
+                'events_received': queue_stats.get('events', 0),
+                'events_coalesced': queue_stats.get('coalesced', 0),
+                'batches': queue_stats.get('batches', 0),
+                'files': dict(self.files),
+                'files_organized': sum(self.files.get(status, 0) for status in PLACED_STATUSES),
+                'files_per_second': round(len(self.placed_times) / window, 3),
+                'last_placed': self.last_placed,
+                'latency_p50_seconds': percentile(latencies, 0.5),
+                'latency_p99_seconds': percentile(latencies, 0.99),
+                'latency_sum_seconds': round(self.latency_sum, 3),
+                'latency_count': self.latency_count,
+                'duplicates': self.duplicates,
+                'errors': self.errors,
+                'cloud_backlog': len(cloud_sync) if cloud_sync is not None else 0,
+                'cloud_uploaded': cloud.get('completed', 0),
+                'cloud_unchanged': cloud.get('unchanged', 0),
+                'cloud_failed': cloud.get('failed', 0),
+                'cloud_retries': cloud.get('retries', 0),
+            }
+
+    def prometheus_text(self):
+        # Prometheus text exposition format (version 0.0.4)
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP file_organizer_{name} {help_text}")
+            lines.append(f"# TYPE file_organizer_{name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    value = "NaN"
+                lines.append(f"file_organizer_{name}{labels} {value}")
+
+        metric("watch_queue_depth", "gauge", "Files waiting to settle or being processed",
+               [("", snapshot['queue_depth'])])
+        metric("watch_events_total", "counter", "File system events received",
+               [("", snapshot['events_received'])])
+        metric("watch_events_coalesced_total", "counter", "Events merged into a file already queued",
+               [("", snapshot['events_coalesced'])])
+        metric("watch_batches_total", "counter", "Bursts processed as one batch",
+               [("", snapshot['batches'])])
+        metric("files_total", "counter", "Files handled, by result",
+               [(f'{{status="{status}"}}', count) for status, count in sorted(snapshot['files'].items())])
+        metric("files_per_second", "gauge", f"Files organized per second over the last {RATE_WINDOW_SECONDS:g}s",
+               [("", snapshot['files_per_second'])])
+        metric("last_placement_timestamp_seconds", "gauge", "Unix time of the last file organized",
+               [("", snapshot['last_placed'] or 0)])
+        metric("placement_latency_seconds", "summary", "Time from file creation to placement",
+               [('{quantile="0.5"}', snapshot['latency_p50_seconds']),
+                ('{quantile="0.99"}', snapshot['latency_p99_seconds']),
+                ("_sum", snapshot['latency_sum_seconds']),
+                ("_count", snapshot['latency_count'])])
+        metric("duplicates_total", "counter", "Files found to be duplicates", [("", snapshot['duplicates'])])
+        metric("errors_total", "counter", "Files that failed to organize", [("", snapshot['errors'])])
+        metric("cloud_backlog", "gauge", "Cloud uploads queued or running", [("", snapshot['cloud_backlog'])])
+        metric("cloud_uploads_total", "counter", "Cloud uploads finished, by result",
+               [('{result="completed"}', snapshot['cloud_uploaded']),
+                ('{result="unchanged"}', snapshot['cloud_unchanged']),
+                ('{result="failed"}', snapshot['cloud_failed'])])
+        metric("cloud_upload_failures_total", "counter", "Cloud uploads that failed every attempt",
+               [("", snapshot['cloud_failed'])])
+        metric("cloud_upload_retries_total", "counter", "Cloud upload attempts retried after an error",
+               [("", snapshot['cloud_retries'])])
+        metric("uptime_seconds", "gauge", "Seconds since the run or watch mode started", [("", snapshot['uptime_seconds'])])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        metrics = self.server.metrics
+        if self.path == "/metrics":
+            body = metrics.prometheus_text().encode('utf-8')
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body = json.dumps(metrics.snapshot(), indent=2).encode('utf-8')
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood stderr
+        pass
+
+
+class MetricsServer:
+    # Serves WatchMetrics over HTTP on a background thread
+    def __init__(self, metrics, host=METRICS_HOST, port=METRICS_PORT):
+        self.httpd = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.metrics = metrics
+        self.url = f"http://{host}:{self.httpd.server_address[1]}/metrics"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class MetricsFile:
+    # Rewrites the WatchMetrics snapshot to a JSON file every interval seconds
+    def __init__(self, metrics, path=METRICS_FILE, interval=DEFAULT_METRICS_INTERVAL):
+        self.metrics = metrics
+        self.path = path
+        self.interval = max(1.0, interval)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def write(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.metrics.snapshot(), f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Not fatal - the next interval tries again
+            pass
+
+    def stop(self):
+        # Stop and write the final numbers
+        self.stopped.set()
+        self.thread.join()
+        self.write()
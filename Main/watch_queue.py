@@ -0,0 +1,265 @@
+# File Organizer - Watch Mode Work Queue
+# Turns a stream of file system events into settled files handed to a worker pool
+#
+# The observer thread only calls notify(), which records the path and returns at once.
+# created/modified/moved events for the same path are coalesced into one pending entry.
+# A scheduler thread checks pending paths and hands a file to the pool once its size and
+# mtime have not changed for settle_seconds - files still being downloaded or copied
+# are left alone until they are complete. A "closed after writing" event (Linux) says the
+# writer is done, so such a file only has to hold still for one poll.
+#
+# When a burst arrives (more than batch_threshold files waiting), settled files are handed
+# over together to process_batch(paths) - the engine's batched pipeline - instead of one
+# process(path) call per file. Paths listed in the 'unhandled' entry of the summary it returns
+# were not processed, and go back to pending to be tried again.
+#
+# With WatchMetrics, the time from each file's first event to the end of its processing is
+# reported as it finishes (see watch_metrics.py).
+#
+# With a WatchCheckpoint, handled files are recorded and the checkpoint's watermark is moved
+# up to the oldest file still waiting, every CHECKPOINT_SECONDS and on stop(). catch_up()
+# queues what changed while watch mode wasn't running.
+#**Created by Soumit Santra**
+# © 2026 File Organizer. All rights reserved.
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from watch_checkpoint import changed_ns
+
+
+# A file must keep the same size and mtime this long before it is processed
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# How often the scheduler looks at pending files
+POLL_INTERVAL = 0.25
+
+# Worker threads processing settled files
+DEFAULT_WATCH_WORKERS = 4
+
+# More files than this waiting at once switches to batch processing
+DEFAULT_BATCH_THRESHOLD = 64
+
+# How often the checkpoint is written while watching
+CHECKPOINT_SECONDS = 5.0
+
+
+class PendingFile:
+    # One path waiting to settle
+    def __init__(self, now, since_ns=None):
+        self.last_event = now
+        # Wall-clock time the file may have changed from - holds back the checkpoint
+        self.since_ns = since_ns if since_ns is not None else time.time_ns()
+        self.stat = None  # stat result when it settled
+        self.snapshot = None  # (size, mtime_ns) at the last check
+        self.stable_since = None
+        self.closed = False  # The writer closed the file
+
+
+class WatchQueue:
+    # Debounced work queue between a file system observer and process(path)
+    def __init__(self, process, settle_seconds=DEFAULT_SETTLE_SECONDS, workers=DEFAULT_WATCH_WORKERS,
+                 process_batch=None, batch_threshold=DEFAULT_BATCH_THRESHOLD, checkpoint=None, metrics=None):
+        self.process = process
+        self.metrics = metrics  # WatchMetrics - told how long each file took from first event to done
+        self.checkpoint = checkpoint
+        self.catching_up = False
+        self.last_checkpoint = time.monotonic()
+        self.process_batch = process_batch
+        self.batch_threshold = batch_threshold
+        self.settle_seconds = settle_seconds
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = {}  # path -> PendingFile
+        self.in_flight = {}  # path -> PendingFile, being processed right now
+        self.requeue = set()  # paths that got new events while in flight
+        self.stats = {'events': 0, 'coalesced': 0, 'processed': 0, 'batches': 0}
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.running = True
+        self.scheduler = threading.Thread(target=self.run_scheduler, daemon=True)
+        self.scheduler.start()
+
+    def __len__(self):
+        # Files waiting or being processed
+        with self.lock:
+            return len(self.pending) + len(self.in_flight)
+
+    # ===== OBSERVER SIDE =====
+
+    def notify(self, path, closed=False, since_ns=None):
+        # Record an event for path - never blocks on I/O
+        # closed=True means the writer closed the file, so it does not need the full settle wait
+        # since_ns is when the file changed, if that was before now (catch-up scan)
+        now = time.monotonic()
+        with self.lock:
+            self.stats['events'] += 1
+            if path in self.in_flight:
+                self.requeue.add(path)
+                self.stats['coalesced'] += 1
+                return
+            pending = self.pending.get(path)
+            if pending is None:
+                pending = self.pending[path] = PendingFile(now, since_ns)
+            else:
+                pending.last_event = now
+                if since_ns is not None:
+                    pending.since_ns = min(pending.since_ns, since_ns)
+                self.stats['coalesced'] += 1
+            pending.closed = pending.closed or closed
+        self.wakeup.set()
+
+    # ===== SCHEDULER =====
+
+    def run_scheduler(self):
+        while self.running:
+            self.wakeup.wait(POLL_INTERVAL)
+            self.wakeup.clear()
+            if self.checkpoint is not None and time.monotonic() - self.last_checkpoint >= CHECKPOINT_SECONDS:
+                self.save_checkpoint()
+            with self.lock:
+                backlog = len(self.pending)
+            settled = self.settled_paths()
+            if self.process_batch is not None and backlog > self.batch_threshold and len(settled) > 1:
+                self.pool.submit(self.process_paths, settled)
+                continue
+            for path in settled:
+                self.pool.submit(self.process_path, path)
+
+    def settled_paths(self):
+        # Paths whose size and mtime held still for settle_seconds - taken off the pending list
+        now = time.monotonic()
+        with self.lock:
+            candidates = [(path, pending) for path, pending in self.pending.items()
+                          if now - pending.last_event >= min(self.settle_seconds, POLL_INTERVAL)]
+
+        settled = []
+        for path, pending in candidates:
+            try:
+                st = os.stat(path)
+            except OSError:
+                # Gone (moved away, deleted, or a temporary download file)
+                with self.lock:
+                    self.pending.pop(path, None)
+                continue
+
+            pending.stat = st
+            snapshot = (st.st_size, st.st_mtime_ns)
+            if snapshot != pending.snapshot:
+                pending.snapshot = snapshot
+                pending.stable_since = now
+                continue
+            settle_seconds = min(self.settle_seconds, POLL_INTERVAL) if pending.closed else self.settle_seconds
+            if now - pending.stable_since >= settle_seconds and now - pending.last_event >= settle_seconds:
+                settled.append(path)
+
+        with self.lock:
+            for path in settled:
+                self.in_flight[path] = self.pending.pop(path)
+        return settled
+
+    def process_path(self, path):
+        # Worker - process one settled file, then pick up events that came in meanwhile
+        try:
+            self.process(path)
+        finally:
+            self.finished([path])
+
+    def process_paths(self, paths):
+        # Worker - process a burst of settled files in one batch
+        unhandled = set()
+        try:
+            summary = self.process_batch(paths)
+            unhandled = set(summary.get('unhandled', ())) if isinstance(summary, dict) else set()
+        finally:
+            with self.lock:
+                self.stats['batches'] += 1
+            self.retry([path for path in paths if path in unhandled])
+            self.finished([path for path in paths if path not in unhandled])
+
+    def retry(self, paths):
+        # Paths were not processed - back to pending, not marked seen, so the checkpoint
+        # stays behind them (also when stopping: stop() saves the checkpoint after the pool)
+        now = time.monotonic()
+        with self.lock:
+            for path in paths:
+                pending = self.in_flight.pop(path, None) or PendingFile(now)
+                pending.last_event = now
+                self.requeue.discard(path)
+                self.pending[path] = pending
+        self.wakeup.set()
+
+    def finished(self, paths):
+        # Paths are done - those that got events while in flight go back to pending
+        now = time.monotonic()
+        done = []
+        with self.lock:
+            for path in paths:
+                pending = self.in_flight.pop(path, None)
+                self.stats['processed'] += 1
+                if pending is not None:
+                    done.append(pending)
+                if self.checkpoint is not None and pending is not None and pending.stat is not None:
+                    self.checkpoint.mark_seen(pending.stat)
+                if path in self.requeue:
+                    self.requeue.discard(path)
+                    self.pending[path] = PendingFile(now)
+        self.wakeup.set()
+        if self.metrics is not None:
+            now_ns = time.time_ns()
+            for pending in done:
+                self.metrics.record_latency((now_ns - pending.since_ns) / 1e9)
+
+    # ===== CHECKPOINT =====
+
+    def catch_up(self, extensions=None, exclude=()):
+        # Queue every file that changed since the checkpoint - run after the observer has
+        # started, so nothing falls between the scan and live events
+        # Returns the number of files queued
+        self.catching_up = True
+        count = 0
+        try:
+            for entry in self.checkpoint.catch_up_files(extensions, exclude):
+                if not self.running:
+                    break
+                try:
+                    since_ns = changed_ns(entry.stat())
+                except OSError:
+                    continue
+                self.notify(entry.path, since_ns=since_ns)
+                count += 1
+        finally:
+            with self.lock:
+                # Stopped half way - the checkpoint must not move past files never scanned
+                self.catching_up = not self.running
+        return count
+
+    def save_checkpoint(self):
+        # Move the watermark up to the oldest file not handled yet, and write it out
+        self.last_checkpoint = time.monotonic()
+        with self.lock:
+            if not self.catching_up:
+                waiting = [pending.since_ns for pending in self.pending.values()]
+                waiting += [pending.since_ns for pending in self.in_flight.values()]
+                self.checkpoint.advance(min(waiting, default=time.time_ns()))
+        try:
+            self.checkpoint.save()
+        except OSError:
+            # Not fatal - the next save or restart catches up from an older checkpoint
+            pass
+
+    # ===== SHUTDOWN =====
+
+    def stop(self, wait=True):
+        # Stop scheduling - files already handed to the pool are finished when wait is True
+        # Files still settling are dropped, but stay behind the checkpoint for the next start
+        self.running = False
+        self.wakeup.set()
+        self.scheduler.join()
+        self.pool.shutdown(wait=wait)
+        if self.checkpoint is not None:
+            self.save_checkpoint()
+        with self.lock:
+            self.pending.clear()
+            self.requeue.clear()